@@ -0,0 +1,123 @@
+"""apiman command line
+
+    python -m apiman build examples._flask:apiman -o apiman.artifact
+    python -m apiman build examples._flask:apiman -o apiman.artifact --check
+    python -m apiman analyze examples._flask:apiman --top 20
+"""
+import argparse
+import importlib
+import json
+import os
+import sys
+import typing
+
+
+def import_object(name: str) -> typing.Any:
+    # "module:attribute"
+    module, _, attribute = name.partition(":")
+    obj: typing.Any = importlib.import_module(module)
+    for k in attribute.split("."):
+        obj = getattr(obj, k)
+    return obj
+
+
+def import_apiman(args: argparse.Namespace) -> typing.Tuple[typing.Any, typing.Any]:
+    apiman = import_object(args.apiman)
+    module = args.apiman.partition(":")[0]
+    app = (
+        import_object(args.app)
+        if args.app
+        else getattr(sys.modules[module], "app", None)
+    )
+    return apiman, app
+
+
+def build(args: argparse.Namespace) -> int:
+    apiman, app = import_apiman(args)
+    content = apiman.build_artifact(app)
+    if args.check:
+        if not os.path.exists(args.output):
+            print(f"{args.output} is missing", file=sys.stderr)
+            return 1
+        with open(args.output, "rb") as f:
+            if f.read() != content:
+                print(f"{args.output} is outdated", file=sys.stderr)
+                return 1
+        return 0
+    with open(args.output, "wb") as f:
+        f.write(content)
+    return 0
+
+
+def analyze(args: argparse.Namespace) -> int:
+    from .analyze import load_hits
+
+    apiman, app = import_apiman(args)
+    apiman.load_specification(app)
+    costs = apiman.analyze_operations(hits=load_hits(args.hits) if args.hits else None)
+    costs = costs[: args.top] if args.top else costs
+    if args.json:
+        print(json.dumps([cost.as_dict() for cost in costs], indent=2))
+    else:
+        print(
+            f"{'score':>8}{'hits':>10}{'refs':>6}{'fan':>6}{'regex':>6}{'enum':>7}"
+            f"{'uniq':>6}{'open':>6}  operation"
+        )
+        for cost in costs:
+            print(
+                f"{cost.score:>8.1f}{'-' if cost.hits is None else cost.hits:>10}"
+                f"{cost.ref_depth:>5}{'+' if cost.recursive else ' '}"
+                f"{cost.fan_out:>6}{cost.patterns:>6}{cost.enum_size:>7}"
+                f"{cost.unique_items:>6}{cost.open_objects:>6}  {cost.operation_id}"
+            )
+    redos = [cost for cost in costs if cost.redos]
+    for cost in redos:
+        for pattern in cost.redos:
+            print(
+                f"ReDoS prone pattern in {cost.operation_id}: {pattern}",
+                file=sys.stderr,
+            )
+    return 1 if redos and args.check else 0
+
+
+def main(argv: typing.Optional[typing.Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m apiman")
+    commands = parser.add_subparsers(dest="command", required=True)
+    parser_build = commands.add_parser(
+        "build", help="build specification artifact for `init_app(artifact=...)`"
+    )
+    parser_build.add_argument("apiman", help="apiman instance, eg: app:apiman")
+    parser_build.add_argument(
+        "--app", default="", help="web app, default to `app` in apiman's module"
+    )
+    parser_build.add_argument("-o", "--output", default="apiman.artifact")
+    parser_build.add_argument(
+        "--check", action="store_true", help="fail if the output file is outdated"
+    )
+    parser_build.set_defaults(func=build)
+    parser_analyze = commands.add_parser(
+        "analyze", help="score request schemas of operations by validation cost"
+    )
+    parser_analyze.add_argument("apiman", help="apiman instance, eg: app:apiman")
+    parser_analyze.add_argument(
+        "--app", default="", help="web app, default to `app` in apiman's module"
+    )
+    parser_analyze.add_argument(
+        "--top", type=int, default=20, help="most expensive operations, 0 for all"
+    )
+    parser_analyze.add_argument(
+        "--hits", default="", help='json file of request counts, {"GET /path": 1}'
+    )
+    parser_analyze.add_argument("--json", action="store_true", help="json output")
+    parser_analyze.add_argument(
+        "--check", action="store_true", help="fail on ReDoS prone patterns"
+    )
+    parser_analyze.set_defaults(func=analyze)
+
+    sys.path.insert(0, os.getcwd())
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,360 @@
+"""Validation cost of every operation's request schemas
+
+    for cost in apiman.analyze_operations()[:20]:
+        print(cost.operation_id, cost.score, cost.hits, cost.redos)
+
+    python -m apiman analyze examples._flask:apiman --top 20 [--hits hits.json]
+
+Costs are heuristics, counted per schema occurrence with refs followed:
+    ref_depth: deepest `$ref` chain, recursive refs are counted once
+    fan_out: `oneOf`/`anyOf` branches, every branch of `oneOf` is evaluated
+    patterns: `pattern`s and `patternProperties`
+    enum_size: values of every `enum`
+    unique_items: `uniqueItems` arrays without a small `maxItems`, quadratic
+    open_objects: objects with schema or true `additionalProperties` but no
+        `maxProperties`
+    redos: patterns prone to catastrophic backtracking
+"""
+import json
+import re
+import sys
+import typing
+
+from . import transform
+
+# the regex parser of `re`, private since python 3.11, its trees are only read by
+# `is_redos_prone`, which reports no pattern if they change shape
+if sys.version_info >= (3, 11):
+    from re import _parser as sre_parse  # type: ignore
+else:  # pragma: no cover
+    import sre_parse  # type: ignore
+
+if typing.TYPE_CHECKING:  # pragma: no cover
+    from .base import Apiman
+
+WEIGHTS = {
+    "ref_depth": 1.0,
+    "fan_out": 2.0,
+    "patterns": 2.0,
+    "enum_size": 1 / 16,
+    "unique_items": 5.0,
+    "open_objects": 3.0,
+    "redos": 50.0,
+}
+# keywords of {name: schema}
+SCHEMA_MAPS = {"properties", "patternProperties", "definitions", "$defs"}
+SMALL_ARRAY = 32  # `maxItems` under which `uniqueItems` is cheap
+_REPEATS = (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT)
+_UNBOUNDED = sre_parse.MAXREPEAT
+_CATEGORIES = {
+    getattr(sre_parse, f"CATEGORY_{name}"): re.compile(regex)
+    for name, regex in (
+        ("DIGIT", r"\d"),
+        ("NOT_DIGIT", r"\D"),
+        ("SPACE", r"\s"),
+        ("NOT_SPACE", r"\S"),
+        ("WORD", r"\w"),
+        ("NOT_WORD", r"\W"),
+    )
+}
+
+
+class OperationCost:
+    __slots__ = (
+        "path",
+        "method",
+        "operation_id",
+        "ref_depth",
+        "recursive",
+        "fan_out",
+        "patterns",
+        "enum_size",
+        "unique_items",
+        "open_objects",
+        "redos",
+        "hits",
+    )
+
+    def __init__(self, path: str, method: str, operation_id: str = ""):
+        self.path = path
+        self.method = method
+        self.operation_id = operation_id or f"{method.upper()} {path}"
+        self.ref_depth = 0
+        self.recursive = False
+        self.fan_out = 0
+        self.patterns = 0
+        self.enum_size = 0
+        self.unique_items = 0
+        self.open_objects = 0
+        self.redos: typing.List[str] = []  # flagged patterns
+        self.hits: typing.Optional[int] = None
+
+    @property
+    def score(self) -> float:
+        return sum(
+            weight * (len(self.redos) if k == "redos" else getattr(self, k))
+            for k, weight in WEIGHTS.items()
+        )
+
+    @property
+    def weighted_score(self) -> float:
+        """Score times hits, the score alone without hits"""
+        return self.score if self.hits is None else self.score * self.hits
+
+    def as_dict(self) -> typing.Dict[str, typing.Any]:
+        data = {k: getattr(self, k) for k in self.__slots__}
+        data["score"] = self.score
+        return data
+
+
+def analyze(
+    apiman: "Apiman",
+    hits: typing.Optional[typing.Mapping[typing.Tuple[str, str], int]] = None,
+) -> typing.List[OperationCost]:
+    """Costs of all operations, most expensive(by `weighted_score`) first
+
+    `hits` are request counts by (path, method).
+    """
+    costs = []
+    for path, method in apiman.iter_operations():
+        operation = apiman.specification["paths"][path][method]
+        cost = OperationCost(path, method, operation.get("operationId", ""))
+        # what request schemas are extracted from, refs included
+        for k in ("parameters", "requestBody"):
+            _walk(apiman.specification, operation.get(k), cost)
+        cost.redos = list(dict.fromkeys(cost.redos))
+        if hits is not None:
+            cost.hits = hits.get((path, method), 0)
+        costs.append(cost)
+    costs.sort(key=lambda c: (c.weighted_score, c.score), reverse=True)
+    return costs
+
+
+def _walk(specification: typing.Dict, schema: typing.Any, cost: OperationCost):
+    # (object, ref depth, refs being followed)
+    stack: typing.List[typing.Tuple[typing.Any, int, typing.FrozenSet[str]]] = [
+        (schema, 0, frozenset())
+    ]
+    while stack:
+        obj, depth, refs = stack.pop()
+        if isinstance(obj, list):
+            stack.extend((o, depth, refs) for o in obj)
+            continue
+        elif not isinstance(obj, dict):
+            continue
+        ref = obj.get("$ref")
+        if isinstance(ref, str):
+            if ref in refs:
+                cost.recursive = True
+                continue
+            try:
+                target = transform.get_by_ref(specification, ref)
+            except ValueError:
+                continue
+            cost.ref_depth = max(cost.ref_depth, depth + 1)
+            stack.append((target, depth + 1, refs | {ref}))
+            continue
+
+        for k in ("oneOf", "anyOf"):
+            if isinstance(obj.get(k), list):
+                cost.fan_out += len(obj[k])
+        if isinstance(obj.get("pattern"), str):
+            _pattern(obj["pattern"], cost)
+        if isinstance(obj.get("patternProperties"), dict):
+            for pattern in obj["patternProperties"]:
+                _pattern(pattern, cost)
+        if isinstance(obj.get("enum"), list):
+            cost.enum_size += len(obj["enum"])
+        if obj.get("uniqueItems") is True and not (
+            isinstance(obj.get("maxItems"), int) and obj["maxItems"] <= SMALL_ARRAY
+        ):
+            cost.unique_items += 1
+        additional = obj.get("additionalProperties")
+        if (additional is True or isinstance(additional, dict)) and (
+            "maxProperties" not in obj
+        ):
+            cost.open_objects += 1
+
+        for k, v in obj.items():
+            # literal data, not schemas
+            if k not in transform.VALUE_KEYS and k not in ("examples", "example"):
+                if k in SCHEMA_MAPS and isinstance(v, dict):
+                    stack.extend((o, depth, refs) for o in v.values())
+                elif isinstance(v, (dict, list)):
+                    stack.append((v, depth, refs))
+
+
+def _pattern(pattern: str, cost: OperationCost):
+    cost.patterns += 1
+    if is_redos_prone(pattern):
+        cost.redos.append(pattern)
+
+
+def is_redos_prone(pattern: str) -> bool:
+    """Whether the regex may backtrack catastrophically: an unbounded quantifier in a
+    quantified group which neither starts nor ends with a separator it can't match,
+    eg: "(a+)+" but not "(\\.[a-z]+)*" or "(\\w+\\.)*", or alternatives of a
+    quantified group which can start alike, eg: "(a|ab)*" """
+    try:
+        return _nested_repeat(list(sre_parse.parse(pattern)), _OUTSIDE)
+    except Exception:  # invalid patterns fail validation elsewhere
+        return False
+
+
+_OUTSIDE: typing.Any = object()  # not in a quantified group
+
+
+def _nested_repeat(items: typing.List, outer: typing.List[typing.Set]) -> bool:
+    # `outer`: characters the enclosing quantified group starts or ends with
+    for op, av in items:
+        if op in _REPEATS:
+            _, high, sub = av
+            sub = list(sub)
+            if outer is not _OUTSIDE and high == _UNBOUNDED:
+                if not any(
+                    not any(_may_match(sub, c) for c in chars) for chars in outer
+                ):
+                    return True
+            repeated = high == _UNBOUNDED or high > 1
+            if repeated and _overlapping_branches(sub):
+                return True
+            separators = [s for s in (_first(sub), _last(sub)) if s]
+            if _nested_repeat(sub, separators if repeated else outer):
+                return True
+        elif op == sre_parse.SUBPATTERN:
+            if _nested_repeat(list(av[-1]), outer):
+                return True
+        elif op == sre_parse.BRANCH:
+            for branch in av[1]:
+                if _nested_repeat(list(branch), outer):
+                    return True
+    return False
+
+
+def _overlapping_branches(items: typing.List) -> bool:
+    # alternatives of a repeated group sharing a first character
+    for op, av in items:
+        if op == sre_parse.SUBPATTERN:
+            return _overlapping_branches(list(av[-1]))
+        if op != sre_parse.BRANCH:
+            continue
+        firsts = [_first(list(branch)) for branch in av[1]]
+        for i, a in enumerate(firsts):
+            for b in firsts[i + 1 :]:
+                if a is None or b is None or a & b:
+                    return True
+    return False
+
+
+def _first(items: typing.List) -> typing.Optional[typing.Set]:
+    """Characters a subpattern must start with, None for any"""
+    if not items:
+        return None
+    op, av = items[0]
+    if op == sre_parse.SUBPATTERN:
+        return _first(list(av[-1]))
+    elif op in _REPEATS:
+        return _first(list(av[2])) if av[0] > 0 else None
+    return _chars(items[:1])
+
+
+def _last(items: typing.List) -> typing.Optional[typing.Set]:
+    """Characters a subpattern must end with, None for any"""
+    items = [item for item in items if item[0] != sre_parse.AT]
+    if not items:
+        return None
+    op, av = items[-1]
+    if op == sre_parse.SUBPATTERN:
+        return _last(list(av[-1]))
+    elif op in _REPEATS:
+        return _last(list(av[2])) if av[0] > 0 else None
+    return _chars(items[-1:])
+
+
+def _may_match(items: typing.List, c: int) -> bool:
+    """Whether a subpattern may match character `c` anywhere, True if unsure"""
+    for op, av in items:
+        if op == sre_parse.LITERAL:
+            matched = av == c
+        elif op == sre_parse.NOT_LITERAL:
+            matched = av != c
+        elif op == sre_parse.IN:
+            matched = _in(av, c)
+        elif op == sre_parse.SUBPATTERN:
+            matched = _may_match(list(av[-1]), c)
+        elif op in _REPEATS:
+            matched = _may_match(list(av[2]), c)
+        elif op == sre_parse.BRANCH:
+            matched = any(_may_match(list(branch), c) for branch in av[1])
+        elif op == sre_parse.AT:
+            matched = False
+        else:  # any character, groups references, lookarounds
+            return True
+        if matched:
+            return True
+    return False
+
+
+def _in(items: typing.List, c: int) -> bool:
+    # `c` in a character class
+    negate = matched = False
+    for o, v in items:
+        if o == sre_parse.NEGATE:
+            negate = True
+        elif o == sre_parse.LITERAL:
+            matched = matched or v == c
+        elif o == sre_parse.RANGE:
+            matched = matched or v[0] <= c <= v[1]
+        elif o == sre_parse.CATEGORY and v in _CATEGORIES:
+            matched = matched or bool(_CATEGORIES[v].match(chr(c)))
+        else:
+            return True
+    return matched != negate
+
+
+def _chars(items: typing.List) -> typing.Optional[typing.Set]:
+    """Characters a subpattern may match, None for too many to list"""
+    chars: typing.Set = set()
+    for op, av in items:
+        if op == sre_parse.LITERAL:
+            chars.add(av)
+        elif op == sre_parse.IN:
+            for o, v in av:
+                if o == sre_parse.LITERAL:
+                    chars.add(v)
+                elif o == sre_parse.RANGE and v[1] - v[0] < 256:
+                    chars.update(range(v[0], v[1] + 1))
+                else:  # categories, negations
+                    return None
+        elif op == sre_parse.SUBPATTERN:
+            sub = _chars(list(av[-1]))
+            if sub is None:
+                return None
+            chars |= sub
+        elif op in _REPEATS:
+            sub = _chars(list(av[2]))
+            if sub is None:
+                return None
+            chars |= sub
+        elif op == sre_parse.BRANCH:
+            for branch in av[1]:
+                sub = _chars(list(branch))
+                if sub is None:
+                    return None
+                chars |= sub
+        elif op in (sre_parse.AT,):  # anchors match nothing
+            continue
+        else:
+            return None
+    return chars
+
+
+def load_hits(file_path: str) -> typing.Dict[typing.Tuple[str, str], int]:
+    """Hits from a json file of {"GET /path": count}"""
+    with open(file_path) as f:
+        data = json.load(f)
+    hits = {}
+    for k, v in data.items():
+        method, _, path = k.partition(" ")
+        hits[(path, method.lower())] = int(v)
+    return hits
@@ -0,0 +1,69 @@
+"""Build time compiled specification
+
+An artifact file has three lines:
+* meta data: format version and checksum of the specification
+* the serialized specification, served as is
+* request validation schema of every operation and the route to path template map
+"""
+import hashlib
+import typing
+
+from . import codec
+
+if typing.TYPE_CHECKING:  # pragma: no cover
+    from .base import Apiman
+
+FORMAT = 1
+
+
+class ArtifactError(ValueError):
+    pass
+
+
+def build(apiman: "Apiman", app: typing.Any) -> bytes:
+    apiman.load_specification(app)
+    apiman.load_path_schemas()
+    specification = codec.dumps(apiman.specification, apiman.json_dumps)
+    data = codec.dumps(
+        {
+            "path_schemas": [
+                [path, method, apiman._get_path_schema(path, method).as_dict()]
+                for path, method in apiman.iter_operations()
+            ],
+            "routes": apiman.routes,
+        },
+        apiman.json_dumps,
+    )
+    meta = codec.dumps(
+        {"format": FORMAT, "sha256": hashlib.sha256(specification).hexdigest()},
+        apiman.json_dumps,
+    )
+    return b"\n".join((meta, specification, data))
+
+
+def load(apiman: "Apiman", content: bytes):
+    try:
+        meta, specification, data = content.split(b"\n", 2)
+    except ValueError:
+        raise ArtifactError("Wrong artifact format")
+    _meta = apiman.json_loads(meta)
+    if _meta.get("format") != FORMAT:
+        raise ArtifactError(f"Unsupported artifact format: {_meta.get('format')}")
+    elif _meta.get("sha256") != hashlib.sha256(specification).hexdigest():
+        raise ArtifactError("Broken artifact")
+    _data = apiman.json_loads(data)
+
+    with apiman._lock:
+        apiman.specification = apiman.json_loads(specification)
+        apiman._clear_rendered()
+        apiman._path_schemas.clear()
+        apiman._dependents.clear()
+        apiman._referrers.clear()
+        apiman._referrers_known.clear()
+        for path, method, schema in _data["path_schemas"]:
+            apiman._set_path_schema(
+                path, method, apiman._operation_schema(path, method, schema)
+            )
+        apiman.routes.update(_data["routes"])
+        apiman._serialized[("", "", False)] = specification
+        apiman.loaded = True
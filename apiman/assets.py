@@ -0,0 +1,80 @@
+import os
+import typing
+
+SWAGGER_UI_VERSION = "5.17.14"
+REDOC_VERSION = "2.1.5"
+CDN_ASSETS = {
+    "swagger-ui.css": f"https://cdn.jsdelivr.net/npm/swagger-ui-dist@{SWAGGER_UI_VERSION}/swagger-ui.css",
+    "swagger-ui-bundle.js": f"https://cdn.jsdelivr.net/npm/swagger-ui-dist@{SWAGGER_UI_VERSION}/swagger-ui-bundle.js",
+    "swagger-ui-standalone-preset.js": f"https://cdn.jsdelivr.net/npm/swagger-ui-dist@{SWAGGER_UI_VERSION}/swagger-ui-standalone-preset.js",
+    "redoc.standalone.js": f"https://cdn.jsdelivr.net/npm/redoc@{REDOC_VERSION}/bundles/redoc.standalone.js",
+    "redoc-fonts.css": "https://fonts.googleapis.com/css?family=Montserrat:300,400,700|Roboto:300,400,700",
+}
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class Asset:
+    """One vendored UI file, served under a content hashed url"""
+
+    def __init__(
+        self,
+        name: str,
+        url: str,
+        body: bytes,
+        content_type: str,
+        gzip_body: typing.Optional[bytes] = None,
+    ):
+        self.name = name
+        self.url = url
+        self.body = body
+        self.content_type = content_type
+        self.gzip_body = gzip_body
+
+    def response(
+        self, accept_encoding: str = ""
+    ) -> typing.Tuple[bytes, typing.Dict[str, str]]:
+        headers = {
+            "Content-Type": self.content_type,
+            "Cache-Control": CACHE_CONTROL,
+            "Vary": "Accept-Encoding",
+        }
+        if self.gzip_body is not None and "gzip" in accept_encoding:
+            headers["Content-Encoding"] = "gzip"
+            return self.gzip_body, headers
+        return self.body, headers
+
+
+def load_assets(directory: str, url: str) -> typing.Dict[str, Asset]:
+    """Load every file in `directory`, eg: a pinned `swagger-ui-dist` package
+
+    A sibling `<name>.gz` file is used as precompressed body, otherwise the body is
+    compressed once here.
+    """
+    import gzip
+    import hashlib
+    import mimetypes
+
+    assets = {}
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if name.endswith(".gz") or not os.path.isfile(path):
+            continue
+        with open(path, "rb") as f:
+            body = f.read()
+        if os.path.exists(path + ".gz"):
+            with open(path + ".gz", "rb") as f:
+                gzip_body: typing.Optional[bytes] = f.read()
+        else:
+            gzip_body = gzip.compress(body, compresslevel=9)
+            if len(gzip_body) >= len(body):
+                gzip_body = None
+        stem, ext = os.path.splitext(name)
+        digest = hashlib.sha256(body).hexdigest()[:12]
+        assets[name] = Asset(
+            name,
+            f"{url}{stem}.{digest}{ext}",
+            body,
+            mimetypes.guess_type(name)[0] or "application/octet-stream",
+            gzip_body=gzip_body,
+        )
+    return assets
@@ -1,31 +1,37 @@
-import copy
-import json
+import functools
+import gc
+import logging
 import os
+import threading
+import time
 import typing
+import weakref
 from collections import OrderedDict
-
-import jsonschema_rs
-import xmltodict
-import yaml
+from urllib.parse import quote
 
 import apiman
 
+from . import artifact, codec, transform
+from .assets import CDN_ASSETS, Asset, load_assets
+from .cache import ParseCache
+from .metrics import Metrics
+from .operation import EMPTY_OPERATION, OperationCache, OperationSchema
+from .trace import SlowValidationLog, ValidationTrace
+
+if typing.TYPE_CHECKING:  # pragma: no cover
+    from .analyze import OperationCost
+    from .watch import Watcher
+
+
+logger = logging.getLogger(__name__)
+
 
 class Apiman:
-    HTTP_METHODS = {
-        "get",
-        "post",
-        "put",
-        "patch",
-        "delete",
-        "head",
-        "connect",
-        "options",
-        "trace",
-    }
+    HTTP_METHODS = transform.HTTP_METHODS
     SPECIFICATION_FILE = "__spec_file__"
     SPECIFICATION_YAML = "__spec_yaml__"
     SPECIFICATION_DICT = "__spec_dict__"
+    HANDLER_METHOD = "{}"  # name of view class's http method function
     STATIC_DIR = f"{getattr(apiman, '__path__')[0]}/static/"
     VALIDATE_REQUEST_CONTENT_TYPES = {
         "json": ("application/json",),
@@ -42,6 +48,18 @@ class Apiman:
         swagger_template=os.path.join(STATIC_DIR, "swagger.html"),
         redoc_template=os.path.join(STATIC_DIR, "redoc.html"),
         template=os.path.join(STATIC_DIR, "template.yaml"),
+        static_dir="",
+        static_url="/apiman/static/",
+        shard_by="",
+        compact=False,
+        cache_dir="",
+        json_loads: typing.Optional[codec.JSONLoads] = None,
+        json_dumps: typing.Optional[codec.JSONDumps] = None,
+        load_workers=1,
+        schema_cache_size=8192,
+        metrics=False,
+        metrics_url="/apiman/metrics/",
+        slow_validation_ms=0,
     ):
         self.title = title
         self.specification_url = specification_url
@@ -49,14 +67,74 @@ class Apiman:
         self.redoc_url = redoc_url
         self.swagger_template = swagger_template
         self.redoc_template = redoc_template
-        self.specification = self.load_file(template)
+        self.template = template
+        self.static_dir = static_dir
+        self.static_url = static_url
+        self.shard_by = shard_by  # "tag" or "path"
+        self.compact = compact
+        self.cache_dir = cache_dir
+        self.load_workers = load_workers  # threads parsing unique documents
+        # validation counters and latency histograms, served at `metrics_url`
+        self.metrics: typing.Optional[Metrics] = Metrics() if metrics else None
+        self.metrics_url = metrics_url
+        # pluggable json backend, eg: orjson's, `codec.json_dumps` serializes what
+        # `json_dumps` can't
+        self.json_loads = json_loads or codec.json_loads
+        self.json_dumps = json_dumps or codec.json_dumps
+        # called with a `ValidationTrace` after every validation of an operation
+        self.validation_hooks: typing.List[
+            typing.Callable[[ValidationTrace], None]
+        ] = []
+        if slow_validation_ms:
+            self.add_validation_hook(
+                SlowValidationLog(slow_validation_ms, json_dumps=self.json_dumps)
+            )
+        self.specification = self.load_file(template, json_loads=self.json_loads)
         self.loaded = False
-        self._path_schemas: typing.Dict[
-            str, typing.Dict[str, typing.Any]
-        ] = {}  # {"{path}_{method}": {schema}}
+        self.revision = 0  # bumped by every `add_path`/`add_schema`
+        # single flight loading and schema extraction, hot paths read without it
+        self._lock = threading.RLock()
+        self._assets: typing.Optional[typing.Dict[str, Asset]] = None
+        self._parse_cache: typing.Optional[ParseCache] = None
+        # {(path, method): OperationSchema}
+        self._path_schemas = OperationCache(
+            max_size=schema_cache_size, on_evict=self._forget_dependencies
+        )
+        # identical request schemas of all operations, with their validators
+        self._interned = self._path_schemas.interner
+        # id(dict) -> (dict, OperationSchema) of `get_request_schema` overrides
+        # returning the request schema dict of apiman < 0.6
+        self._legacy_schemas: typing.Dict[
+            int, typing.Tuple[typing.Dict, OperationSchema]
+        ] = {}
+        self.routes: typing.Dict[str, str] = {}  # {route rule: path template}
+        self._shards: typing.Dict[typing.Tuple[str, bool], typing.Dict] = {}
+        self._shard_index: typing.Optional[typing.Dict] = None
+        self._compact_specification: typing.Optional[typing.Dict] = None
+        self._serialized: typing.Dict[typing.Tuple[str, str, bool], bytes] = {}
+        # path or ref -> cached request schema keys built from it directly
+        self._dependents: typing.Dict[str, typing.Set[typing.Tuple[str, str]]] = {}
+        # ref -> refs whose objects mention it, and refs whose mentions are recorded
+        self._referrers: typing.Dict[str, typing.Set[str]] = {}
+        self._referrers_known: typing.Set[str] = set()
+        # shard cache key -> refs the shard mentions
+        self._shard_refs: typing.Dict[typing.Tuple[str, bool], typing.Set[str]] = {}
+        # entries of the last successfully validated specification, and entries
+        # changed by `add_path`/`add_schema` since
+        self._validated: typing.Optional[
+            typing.Dict[typing.Tuple[str, ...], typing.Any]
+        ] = None
+        self._changed: typing.Set[typing.Tuple[str, ...]] = set()
+        # parsed specification by function or class, and by file path
+        self._parsed: typing.MutableMapping[
+            typing.Callable, typing.Dict[str, typing.Any]
+        ] = weakref.WeakKeyDictionary()
+        self._parsed_files: typing.Dict[
+            str, typing.Tuple[typing.Tuple[int, int], typing.Dict]
+        ] = {}
 
     @property
-    def config(self) -> typing.Dict[str, str]:
+    def config(self) -> typing.Dict[str, typing.Any]:
         return {
             "title": self.title,
             "specification_url": self.specification_url,
@@ -64,8 +142,35 @@ class Apiman:
             "redoc_url": self.redoc_url,
             "swagger_template": self.swagger_template,
             "redoc_template": self.redoc_template,
+            "static_url": self.static_url,
+            "shard_by": self.shard_by,
+            "assets": self.asset_urls,
         }
 
+    @property
+    def assets(self) -> typing.Dict[str, Asset]:
+        # vendored UI files, only when `static_dir` is set
+        if self._assets is None:
+            self._assets = (
+                load_assets(self.static_dir, self.static_url) if self.static_dir else {}
+            )
+        return self._assets
+
+    @property
+    def asset_urls(self) -> typing.Dict[str, str]:
+        # bundles missing from a partially vendored `static_dir` stay on the CDN
+        return {
+            **CDN_ASSETS,
+            **{name: asset.url for name, asset in self.assets.items()},
+        }
+
+    @property
+    def parse_cache(self) -> typing.Optional[ParseCache]:
+        # parsed docstring/yaml/file specifications, only when `cache_dir` is set
+        if self._parse_cache is None and self.cache_dir:
+            self._parse_cache = ParseCache(self.cache_dir)
+        return self._parse_cache
+
     @property
     def version(self) -> typing.Tuple[int, ...]:
         _version = self.specification.get("swagger") or self.specification.get(
@@ -74,44 +179,219 @@ class Apiman:
         assert _version, "Wrong API specification format"
         return tuple(map(int, _version.split(".")))
 
-    def _load_specification(self) -> typing.Dict:
+    def load_specification(self, app: typing.Any) -> typing.Dict:
+        """Collect specifications of all routes once, other threads wait for it"""
         if not self.loaded:
-            self.loaded = True
+            with self._lock:
+                if not self.loaded:
+                    self._load_routes(app)
+                    self.loaded = True
         return self.specification
 
-    def get_by_ref(self, ref: str) -> typing.Any:
-        data = self.specification
-        for k in ref.split("/"):
-            if k == "#":
-                continue
-            elif k not in data:
-                raise ValueError(f"Wrong ref: {ref}")
-            data = data[k]
+    def _load_routes(self, app: typing.Any):
+        raise NotImplementedError
+
+    def preload(
+        self, app: typing.Any = None, freeze: bool = True, validators: bool = True
+    ):
+        """Finish all lazy work before forking workers, eg: gunicorn `--preload`
+
+        Loads the specification, request schemas, serialized specification and
+        validation dependencies, compiles every validator unless `validators` is
+        False, then moves every object into gc's permanent generation so forked
+        workers share the pages instead of copying them.
+        """
+        import jsonschema_rs  # noqa: F401
+        import xmltodict  # noqa: F401
+
+        self.load_specification(app)
+        self.load_path_schemas()
+        if validators:
+            for path, method in self.iter_operations():
+                self._get_path_schema(path, method).compile_validators()
+        self.serialize_specification(app, {})
+        if freeze:
+            gc.collect()
+            gc.freeze()
 
+    def watch(self, interval: float = 1.0) -> "Watcher":
+        """Reload changed `from_file` files and `template` in development"""
+        from .watch import Watcher
+
+        return Watcher(self, interval=interval).start()
+
+    def load_artifact(self, filename: str):
+        """Load specification and request schemas built by `python -m apiman build`"""
+        with open(filename, "rb") as f:
+            artifact.load(self, f.read())
+
+    def build_artifact(self, app: typing.Any) -> bytes:
+        return artifact.build(self, app)
+
+    def render_template(self, template_path: str) -> str:
+        # UI pages only, jinja2 is imported on first use
+        from jinja2 import Template
+
+        with open(template_path) as f:
+            return Template(f.read()).render(self.config)
+
+    def render_specification(
+        self, app: typing.Any, query: typing.Mapping[str, str]
+    ) -> typing.Dict:
+        """Specification to serve, a shard index or a single shard by `query`"""
+        self.load_specification(app)
+        return self._render_specification(self._render_key(query))
+
+    def serialize_specification(
+        self, app: typing.Any, query: typing.Mapping[str, str]
+    ) -> bytes:
+        """JSON body of `render_specification`, cached until the specification changes"""
+        self.load_specification(app)
+        key = self._render_key(query)
+        if key in self._serialized:
+            return self._serialized[key]
+        data = codec.dumps(self._render_specification(key), self.json_dumps)
+        if key[0] != "shard" or key[1:] in self._shards:  # don't cache unknown shards
+            self._serialized[key] = data
         return data
 
+    def _render_key(
+        self, query: typing.Mapping[str, str]
+    ) -> typing.Tuple[str, str, bool]:
+        compact = self.compact or query.get("compact", "") in ("1", "true")
+        if self.shard_by and "shards" in query:
+            return ("shards", "", False)
+        elif self.shard_by and "shard" in query:
+            return ("shard", query["shard"], compact)
+        return ("", "", compact)
+
+    def _render_specification(self, key: typing.Tuple[str, str, bool]) -> typing.Dict:
+        kind, name, compact = key
+        if kind == "shards":
+            return self.get_specification_index()
+        elif kind == "shard":
+            return self.get_specification_shard(name, compact=compact)
+        elif compact:
+            return self.get_compact_specification()
+        return self.specification
+
+    def get_specification_index(self) -> typing.Dict:
+        if self._shard_index is None:
+            self._shard_index = {
+                "shards": [
+                    {
+                        "name": name,
+                        "url": f"{self.specification_url}?shard={quote(name)}",
+                    }
+                    for name in transform.shard_index(self.specification, self.shard_by)
+                ]
+            }
+        return self._shard_index
+
+    def get_specification_shard(self, name: str, compact=False) -> typing.Dict:
+        key = (name, compact)
+        if key not in self._shards:
+            shard = transform.build_shard(self.specification, self.shard_by, name)
+            if compact:
+                shard = transform.compact(shard)
+            if not shard["paths"]:  # don't cache unknown shards
+                return shard
+            self._shard_refs[key] = transform.reachable_refs(
+                self.specification, shard, unresolved=True
+            )
+            self._shards[key] = shard
+        return self._shards[key]
+
+    def get_compact_specification(self) -> typing.Dict:
+        """Pruned specification without descriptions, examples and extensions"""
+        if self._compact_specification is None:
+            self._compact_specification = transform.compact(
+                transform.prune(self.specification)
+            )
+        return self._compact_specification
+
+    def prune_specification(self):
+        """Remove reusable objects(eg: component schemas) no operation references"""
+        self.specification.update(transform.prune(self.specification))
+        self._clear_rendered()
+
+    def get_by_ref(self, ref: str) -> typing.Any:
+        return transform.get_by_ref(self.specification, ref)
+
     def expand_specification(self, obj: typing.Any) -> typing.Any:
+        # expand into new containers, the served specification keeps its refs
         if isinstance(obj, dict) and "$ref" in obj:
             return self.get_by_ref(obj["$ref"])
+        elif isinstance(obj, list):
+            return [self.expand_specification(o) for o in obj]
+        elif isinstance(obj, dict):
+            return {k: self.expand_specification(o) for k, o in obj.items()}
         else:
-            if isinstance(obj, list):
-                for i, o in enumerate(obj):
-                    obj[i] = self.expand_specification(o)
-            elif isinstance(obj, dict):
-                for i, o in obj.items():
-                    obj[i] = self.expand_specification(o)
             return obj
 
-    def validate_specification(self, schema_path=""):
+    def validate_specification(self, schema_path="", incremental=False):
+        """Validate the specification against OpenAPI's meta-schema
+
+        With `incremental`, only paths and components added, replaced or changed by
+        `add_path`/`add_schema` since the last successful validation are validated,
+        along with the top level fields.
+        """
         if not schema_path:
             if self.version[0] > 2:
                 schema_path = os.path.join(self.STATIC_DIR, "openapi3.1_schema.yaml")
             else:
                 schema_path = os.path.join(self.STATIC_DIR, "openapi2_schema.json")
 
-        jsonschema_rs.JSONSchema(self.load_file(schema_path)).validate(
-            self.specification
-        )
+        entries = dict(self._iter_entries())
+        if incremental and self._validated is not None:
+            specification = self._changed_specification(entries, self._validated)
+        else:
+            specification = self.specification
+        self._compile_schema_file(schema_path).validate(specification)
+        self._validated = entries
+        self._changed.clear()
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _compile_schema_file(schema_path: str) -> typing.Any:
+        # meta-schemas are compiled once per process
+        import jsonschema_rs
+
+        return jsonschema_rs.JSONSchema(Apiman.load_file(schema_path))
+
+    def _iter_entries(
+        self,
+    ) -> typing.Generator[typing.Tuple[typing.Tuple[str, ...], typing.Any], None, None]:
+        # every path item and component, keyed by their keys in the specification
+        for section in (("paths",),) + transform.ref_sections(self.specification):
+            items: typing.Any = self.specification
+            for k in section:
+                items = items.get(k, {}) if isinstance(items, dict) else {}
+            if isinstance(items, dict):
+                for name, value in items.items():
+                    yield section + (name,), value
+
+    def _changed_specification(
+        self,
+        entries: typing.Dict[typing.Tuple[str, ...], typing.Any],
+        validated: typing.Dict[typing.Tuple[str, ...], typing.Any],
+    ) -> typing.Dict:
+        sections = (("paths",),) + transform.ref_sections(self.specification)
+        specification = {
+            k: v
+            for k, v in self.specification.items()
+            if k not in {section[0] for section in sections}
+        }
+        for keys, value in entries.items():
+            if keys in self._changed or validated.get(keys) is not value:
+                target = specification
+                for k in keys[:-1]:
+                    target = target.setdefault(k, {})
+                target[keys[-1]] = value
+        # required sections, eg: swagger 2.0's paths
+        for k in self.specification.keys() & {"paths", "components"}:
+            specification.setdefault(k, {})
+        return specification
 
     def add_schema(self, name: str, definition: typing.Dict[str, typing.Any]):
         if self.version[0] > 2:
@@ -120,10 +400,14 @@ class Apiman:
             if "schemas" not in self.specification["components"]:
                 self.specification["components"]["schemas"] = {}
             self.specification["components"]["schemas"][name] = definition
+            self._changed.add(("components", "schemas", name))
+            self._invalidate(ref=f"#/components/schemas/{name}")
         else:
             if "definitions" not in self.specification:
                 self.specification["definitions"] = {}
             self.specification["definitions"][name] = definition
+            self._changed.add(("definitions", name))
+            self._invalidate(ref=f"#/definitions/{name}")
 
     def add_path(
         self, path: str, specification: typing.Dict, method: typing.Optional[str] = None
@@ -136,12 +420,216 @@ class Apiman:
         if method:
             self.specification["paths"][path][method.lower()] = specification
         else:
-            self.specification["paths"][path] = specification
+            # parsed documents are shared by handlers, methods added later go into
+            # this path's own item
+            self.specification["paths"][path] = dict(specification)
+        self._changed.add(("paths", path))
+        self._invalidate(path=path)
+
+    def _invalidate(self, path: str = "", ref: str = ""):
+        """Evict caches built from a changed path item or reusable object only"""
+        with self._lock:
+            self.revision += 1
+            self._interned.invalidate()
+            self._legacy_schemas.clear()
+            changed = {path or ref}
+            if ref:  # and the refs reaching it
+                self._referrers_known.discard(ref)
+                stack = [ref]
+                while stack:
+                    for referrer in self._referrers.get(stack.pop(), ()):
+                        if referrer not in changed:
+                            changed.add(referrer)
+                            stack.append(referrer)
+            for dependency in changed:
+                for cache_key in list(self._dependents.get(dependency, ())):
+                    self._path_schemas.pop(cache_key)
+            if path:  # including unknown operations
+                for method in self.HTTP_METHODS:
+                    self._path_schemas.pop((path, method))
+
+            shard_names: typing.Set[str] = set()
+            if path:
+                for method, operation in self.specification["paths"][path].items():
+                    if method in self.HTTP_METHODS:
+                        shard_names.update(
+                            transform.shard_names_of(path, operation, self.shard_by)
+                        )
+            for key, refs in list(self._shard_refs.items()):
+                if (
+                    ref in refs
+                    if ref
+                    else key[0] in shard_names or path in self._shards[key]["paths"]
+                ):
+                    del self._shards[key], self._shard_refs[key]
+                    self._serialized.pop(("shard",) + key, None)
+            if path:
+                self._shard_index = None
+                self._serialized.pop(("shards", "", False), None)
+            self._compact_specification = None
+            self._serialized.pop(("", "", False), None)
+            self._serialized.pop(("", "", True), None)
+
+    def _clear_rendered(self):
+        self.revision += 1
+        self._shards.clear()
+        self._shard_refs.clear()
+        self._shard_index = None
+        self._compact_specification = None
+        self._serialized.clear()
+
+    def iter_operations(self) -> typing.Generator[typing.Tuple[str, str], None, None]:
+        for path, item in self.specification.get("paths", {}).items():
+            for method in item:
+                if method in self.HTTP_METHODS:
+                    yield path, method
+
+    def schema_cache_info(self) -> typing.Dict[str, int]:
+        """Hits, misses, unknown operation hits and evictions of operation schemas,
+        and counts of interned schemas and their shared validators"""
+        return {**self._path_schemas.info(), **self._interned.info()}
+
+    def analyze_operations(
+        self, hits: typing.Optional[typing.Mapping[typing.Tuple[str, str], int]] = None
+    ) -> typing.List["OperationCost"]:
+        """Validation cost of every operation's request schemas, most expensive first
+
+        Costs are weighted by `hits`, request counts by (path, method), default to
+        validation counts of `metrics` when enabled. See `apiman.analyze`.
+        """
+        from .analyze import analyze
+
+        if hits is None and self.metrics is not None:
+            hits = self.metrics.operation_counts()
+        return analyze(self, hits=hits)
 
-    def _get_path_schema(self, path: str, method: str):
-        cache_key = f"{path}_{method}"
-        if cache_key in self._path_schemas:
-            return self._path_schemas[cache_key]
+    def memory_report(self) -> typing.Dict[str, typing.Dict[str, int]]:
+        """Approximate bytes held by the specification, request schemas, compiled
+        validators and rendered caches, see `apiman.memory`"""
+        from . import memory
+
+        return memory.report(self)
+
+    def load_path_schemas(self):
+        """Extract request schemas of all operations ahead of requests, sharing
+        identical ones"""
+        for path, method in self.iter_operations():
+            self._get_path_schema(path, method).intern()
+
+    def path_template(self, rule: str) -> str:
+        """OpenAPI path template of a framework route rule, memoized in `routes`"""
+        if rule not in self.routes:
+            self.routes[rule] = self._covert_path_rule(rule)
+        return self.routes[rule]
+
+    def _covert_path_rule(self, path: str) -> str:
+        return path
+
+    def _get_path_schema(self, path: str, method: str) -> OperationSchema:
+        cache_key = (path, method)
+        schema = self._path_schemas.get(cache_key)
+        if schema is not None:
+            return schema
+        with self._lock:
+            if cache_key in self._path_schemas:
+                return self._path_schemas.get(cache_key) or EMPTY_OPERATION
+            if method not in self.specification.get("paths", {}).get(path, {}):
+                self._path_schemas.set_missing(cache_key)
+                return EMPTY_OPERATION
+            schema = self._operation_schema(
+                path, method, self._build_path_schema(path, method)
+            )
+            self._set_path_schema(path, method, schema)
+            return schema
+
+    def _operation_schema(
+        self, path: str, method: str, schemas: typing.Dict[str, typing.Dict]
+    ) -> OperationSchema:
+        operation = self.specification["paths"][path][method]
+        return OperationSchema(
+            schemas,
+            self.VALIDATE_REQUEST_CONTENT_TYPES,
+            path=path,
+            method=method,
+            operation_id=operation.get("operationId", "")
+            if isinstance(operation, dict)
+            else "",
+            discriminators=self._discriminators(operation),
+            specification=self.specification,
+            interner=self._interned,
+        )
+
+    def _discriminators(
+        self, operation: typing.Any
+    ) -> typing.Dict[str, typing.Tuple[str, typing.Dict[str, typing.Any], bool]]:
+        # bodies dispatched by an OpenAPI 3 `discriminator`, read from the raw
+        # operation since expanded branches lose their schema names
+        discriminators: typing.Dict[
+            str, typing.Tuple[str, typing.Dict[str, typing.Any], bool]
+        ] = {}
+        if self.version[0] <= 2 or not isinstance(operation, dict):
+            return discriminators
+        for k, ts in self.VALIDATE_REQUEST_CONTENT_TYPES.items():
+            for t in ts:
+                try:
+                    body = transform.follow_ref(
+                        self.specification, operation["requestBody"]
+                    )
+                    d = transform.follow_ref(self.specification, body["content"][t])
+                    variants = transform.discriminator_variants(
+                        self.specification, d["schema"]
+                    )
+                except (KeyError, TypeError, ValueError):
+                    continue
+                if variants:
+                    discriminators[k] = variants
+        return discriminators
+
+    def _set_path_schema(self, path: str, method: str, schema: OperationSchema):
+        # cached until the path item or a ref it reaches changes, refs reached
+        # through other refs are found by `_referrers`
+        cache_key = (path, method)
+        refs = {
+            ref
+            for ref in transform.iter_refs(self.specification["paths"][path])
+            if ref.startswith("#/")
+        }
+        self._record_referrers(refs)
+        schema.dependencies = (path, *refs)
+        self._path_schemas.set(cache_key, schema)
+        for dependency in schema.dependencies:
+            self._dependents.setdefault(dependency, set()).add(cache_key)
+
+    def _record_referrers(self, refs: typing.Iterable[str]):
+        # ref graph edges, walked once per ref until it changes
+        stack = list(refs)
+        while stack:
+            ref = stack.pop()
+            if ref in self._referrers_known:
+                continue
+            self._referrers_known.add(ref)
+            try:
+                target = transform.get_by_ref(self.specification, ref)
+            except ValueError:  # unresolved, a dependency still
+                continue
+            for child in transform.iter_refs(target):
+                if child.startswith("#/"):
+                    self._referrers.setdefault(child, set()).add(ref)
+                    stack.append(child)
+
+    def _forget_dependencies(
+        self, cache_key: typing.Tuple[str, str], schema: OperationSchema
+    ):
+        for dependency in schema.dependencies:
+            dependents = self._dependents.get(dependency)
+            if dependents is not None:
+                dependents.discard(cache_key)
+                if not dependents:
+                    del self._dependents[dependency]
+
+    def _build_path_schema(
+        self, path: str, method: str
+    ) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
 
         schema: typing.Dict[str, typing.Dict[str, typing.Any]] = {
             "query": {},
@@ -159,16 +647,11 @@ class Apiman:
         ):
             return schema
         # parameters
-        base_schema: typing.Dict[str, typing.Any] = {
-            "type": "object",
-            "properties": {},
-            "required": [],
-        }
-        query_schema = copy.deepcopy(base_schema)
-        header_schema = copy.deepcopy(base_schema)
-        path_schema = copy.deepcopy(base_schema)
-        cookie_schema = copy.deepcopy(base_schema)
-        form_schema = copy.deepcopy(base_schema)
+        query_schema = self._object_schema()
+        header_schema = self._object_schema()
+        path_schema = self._object_schema()
+        cookie_schema = self._object_schema()
+        form_schema = self._object_schema()
         for d in self.specification["paths"][path][method].get("parameters", []):
             d = self.expand_specification(d)
             if d.get("in") == "query":
@@ -217,18 +700,36 @@ class Apiman:
                         schema[k] = d["schema"]
                     except KeyError:
                         pass
-        self._path_schemas[cache_key] = schema
         return schema
 
+    @staticmethod
+    def _object_schema() -> typing.Dict[str, typing.Any]:
+        return {"type": "object", "properties": {}, "required": []}
+
     def get_request_data(self, request: typing.Any, k: str) -> typing.Any:
         pass
 
     async def async_get_request_data(self, request: typing.Any, k: str) -> typing.Any:
         return self.get_request_data(request, k)
 
-    def get_request_schema(self, request: typing.Any) -> typing.Dict:
+    def get_request_schema(self, request: typing.Any) -> OperationSchema:
         raise NotImplementedError
 
+    def _request_operation(self, request: typing.Any) -> OperationSchema:
+        operation = self.get_request_schema(request)
+        if isinstance(operation, OperationSchema):
+            return operation
+        # a {location: schema} dict, wrapped once with its validators
+        try:
+            return self._legacy_schemas[id(operation)][1]
+        except KeyError:
+            pass
+        if len(self._legacy_schemas) >= self._path_schemas.max_size:
+            self._legacy_schemas.clear()
+        wrapped = OperationSchema(operation, self.VALIDATE_REQUEST_CONTENT_TYPES)
+        self._legacy_schemas[id(operation)] = (operation, wrapped)
+        return wrapped
+
     def get_request_content_type(self, request: typing.Any) -> str:
         return request.headers.get("Content-Type", "") or request.headers.get(
             "content-type", ""
@@ -237,39 +738,139 @@ class Apiman:
     def iter_request_schema(
         self, request: typing.Any, ignore: typing.Sequence[str] = tuple()
     ) -> typing.Generator[typing.Tuple[str, typing.Dict], None, None]:
-        _ignore = set(ignore)
-        schema = self.get_request_schema(request)
-        body_schema_count = body_miss_count = 0
-        for k, s in schema.items():
-            if not s or k in _ignore:
-                continue
-            if k in self.VALIDATE_REQUEST_CONTENT_TYPES:
-                body_schema_count += 1
-                if (
-                    self.get_request_content_type(request).split(";")[0]
-                    not in self.VALIDATE_REQUEST_CONTENT_TYPES[k]
-                ):
-                    body_miss_count += 1
-                    continue
-            yield k, s
-        if body_schema_count and body_schema_count == body_miss_count:
-            raise jsonschema_rs.ValidationError(
-                "Miss body content", "Miss body content", [], []
-            )
+        operation = self._request_operation(request)
+        for k in self._iter_locations(operation, request, ignore):
+            yield k, operation.schemas[k]
+
+    def _iter_locations(
+        self,
+        operation: OperationSchema,
+        request: typing.Any,
+        ignore: typing.Sequence[str],
+    ) -> typing.Generator[str, None, None]:
+        # locations to validate, the request's body location by its content type
+        if operation.empty:
+            return
+        for k in operation.parameters:
+            if k not in ignore:
+                yield k
+        if operation.bodies:
+            content_type = self.get_request_content_type(request).split(";")[0]
+            matched = False
+            for k in operation.bodies.get(content_type, ()):
+                if k not in ignore:
+                    matched = True
+                    yield k
+            if not matched and any(k not in ignore for k in operation.body_locations):
+                import jsonschema_rs
+
+                raise jsonschema_rs.ValidationError(
+                    "Miss body content", "Miss body content", [], []
+                )
 
     def validate_request(
         self, request: typing.Any, ignore: typing.Sequence[str] = tuple()
     ):
-        for k, s in self.iter_request_schema(request, ignore=ignore):
-            data = self.get_request_data(request, k)
-            jsonschema_rs.JSONSchema(s).validate(data)
+        if self.metrics is not None or self.validation_hooks:
+            return self._observed_validate_request(request, ignore)
+        operation = self._request_operation(request)
+        for k in self._iter_locations(operation, request, ignore):
+            operation.validator(k).validate(self.get_request_data(request, k))
 
     async def async_validate_request(
         self, request: typing.Any, ignore: typing.Sequence[str] = tuple()
     ):
-        for k, s in self.iter_request_schema(request, ignore=ignore):
+        if self.metrics is not None or self.validation_hooks:
+            return await self._async_observed_validate_request(request, ignore)
+        operation = self._request_operation(request)
+        for k in self._iter_locations(operation, request, ignore):
             data = await self.async_get_request_data(request, k)
-            jsonschema_rs.JSONSchema(s).validate(data)
+            operation.validator(k).validate(data)
+
+    def add_validation_hook(self, hook: typing.Callable[[ValidationTrace], None]):
+        """Call `hook` with the phase timings of every validated operation"""
+        self.validation_hooks.append(hook)
+
+    def _observed_validate_request(
+        self, request: typing.Any, ignore: typing.Sequence[str]
+    ):
+        # validate_request with metrics and validation hooks
+        trace = ValidationTrace(time.perf_counter())
+        t = trace.start
+        operation = self._request_operation(request)
+        t = trace.record("resolve", "", t)
+        location = "body"  # "Miss body content"
+        try:
+            for location in self._iter_locations(operation, request, ignore):
+                data = trace.data[location] = self.get_request_data(request, location)
+                t = trace.record(
+                    "parse" if location in operation.body_locations else "extract",
+                    location,
+                    t,
+                )
+                operation.validator(location).validate(data)
+                t = trace.record("validate", location, t)
+                location = "body"
+        except Exception as e:
+            trace.error = e
+            raise
+        finally:
+            self._observe(trace, operation, location)
+
+    async def _async_observed_validate_request(
+        self, request: typing.Any, ignore: typing.Sequence[str]
+    ):
+        trace = ValidationTrace(time.perf_counter())
+        t = trace.start
+        operation = self._request_operation(request)
+        t = trace.record("resolve", "", t)
+        location = "body"  # "Miss body content"
+        try:
+            for location in self._iter_locations(operation, request, ignore):
+                data = await self.async_get_request_data(request, location)
+                trace.data[location] = data
+                t = trace.record(
+                    "parse" if location in operation.body_locations else "extract",
+                    location,
+                    t,
+                )
+                operation.validator(location).validate(data)
+                t = trace.record("validate", location, t)
+                location = "body"
+        except Exception as e:
+            trace.error = e
+            raise
+        finally:
+            self._observe(trace, operation, location)
+
+    def _observe(
+        self, trace: ValidationTrace, operation: OperationSchema, failed_location: str
+    ):
+        if not operation.path:  # documented operations only
+            return
+        trace.operation = operation
+        trace.seconds = time.perf_counter() - trace.start
+        if self.metrics is not None:
+            for phase, location, _, _ in trace.phases:
+                if phase == "validate":
+                    self.metrics.count(operation.path, operation.method, location)
+            if trace.error is not None:
+                self.metrics.count(
+                    operation.path, operation.method, failed_location, failed=True
+                )
+            self.metrics.observe(operation.path, operation.method, trace.seconds)
+        for hook in self.validation_hooks:
+            try:
+                hook(trace)
+            except Exception:
+                logger.exception("Validation hook %r failed", hook)
+
+    def render_metrics(self) -> bytes:
+        """Prometheus text exposition of validation and schema cache metrics"""
+        assert self.metrics is not None, "Metrics are disabled"
+        return self.metrics.render(
+            {f"schema_cache_{k}": v for k, v in self.schema_cache_info().items()}
+        )
 
     def from_file(self, file_path: str) -> typing.Callable:
         def decorator(func: typing.Callable) -> typing.Callable:
@@ -293,10 +894,65 @@ class Apiman:
         return decorator
 
     def parse(self, func: typing.Callable) -> typing.Dict[str, typing.Any]:
+        try:
+            return self._parsed[func]
+        except KeyError:
+            specification = self._parse(func)
+            self._parsed[func] = specification
+            return specification
+        except TypeError:  # not weak referenceable
+            return self._parse(func)
+
+    def parse_many(self, handlers: typing.Iterable[typing.Any]):
+        """Parse view functions and classes (with their http method functions)
+
+        Functions sharing the same documents are parsed once, unique documents are
+        parsed by `load_workers` threads.
+        """
+        groups: typing.Dict[typing.Tuple, typing.List[typing.Callable]] = {}
+        for handler in handlers:
+            funcs = [handler]
+            if isinstance(handler, type):
+                funcs.extend(
+                    getattr(handler, self.HANDLER_METHOD.format(method), None)
+                    for method in self.HTTP_METHODS
+                )
+            for func in funcs:
+                try:
+                    if func is None or func in self._parsed:
+                        continue
+                except TypeError:
+                    continue
+                groups.setdefault(self._parse_key(func), []).append(func)
+
+        funcs = [group[0] for group in groups.values()]
+        if self.load_workers > 1 and len(funcs) > 1:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(min(self.load_workers, len(funcs))) as pool:
+                specifications = list(pool.map(self._parse, funcs))
+        else:
+            specifications = [self._parse(func) for func in funcs]
+        for group, specification in zip(groups.values(), specifications):
+            for func in group:
+                self._parsed[func] = specification
+
+    def _parse_key(self, func: typing.Callable) -> typing.Tuple:
+        # everything `_parse` reads
+        return (
+            func.__doc__,
+            getattr(func, self.SPECIFICATION_YAML, None),
+            id(getattr(func, self.SPECIFICATION_DICT, None)),
+            getattr(func, self.SPECIFICATION_FILE, None),
+        )
+
+    def _parse(self, func: typing.Callable) -> typing.Dict[str, typing.Any]:
         specification = {}
         if func.__doc__:
+            import yaml
+
             try:
-                specification = yaml.safe_load(func.__doc__.split("---")[-1])
+                specification = self.parse_yaml(func.__doc__.split("---")[-1])
             except yaml.error.YAMLError:
                 specification = {}
             if not isinstance(specification, dict):
@@ -304,32 +960,62 @@ class Apiman:
         if specification:
             return specification
         elif hasattr(func, self.SPECIFICATION_YAML):
-            return yaml.safe_load(getattr(func, self.SPECIFICATION_YAML))
+            return self.parse_yaml(getattr(func, self.SPECIFICATION_YAML))
         elif hasattr(func, self.SPECIFICATION_DICT):
             return getattr(func, self.SPECIFICATION_DICT)
         elif hasattr(func, self.SPECIFICATION_FILE):
-            return self.load_file(getattr(func, self.SPECIFICATION_FILE))
+            return self.parse_file(getattr(func, self.SPECIFICATION_FILE))
         else:
             return specification
 
-    def generate_specification_file(self, filename: str):
-        with open(filename, "w") as f:
-            f.writelines(
-                json.dumps(self.specification)
-                if filename.endswith("json")
-                else yaml.safe_dump(self.specification)
+    def parse_yaml(self, content: str) -> typing.Any:
+        if self.parse_cache is None:
+            return codec.yaml_load(content)
+        return self.parse_cache.load(
+            self.parse_cache.text_key(content), lambda: codec.yaml_load(content)
+        )
+
+    def parse_file(self, file_path: str) -> typing.Dict:
+        file_path = os.path.abspath(file_path)
+        stat = os.stat(file_path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        parsed = self._parsed_files.get(file_path)
+        if parsed and parsed[0] == version:
+            return parsed[1]
+
+        if self.parse_cache is None:
+            specification = self.load_file(file_path, json_loads=self.json_loads)
+        else:
+            specification = self.parse_cache.load(
+                self.parse_cache.file_key(file_path),
+                lambda: self.load_file(file_path, json_loads=self.json_loads),
             )
+        self._parsed_files[file_path] = (version, specification)
+        return specification
+
+    def generate_specification_file(self, filename: str):
+        data = (
+            codec.dumps(self.specification, self.json_dumps)
+            if filename.endswith("json")
+            else codec.yaml_dump(self.specification).encode()
+        )
+        with open(filename, "wb") as f:
+            f.write(data)
 
     @staticmethod
-    def load_file(file_path: str) -> typing.Dict:
+    def load_file(
+        file_path: str, json_loads: codec.JSONLoads = codec.json_loads
+    ) -> typing.Dict:
         with open(file_path) as f:
             if file_path.endswith("json"):
-                return json.load(f)
+                return json_loads(f.read())
             else:
-                return yaml.safe_load(f)
+                return codec.yaml_load(f)
 
     @staticmethod
     def xmltodict(content: typing.Union[str, bytes]):
+        import xmltodict
+
         data = xmltodict.parse(content)
 
         for k in list(data.keys()):
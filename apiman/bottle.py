@@ -1,9 +1,11 @@
 import typing
 
-from bottle import Bottle, Request
-from jinja2 import Template
+from bottle import Bottle, HTTPResponse, Request, request
 
+from .assets import Asset
 from .base import Apiman as _Apiman
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from .operation import OperationSchema
 
 
 class Apiman(_Apiman):
@@ -31,31 +33,49 @@ class Apiman(_Apiman):
     ...     return jsonify(list(DOGS.values()))
     """
 
-    def init_app(self, app: Bottle):
+    def init_app(self, app: Bottle, artifact: str = ""):
         app.add_hook("before_request", lambda: self.load_specification(app))
 
         if self.swagger_template and self.swagger_url:
-            swagger_html = Template(open(self.swagger_template).read()).render(
-                self.config
-            )
+            swagger_html = self.render_template(self.swagger_template)
             self.route(
                 app,
                 self.swagger_url,
                 lambda: swagger_html,
             )
         if self.redoc_template and self.redoc_template:
-            redoc_html = Template(open(self.redoc_template).read()).render(self.config)
+            redoc_html = self.render_template(self.redoc_template)
             self.route(app, self.redoc_url, lambda: redoc_html)
         if self.specification_url:
             self.route(
                 app,
                 self.specification_url,
-                lambda: self.load_specification(app),
+                lambda: HTTPResponse(
+                    self.serialize_specification(app, request.query),
+                    headers={"Content-Type": "application/json"},
+                ),
+            )
+        if self.metrics is not None and self.metrics_url:
+            self.route(
+                app,
+                self.metrics_url,
+                lambda: HTTPResponse(
+                    self.render_metrics(),
+                    headers={"Content-Type": METRICS_CONTENT_TYPE},
+                ),
             )
+        for asset in self.assets.values():
+            self.route(app, asset.url, lambda asset=asset: self._asset_response(asset))
+        if artifact:
+            self.load_artifact(artifact)
 
-    def get_request_schema(self, request: Request) -> typing.Dict:
+    def _asset_response(self, asset: Asset) -> HTTPResponse:
+        body, headers = asset.response(request.get_header("Accept-Encoding", ""))
+        return HTTPResponse(body, headers=headers)
+
+    def get_request_schema(self, request: Request) -> OperationSchema:
         return self._get_path_schema(
-            self._covert_path_rule(request.route.rule), request.method.lower()
+            self.path_template(request.route.rule), request.method.lower()
         )
 
     def get_request_data(self, request: Request, k: str) -> typing.Any:
@@ -76,22 +96,19 @@ class Apiman(_Apiman):
         else:
             return {}
 
-    def load_specification(self, app: Bottle) -> typing.Dict:
-        if not self.loaded:
-            for route in app.routes:
-                func = route.callback
-                specification = self.parse(func)
-                if not specification:
-                    continue
-                if (
-                    set(specification.keys()) & self.HTTP_METHODS
-                ):  # multi method description
-                    self.add_path(route.rule, specification)
-                elif route.method.lower() in self.HTTP_METHODS:
-                    self.add_path(route.rule, specification, method=route.method)
-            return self._load_specification()
-        else:
-            return self.specification
+    def _load_routes(self, app: Bottle):
+        self.parse_many(route.callback for route in app.routes)
+        for route in app.routes:
+            func = route.callback
+            specification = self.parse(func)
+            if not specification:
+                continue
+            if (
+                set(specification.keys()) & self.HTTP_METHODS
+            ):  # multi method description
+                self.add_path(route.rule, specification)
+            elif route.method.lower() in self.HTTP_METHODS:
+                self.add_path(route.rule, specification, method=route.method)
 
     def route(self, app: Bottle, url: str, func):
         app.route(url)(func)
@@ -99,9 +116,7 @@ class Apiman(_Apiman):
     def add_path(
         self, path: str, specification: typing.Dict, method: typing.Optional[str] = None
     ):
-        return super().add_path(
-            self._covert_path_rule(path), specification, method=method
-        )
+        return super().add_path(self.path_template(path), specification, method=method)
 
     def _covert_path_rule(self, path: str) -> str:
         # covert flask variable rules, eg "/path/<id:int>" to "/path/{id}"
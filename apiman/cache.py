@@ -0,0 +1,116 @@
+import hashlib
+import marshal
+import os
+import sys
+import typing
+
+
+class ParseCache:
+    """On disk cache of parsed specifications, shared by worker processes
+
+    Entries are keyed by content hash(docstring/yaml text) or by file path, mtime and
+    size, stored in marshal format(keeps int keys like `200:` which json would not),
+    written atomically and evicted oldest first beyond `max_size` bytes.
+    """
+
+    SUFFIX = ".marshal"
+
+    def __init__(self, directory: str, max_size: int = 64 * 1024 * 1024):
+        # marshal format is python version specific
+        self.directory = os.path.join(
+            directory, f"py{sys.version_info[0]}{sys.version_info[1]}"
+        )
+        self.max_size = max_size
+        self._size: typing.Optional[int] = None
+
+    @staticmethod
+    def text_key(text: str) -> str:
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    @staticmethod
+    def file_key(file_path: str) -> str:
+        stat = os.stat(file_path)
+        return hashlib.sha256(
+            f"{os.path.abspath(file_path)}:{stat.st_mtime_ns}:{stat.st_size}".encode()
+        ).hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def get(self, key: str) -> typing.Any:
+        try:
+            with open(self.path(key), "rb") as f:
+                return marshal.load(f)
+        except FileNotFoundError:
+            raise KeyError(key)
+        except (EOFError, ValueError, TypeError):  # broken entry
+            self._remove(self.path(key))
+            raise KeyError(key)
+
+    def set(self, key: str, value: typing.Any):
+        try:
+            data = marshal.dumps(value)
+        except ValueError:  # eg: yaml timestamp
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        size = self.size()
+        try:
+            size -= os.stat(self.path(key)).st_size
+        except FileNotFoundError:
+            pass
+        import tempfile
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path(key))
+        except OSError:
+            self._remove(tmp_path)
+            return
+        self._size = size + len(data)
+        if self._size > self.max_size:
+            self.evict()
+
+    def load(self, key: str, loader: typing.Callable[[], typing.Any]) -> typing.Any:
+        try:
+            return self.get(key)
+        except KeyError:
+            value = loader()
+            self.set(key, value)
+            return value
+
+    def entries(self) -> typing.List[os.DirEntry]:
+        try:
+            return [
+                e for e in os.scandir(self.directory) if e.name.endswith(self.SUFFIX)
+            ]
+        except FileNotFoundError:
+            return []
+
+    def size(self) -> int:
+        if self._size is None:
+            self._size = sum(e.stat().st_size for e in self.entries())
+        return self._size
+
+    def evict(self):
+        entries = sorted(self.entries(), key=lambda e: e.stat().st_mtime)
+        size = sum(e.stat().st_size for e in entries)
+        # leave some room to avoid evicting on every write
+        while entries and size > self.max_size * 0.9:
+            entry = entries.pop(0)
+            size -= entry.stat().st_size
+            self._remove(entry.path)
+        self._size = size
+
+    def clear(self):
+        for entry in self.entries():
+            self._remove(entry.path)
+        self._size = 0
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,56 @@
+import functools
+import json
+import typing
+
+JSONLoads = typing.Callable[[typing.Union[str, bytes]], typing.Any]
+JSONDumps = typing.Callable[[typing.Any], typing.Union[str, bytes]]
+
+
+@functools.lru_cache(maxsize=None)
+def _yaml() -> typing.Tuple[typing.Any, typing.Any, typing.Any]:
+    # imported on first use
+    import yaml
+
+    try:  # libyaml bindings, several times faster than the pure python ones
+        return yaml, yaml.CSafeLoader, yaml.CSafeDumper
+    except AttributeError:  # pragma: no cover
+        return yaml, yaml.SafeLoader, yaml.SafeDumper
+
+
+def yaml_load(stream: typing.Any) -> typing.Any:
+    yaml, loader, _ = _yaml()
+    return yaml.load(stream, Loader=loader)
+
+
+def yaml_dump(data: typing.Any) -> str:
+    yaml, _, dumper = _yaml()
+    return yaml.dump(data, Dumper=dumper)
+
+
+def json_loads(content: typing.Union[str, bytes]) -> typing.Any:
+    return json.loads(content)
+
+
+def _default(obj: typing.Any) -> str:
+    # yaml scalars json can't hold, eg: `example: 2021-01-01`
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    return str(obj)
+
+
+def json_dumps(data: typing.Any) -> bytes:
+    return json.dumps(
+        data, ensure_ascii=False, separators=(",", ":"), default=_default
+    ).encode()
+
+
+def dumps(data: typing.Any, backend: JSONDumps = json_dumps) -> bytes:
+    """`backend(data)` as bytes, by `json_dumps` if the backend can't serialize
+    `data`, eg: orjson and integer keys of yaml(`200:`)"""
+    try:
+        dumped = backend(data)
+    except TypeError:  # orjson.JSONEncodeError too
+        if backend is json_dumps:
+            raise
+        return json_dumps(data)
+    return dumped.encode() if isinstance(dumped, str) else dumped
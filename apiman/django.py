@@ -1,14 +1,18 @@
-import json
 import os
 import typing
 
 from django.conf import settings
 from django.http.request import HttpRequest
-from django.http.response import HttpResponse, JsonResponse
+from django.http.response import HttpResponse
 from django.urls import get_resolver
-from jinja2 import Template
+from django.utils.module_loading import import_string
 
+from .assets import Asset
 from .base import Apiman as _Apiman
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from .metrics import Metrics
+from .operation import OperationSchema
+from .trace import SlowValidationLog
 
 
 class Apiman(_Apiman):
@@ -51,6 +55,18 @@ class Apiman(_Apiman):
         swagger_template=os.path.join(_Apiman.STATIC_DIR, "swagger.html"),
         redoc_template=os.path.join(_Apiman.STATIC_DIR, "redoc.html"),
         template=os.path.join(_Apiman.STATIC_DIR, "template.yaml"),
+        static_dir="",
+        static_url="/apiman/static/",
+        shard_by="",
+        compact=False,
+        cache_dir="",
+        json_loads=None,
+        json_dumps=None,
+        load_workers=1,
+        schema_cache_size=8192,
+        metrics=False,
+        metrics_url="/apiman/metrics/",
+        slow_validation_ms=0,
     ):
         super().__init__(
             title=title,
@@ -60,10 +76,22 @@ class Apiman(_Apiman):
             swagger_template=swagger_template,
             redoc_template=redoc_template,
             template=template,
+            static_dir=static_dir,
+            static_url=static_url,
+            shard_by=shard_by,
+            compact=compact,
+            cache_dir=cache_dir,
+            json_loads=json_loads,
+            json_dumps=json_dumps,
+            load_workers=load_workers,
+            schema_cache_size=schema_cache_size,
+            metrics=metrics,
+            metrics_url=metrics_url,
+            slow_validation_ms=slow_validation_ms,
         )
         self.views: typing.Dict[str, typing.Callable] = {}
 
-    def init_app(self):
+    def init_app(self, artifact: str = ""):
         for key in (
             "title",
             "specification_url",
@@ -72,31 +100,81 @@ class Apiman(_Apiman):
             "swagger_template",
             "redoc_template",
             "template",
+            "static_dir",
+            "static_url",
+            "shard_by",
+            "compact",
+            "cache_dir",
+            "load_workers",
+            "metrics_url",
         ):
             k = f"APIMAN_{key.upper()}"
             if hasattr(settings, k):
                 setattr(self, key, getattr(settings, k))
+        for key in ("json_loads", "json_dumps"):
+            # a callable or its dotted path, eg: "orjson.loads"
+            k = f"APIMAN_{key.upper()}"
+            if hasattr(settings, k):
+                func = getattr(settings, k)
+                setattr(
+                    self, key, import_string(func) if isinstance(func, str) else func
+                )
+        if getattr(settings, "APIMAN_METRICS", False) and self.metrics is None:
+            self.metrics = Metrics()
+        if getattr(settings, "APIMAN_SLOW_VALIDATION_MS", 0):
+            self.add_validation_hook(
+                SlowValidationLog(
+                    settings.APIMAN_SLOW_VALIDATION_MS, json_dumps=self.json_dumps
+                )
+            )
+        if hasattr(settings, "APIMAN_TEMPLATE"):
+            self.specification = self.load_file(
+                self.template, json_loads=self.json_loads
+            )
 
         if self.swagger_template and self.swagger_url:
-            swagger_html = Template(open(self.swagger_template).read()).render(
-                self.config
-            )
+            swagger_html = self.render_template(self.swagger_template)
             self.route(
                 self.swagger_url,
-                lambda: HttpResponse(swagger_html),
+                lambda _: HttpResponse(swagger_html),
             )
         if self.redoc_template and self.redoc_template:
-            redoc_html = Template(open(self.redoc_template).read()).render(self.config)
-            self.route(self.redoc_url, lambda: HttpResponse(redoc_html))
+            redoc_html = self.render_template(self.redoc_template)
+            self.route(self.redoc_url, lambda _: HttpResponse(redoc_html))
         if self.specification_url:
             self.route(
                 self.specification_url,
-                lambda: JsonResponse(self.load_specification(None)),
+                lambda request: HttpResponse(
+                    self.serialize_specification(None, request.GET),
+                    content_type="application/json",
+                ),
+            )
+        if self.metrics is not None and self.metrics_url:
+            self.route(
+                self.metrics_url,
+                lambda _: HttpResponse(
+                    self.render_metrics(), content_type=METRICS_CONTENT_TYPE
+                ),
             )
+        for asset in self.assets.values():
+            self.route(
+                asset.url,
+                lambda request, asset=asset: self._asset_response(asset, request),
+            )
+        artifact = getattr(settings, "APIMAN_ARTIFACT", artifact)
+        if artifact:
+            self.load_artifact(artifact)
 
-    def get_request_schema(self, request: HttpRequest) -> typing.Dict:
+    def _asset_response(self, asset: Asset, request: HttpRequest) -> HttpResponse:
+        body, headers = asset.response(request.headers.get("Accept-Encoding", ""))
+        response = HttpResponse(body, content_type=headers.pop("Content-Type"))
+        for k, v in headers.items():
+            response[k] = v
+        return response
+
+    def get_request_schema(self, request: HttpRequest) -> OperationSchema:
         return self._get_path_schema(
-            "/" + self._covert_path_rule(request.resolver_match.route),
+            "/" + self.path_template(request.resolver_match.route),
             request.method.lower(),
         )
 
@@ -110,7 +188,7 @@ class Apiman(_Apiman):
         elif k == "header":
             return dict(request.headers)
         elif k == "json":
-            return json.loads(request.body)
+            return self.json_loads(request.body)
         elif k == "form":
             return dict(request.POST)
         elif k == "xml":
@@ -118,6 +196,13 @@ class Apiman(_Apiman):
         else:
             return {}
 
+    def _iter_views(self, pattern) -> typing.Iterator:
+        if hasattr(pattern, "url_patterns"):
+            for p in pattern.url_patterns:
+                yield from self._iter_views(p)
+        elif hasattr(pattern.pattern, "_route"):
+            yield getattr(pattern.callback, "view_class", pattern.callback)
+
     def _load_pattern_specification(self, pattern, base_path: str = "/"):
         if hasattr(pattern, "url_patterns"):
             for p in pattern.url_patterns:
@@ -134,7 +219,7 @@ class Apiman(_Apiman):
                 specification = self.parse(func.view_class)  # type: ignore
                 self.add_path(path, specification)
                 # from class methods
-                for method in self.HTTP_METHODS:
+                for method in sorted(self.HTTP_METHODS):
                     _func = getattr(func.view_class, method, None)  # type: ignore
                     if _func:
                         specification = self.parse(_func)
@@ -147,12 +232,9 @@ class Apiman(_Apiman):
                 ):  # multi method description
                     self.add_path(path, specification)
 
-    def load_specification(self, _) -> typing.Dict:
-        if not self.loaded:
-            self._load_pattern_specification(get_resolver())
-            return self._load_specification()
-        else:
-            return self.specification
+    def _load_routes(self, _):
+        self.parse_many(self._iter_views(get_resolver()))
+        self._load_pattern_specification(get_resolver())
 
     def route(self, url: str, func):
         self.views[url] = func
@@ -160,9 +242,7 @@ class Apiman(_Apiman):
     def add_path(
         self, path: str, specification: typing.Dict, method: typing.Optional[str] = None
     ):
-        return super().add_path(
-            self._covert_path_rule(path), specification, method=method
-        )
+        return super().add_path(self.path_template(path), specification, method=method)
 
     def _covert_path_rule(self, path: str) -> str:
         # covert django variable rules, eg "/path/<int:id>" to "/path/{id}"
@@ -186,9 +266,9 @@ class Middleware:
 
     def __call__(self, request: HttpRequest):
         apiman.load_specification(None)
-        url = request.get_full_path()
+        url = request.path
         if url in apiman.views:
-            return apiman.views[url]()
+            return apiman.views[url](request)
 
         else:
             return self.get_response(request)
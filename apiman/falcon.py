@@ -1,4 +1,3 @@
-import json
 import re
 import typing
 
@@ -6,9 +5,11 @@ from falcon import App, Request
 from falcon.asgi import App as ASGIApp
 from falcon.asgi import Request as ASGIRequest
 from falcon.routing.compiled import CompiledRouterNode
-from jinja2 import Template
 
+from .assets import Asset
 from .base import Apiman as _Apiman
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from .operation import OperationSchema
 
 
 class Apiman(_Apiman):
@@ -34,18 +35,17 @@ class Apiman(_Apiman):
     """
 
     PATH_VAR_REGEX = re.compile(r"\{(.*?)\}")
+    HANDLER_METHOD = "on_{}"
 
     @property
     def app(self) -> App:
         assert hasattr(self, "_app"), "call init_app first"
         return self._app
 
-    def init_app(self, app: App):
+    def init_app(self, app: App, artifact: str = ""):
         self._app = app
         if self.swagger_template and self.swagger_url:
-            swagger_html = Template(open(self.swagger_template).read()).render(
-                self.config
-            )
+            swagger_html = self.render_template(self.swagger_template)
             self.route(
                 app,
                 self.swagger_url,
@@ -55,7 +55,7 @@ class Apiman(_Apiman):
                 ),
             )
         if self.redoc_template and self.redoc_template:
-            redoc_html = Template(open(self.redoc_template).read()).render(self.config)
+            redoc_html = self.render_template(self.redoc_template)
             self.route(
                 app,
                 self.redoc_url,
@@ -69,17 +69,42 @@ class Apiman(_Apiman):
                 app,
                 self.specification_url,
                 lambda req, res: (
-                    setattr(res, "text", json.dumps(self.load_specification(app))),  # type: ignore
+                    setattr(res, "data", self.serialize_specification(app, req.params)),  # type: ignore
                     setattr(res, "content_type", "application/json"),  # type: ignore
                 ),
             )
+        if self.metrics is not None and self.metrics_url:
+            self.route(
+                app,
+                self.metrics_url,
+                lambda req, res: (
+                    setattr(res, "data", self.render_metrics()),  # type: ignore
+                    setattr(res, "content_type", METRICS_CONTENT_TYPE),  # type: ignore
+                ),
+            )
+        for asset in self.assets.values():
+            self.route(
+                app,
+                asset.url,
+                lambda req, res, asset=asset: self._asset_response(asset, req, res),
+            )
+        if artifact:
+            self.load_artifact(artifact)
+
+    def _asset_response(self, asset: Asset, req: Request, res):
+        res.data, headers = asset.response(req.get_header("Accept-Encoding") or "")
+        res.set_headers(headers)
 
-    def get_request_schema(self, request: Request) -> typing.Dict:
+    def get_request_schema(self, request: Request) -> OperationSchema:
         self.load_specification(None)
         return self._get_path_schema(
-            self._covert_path_rule(request.uri_template), request.method.lower()
+            self.path_template(request.uri_template), request.method.lower()
         )
 
+    def get_request_content_type(self, request: Request) -> str:
+        # falcon's header keys are upper case
+        return request.content_type or ""
+
     def get_request_data(self, request: Request, k: str) -> typing.Any:
         if k == "query":
             return request.params
@@ -102,6 +127,14 @@ class Apiman(_Apiman):
             await request.get_media()
         return self.get_request_data(request, k)
 
+    def _iter_resources(
+        self, nodes: typing.List[CompiledRouterNode]
+    ) -> typing.Iterator:
+        for n in nodes:
+            if n.resource:
+                yield n.resource.__class__
+            yield from self._iter_resources(n.children)
+
     def _load_node_specification(self, nodes: typing.List[CompiledRouterNode]):
         for n in nodes:
             if n.resource:
@@ -110,7 +143,7 @@ class Apiman(_Apiman):
                 if specification:
                     self.add_path(n.uri_template, specification)
                 # from class methods
-                for method in self.HTTP_METHODS:  # type: ignore
+                for method in sorted(self.HTTP_METHODS):  # type: ignore
                     _func = getattr(n.resource.__class__, f"on_{method.lower()}", None)  # type: ignore
                     if _func:
                         specification = self.parse(_func)
@@ -118,12 +151,9 @@ class Apiman(_Apiman):
                             self.add_path(n.uri_template, specification, method=method)
             self._load_node_specification(n.children)
 
-    def load_specification(self, _) -> typing.Dict:
-        if not self.loaded:
-            self._load_node_specification(self.app._router._roots)
-            return self._load_specification()
-        else:
-            return self.specification
+    def _load_routes(self, _):
+        self.parse_many(self._iter_resources(self.app._router._roots))
+        self._load_node_specification(self.app._router._roots)
 
     def route(self, app: App, url: str, func):
         class ASGIResource:
@@ -139,9 +169,7 @@ class Apiman(_Apiman):
     def add_path(
         self, path: str, specification: typing.Dict, method: typing.Optional[str] = None
     ):
-        return super().add_path(
-            self._covert_path_rule(path), specification, method=method
-        )
+        return super().add_path(self.path_template(path), specification, method=method)
 
     def _covert_path_rule(self, path: str) -> str:
         # covert flask variable rules, eg "/path/<int:id>" to "/path/{id}"
@@ -1,9 +1,11 @@
 import typing
 
-from flask import Flask, Request, Response, jsonify
-from jinja2 import Template
+from flask import Flask, Request, Response, request
 
+from .assets import Asset
 from .base import Apiman as _Apiman
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from .operation import OperationSchema
 
 
 class Apiman(_Apiman):
@@ -31,14 +33,12 @@ class Apiman(_Apiman):
     ...     return jsonify(list(DOGS.values()))
     """
 
-    def init_app(self, app: Flask):
+    def init_app(self, app: Flask, artifact: str = ""):
         app.extensions["apiman"] = self
         app.before_request(lambda: None if self.load_specification(app) else None)  # type: ignore
 
         if self.swagger_template and self.swagger_url:
-            swagger_html = Template(open(self.swagger_template).read()).render(
-                self.config
-            )
+            swagger_html = self.render_template(self.swagger_template)
             self.route(
                 app,
                 self.swagger_url,
@@ -46,19 +46,42 @@ class Apiman(_Apiman):
                 lambda: Response(swagger_html),
             )
         if self.redoc_template and self.redoc_template:
-            redoc_html = Template(open(self.redoc_template).read()).render(self.config)
+            redoc_html = self.render_template(self.redoc_template)
             self.route(app, self.redoc_url, "redoc_ui", lambda: Response(redoc_html))
         if self.specification_url:
             self.route(
                 app,
                 self.specification_url,
                 "apiman_specification",
-                lambda: jsonify(self.load_specification(app)),
+                lambda: Response(
+                    self.serialize_specification(app, request.args),
+                    mimetype="application/json",
+                ),
+            )
+        if self.metrics is not None and self.metrics_url:
+            self.route(
+                app,
+                self.metrics_url,
+                "apiman_metrics",
+                lambda: Response(self.render_metrics(), mimetype=METRICS_CONTENT_TYPE),
             )
+        for asset in self.assets.values():
+            self.route(
+                app,
+                asset.url,
+                f"apiman_static_{asset.name}",
+                lambda asset=asset: self._asset_response(asset),
+            )
+        if artifact:
+            self.load_artifact(artifact)
+
+    def _asset_response(self, asset: Asset) -> Response:
+        body, headers = asset.response(request.headers.get("Accept-Encoding", ""))
+        return Response(body, headers=headers)
 
-    def get_request_schema(self, request: Request) -> typing.Dict:
+    def get_request_schema(self, request: Request) -> OperationSchema:
         if request.url_rule:
-            path = self._covert_path_rule(request.url_rule.rule)
+            path = self.path_template(request.url_rule.rule)
         else:
             path = request.path
         return self._get_path_schema(path, request.method.lower())
@@ -81,37 +104,36 @@ class Apiman(_Apiman):
         else:
             return {}
 
-    def load_specification(self, app: Flask) -> typing.Dict:
-        if not self.loaded:
-            for route in app.url_map.iter_rules():
-                func = app.view_functions[route.endpoint]
-                if hasattr(func, "view_class"):  # view class
-                    # from class
-                    specification = self.parse(func.view_class)  # type: ignore
-                    if specification:
-                        self.add_path(route.rule, specification)
-                    # from class methods
-                    for method in route.methods:  # type: ignore
-                        _func = getattr(func.view_class, method.lower(), None)  # type: ignore
-                        if _func:
-                            specification = self.parse(_func)
-                            if specification:
-                                self.add_path(route.rule, specification, method=method)
-                else:  # view function
-                    specification = self.parse(func)
-                    if not specification:
-                        continue
-                    if (
-                        set(specification.keys()) & self.HTTP_METHODS
-                    ):  # multi method description
-                        self.add_path(route.rule, specification)
-                    else:
-                        for method in route.methods:  # type: ignore
-                            if method.lower() in self.HTTP_METHODS:
-                                self.add_path(route.rule, specification, method=method)
-            return self._load_specification()
-        else:
-            return self.specification
+    def _load_routes(self, app: Flask):
+        self.parse_many(
+            getattr(func, "view_class", func) for func in app.view_functions.values()
+        )
+        for route in app.url_map.iter_rules():
+            func = app.view_functions[route.endpoint]
+            if hasattr(func, "view_class"):  # view class
+                # from class
+                specification = self.parse(func.view_class)  # type: ignore
+                if specification:
+                    self.add_path(route.rule, specification)
+                # from class methods
+                for method in sorted(route.methods):  # type: ignore
+                    _func = getattr(func.view_class, method.lower(), None)  # type: ignore
+                    if _func:
+                        specification = self.parse(_func)
+                        if specification:
+                            self.add_path(route.rule, specification, method=method)
+            else:  # view function
+                specification = self.parse(func)
+                if not specification:
+                    continue
+                if (
+                    set(specification.keys()) & self.HTTP_METHODS
+                ):  # multi method description
+                    self.add_path(route.rule, specification)
+                else:
+                    for method in sorted(route.methods):  # type: ignore
+                        if method.lower() in self.HTTP_METHODS:
+                            self.add_path(route.rule, specification, method=method)
 
     def route(self, app: Flask, url: str, endpoint: str, func):
         app.route(url, endpoint=endpoint, methods=["GET"])(func)
@@ -119,9 +141,7 @@ class Apiman(_Apiman):
     def add_path(
         self, path: str, specification: typing.Dict, method: typing.Optional[str] = None
     ):
-        return super().add_path(
-            self._covert_path_rule(path), specification, method=method
-        )
+        return super().add_path(self.path_template(path), specification, method=method)
 
     def _covert_path_rule(self, path: str) -> str:
         # covert flask variable rules, eg "/path/<int:id>" to "/path/{id}"
@@ -0,0 +1,89 @@
+"""Approximate memory held by an Apiman instance
+
+Request schemas alias subtrees of the specification(`expand_specification` returns
+referenced objects in place), so objects are counted once: in the first section
+reaching them by `bytes`, in later ones by `shared`.
+"""
+import sys
+import typing
+
+from . import codec
+
+if typing.TYPE_CHECKING:  # pragma: no cover
+    from .base import Apiman
+
+
+class _Counter:
+    def __init__(self):
+        self.seen: typing.Set[int] = set()  # objects counted by earlier sections
+
+    def measure(self, *objs: typing.Any) -> typing.Dict[str, int]:
+        local: typing.Set[int] = set()
+        distinct = shared = objects = 0
+        stack = list(objs)
+        while stack:
+            obj = stack.pop()
+            if id(obj) in local:
+                continue
+            local.add(id(obj))
+            size = sys.getsizeof(obj)
+            objects += 1
+            if id(obj) in self.seen:
+                shared += size
+            else:
+                distinct += size
+            if isinstance(obj, dict):
+                stack.extend(obj.keys())
+                stack.extend(obj.values())
+            elif isinstance(obj, (list, tuple, set, frozenset)):
+                stack.extend(obj)
+        self.seen |= local
+        return {"bytes": distinct, "shared": shared, "objects": objects}
+
+
+def report(apiman: "Apiman") -> typing.Dict[str, typing.Dict[str, int]]:
+    """Sizes of the specification, request schemas, validators and rendered caches
+
+    Compiled validators live in native memory which Python can't see, their size is
+    approximated by the JSON size of their schemas.
+    """
+    counter = _Counter()
+    operations = list(apiman._path_schemas._data.values())
+    sections = {
+        "specification": counter.measure(apiman.specification),
+        "path_schemas": counter.measure(*(o.schemas for o in operations)),
+        "parsed": counter.measure(list(apiman._parsed.values()), apiman._parsed_files),
+        "rendered": counter.measure(
+            apiman._compact_specification,
+            apiman._shards,
+            apiman._shard_index,
+            apiman._shard_refs,
+        ),
+        "dependents": counter.measure(
+            apiman._dependents, apiman._referrers, apiman._referrers_known
+        ),
+    }
+    # shared validators are counted once
+    validators = {
+        id(v): (k, operation)
+        for operation in operations
+        for k, v in operation._validators.items()
+    }.values()
+    sections["validators"] = {
+        "bytes": sum(
+            len(codec.dumps(operation.schemas[k], apiman.json_dumps))
+            for k, operation in validators
+        ),
+        "shared": 0,
+        "objects": len(validators),
+    }
+    sections["serialized"] = {
+        "bytes": sum(sys.getsizeof(data) for data in apiman._serialized.values()),
+        "shared": 0,
+        "objects": len(apiman._serialized),
+    }
+    sections["total"] = {
+        k: sum(section[k] for section in sections.values())
+        for k in ("bytes", "shared", "objects")
+    }
+    return sections
@@ -0,0 +1,166 @@
+"""Request validation metrics in Prometheus text format
+
+Every thread writes its own counters without locking, they are summed up when
+rendered. Counters of finished threads are folded into one retired shard.
+"""
+import bisect
+import threading
+import typing
+import weakref
+
+# seconds
+BUCKETS = (
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _Shard:
+    __slots__ = ("validations", "failures", "buckets", "sums")
+
+    def __init__(self):
+        # {(path, method, location): count}
+        self.validations: typing.Dict[typing.Tuple[str, str, str], int] = {}
+        self.failures: typing.Dict[typing.Tuple[str, str, str], int] = {}
+        # {(path, method): [count of each bucket..., count of +Inf]}
+        self.buckets: typing.Dict[typing.Tuple[str, str], typing.List[int]] = {}
+        self.sums: typing.Dict[typing.Tuple[str, str], float] = {}
+
+    def merge(self, shard: "_Shard"):
+        for merged, counters in (
+            (self.validations, shard.validations),
+            (self.failures, shard.failures),
+        ):
+            for location_key, n in list(counters.items()):
+                merged[location_key] = merged.get(location_key, 0) + n
+        for key, counts in list(shard.buckets.items()):
+            total = self.buckets.setdefault(key, [0] * len(counts))
+            for i, n in enumerate(counts):
+                total[i] += n
+            self.sums[key] = self.sums.get(key, 0.0) + shard.sums.get(key, 0.0)
+
+
+class _Owner:
+    # kept in a thread's locals only, collected once the thread finishes
+    __slots__ = ("__weakref__",)
+
+
+class Metrics:
+    def __init__(self, buckets: typing.Sequence[float] = BUCKETS):
+        self.buckets = tuple(buckets)
+        self._local = threading.local()
+        self._retired = _Shard()
+        self._shards: typing.List[_Shard] = [self._retired]
+        # registering and retiring shards of threads, merging them
+        self._lock = threading.RLock()
+
+    def _shard(self) -> _Shard:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = _Shard()
+            owner = self._local.owner = _Owner()
+            weakref.finalize(owner, self._retire, shard).atexit = False
+            with self._lock:
+                self._shards.append(shard)
+            return shard
+
+    def _retire(self, shard: _Shard):
+        with self._lock:
+            try:
+                self._shards.remove(shard)
+            except ValueError:  # cleared
+                return
+            self._retired.merge(shard)
+
+    def count(self, path: str, method: str, location: str, failed: bool = False):
+        shard = self._shard()
+        counters = shard.failures if failed else shard.validations
+        key = (path, method, location)
+        counters[key] = counters.get(key, 0) + 1
+
+    def observe(self, path: str, method: str, seconds: float):
+        shard = self._shard()
+        key = (path, method)
+        buckets = shard.buckets.get(key)
+        if buckets is None:
+            buckets = shard.buckets[key] = [0] * (len(self.buckets) + 1)
+            shard.sums[key] = 0.0
+        buckets[bisect.bisect_left(self.buckets, seconds)] += 1
+        shard.sums[key] += seconds
+
+    def operation_counts(self) -> typing.Dict[typing.Tuple[str, str], int]:
+        """Validations by (path, method)"""
+        counts: typing.Dict[typing.Tuple[str, str], int] = {}
+        with self._lock:
+            for shard in self._shards:
+                for key, buckets in list(shard.buckets.items()):
+                    counts[key] = counts.get(key, 0) + sum(buckets)
+        return counts
+
+    def clear(self):
+        with self._lock:
+            self._retired = _Shard()
+            self._shards = [self._retired]
+            self._local = threading.local()
+
+    def render(self, extra: typing.Optional[typing.Dict[str, int]] = None) -> bytes:
+        """Prometheus text exposition, `extra` are rendered as `apiman_<name>` gauges"""
+        total = _Shard()
+        with self._lock:
+            for shard in self._shards:
+                total.merge(shard)
+        validations, failures = total.validations, total.failures
+        buckets, sums = total.buckets, total.sums
+
+        lines = []
+        for name, help, counters in (
+            ("apiman_validations_total", "Validated request locations", validations),
+            (
+                "apiman_validation_failures_total",
+                "Failed request validations by location",
+                failures,
+            ),
+        ):
+            lines += [f"# HELP {name} {help}", f"# TYPE {name} counter"]
+            for (path, method, location), n in sorted(counters.items()):
+                labels = _labels(path=path, method=method, location=location)
+                lines.append(f"{name}{{{labels}}} {n}")
+
+        name = "apiman_validation_duration_seconds"
+        lines += [
+            f"# HELP {name} Request validation latency",
+            f"# TYPE {name} histogram",
+        ]
+        for (path, method), counts in sorted(buckets.items()):
+            labels = _labels(path=path, method=method)
+            cumulative = 0
+            for le, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                bound = "+Inf" if le == float("inf") else repr(le)
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"{name}_sum{{{labels}}} {sums[(path, method)]!r}")
+            lines.append(f"{name}_count{{{labels}}} {cumulative}")
+
+        for k, v in (extra or {}).items():
+            lines += [f"# TYPE apiman_{k} gauge", f"apiman_{k} {v}"]
+        return ("\n".join(lines) + "\n").encode()
+
+
+def _labels(**labels: str) -> str:
+    return ",".join(
+        '{}="{}"'.format(
+            k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        for k, v in labels.items()
+    )
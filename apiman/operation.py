@@ -0,0 +1,456 @@
+import hashlib
+import json
+import threading
+import typing
+from collections import OrderedDict
+
+from . import transform
+
+
+class OperationSchema:
+    """Request validation schemas of one operation, read only once built
+
+    `schemas` keeps non-empty locations only, eg: {"query": {...}, "json": {...}},
+    `bodies` maps request media types to their body locations, `discriminators` are
+    (property name, {value: schema}, all branches mapped) of bodies dispatched by an
+    OpenAPI `discriminator`. Refs left in schemas resolve against `specification`.
+    With an `interner`, schemas and validators are shared with identical ones of
+    other operations, from their first validation on.
+    """
+
+    __slots__ = (
+        "path",
+        "method",
+        "operation_id",
+        "schemas",
+        "parameters",
+        "bodies",
+        "body_locations",
+        "empty",
+        "discriminators",
+        "dependencies",
+        "_specification",
+        "_interner",
+        "_keys",
+        "_validators",
+    )
+
+    def __init__(
+        self,
+        schemas: typing.Dict[str, typing.Dict[str, typing.Any]],
+        content_types: typing.Mapping[str, typing.Sequence[str]],
+        path: str = "",
+        method: str = "",
+        operation_id: str = "",
+        discriminators: typing.Optional[
+            typing.Dict[str, typing.Tuple[str, typing.Dict[str, typing.Any], bool]]
+        ] = None,
+        specification: typing.Optional[typing.Dict[str, typing.Any]] = None,
+        interner: typing.Optional["SchemaInterner"] = None,
+    ):
+        self.path = path  # empty for unknown operations
+        self.method = method
+        # `operationId`, default to "GET /path"
+        self.operation_id = operation_id or f"{method.upper()} {path}".strip()
+        self.schemas = {k: s for k, s in schemas.items() if s}
+        self._interner = interner
+        self._keys: typing.Dict[str, typing.Optional[bytes]] = {}
+        self.body_locations = tuple(k for k in content_types if k in self.schemas)
+        self.parameters = tuple(k for k in self.schemas if k not in content_types)
+        bodies: typing.Dict[str, typing.Tuple[str, ...]] = {}
+        for k in self.body_locations:
+            for t in content_types[k]:
+                bodies[t] = bodies.get(t, ()) + (k,)
+        self.bodies = bodies
+        self.empty = not self.schemas
+        self.discriminators = {
+            k: v for k, v in (discriminators or {}).items() if k in self.schemas
+        }
+        # paths and refs the schemas are built from directly, set once cached
+        self.dependencies: typing.Tuple[str, ...] = ()
+        self._specification = specification
+        self._validators: typing.Dict[str, typing.Any] = {}
+
+    def validator(self, k: str) -> typing.Any:
+        # compiled on first use, evicted with the operation schema
+        try:
+            return self._validators[k]
+        except KeyError:
+            interner = self._interner
+            if interner is None or self._intern(k) is None:
+                validator = self._build_validator(k)[0]
+            else:
+                validator = interner.validator(
+                    self._interner_key(k), lambda: self._build_validator(k)
+                )
+            self._validators[k] = validator
+            return validator
+
+    def compile_validators(self):
+        """Compile validators of all locations ahead of requests"""
+        for k in self.schemas:
+            validator = self.validator(k)
+            if isinstance(validator, DiscriminatedValidator):
+                for value in (None, *validator.variants):
+                    validator.validator(value)
+
+    def intern(self):
+        """Share the schemas of all locations ahead of their first validation"""
+        for k in list(self.schemas):
+            self._intern(k)
+
+    def _build_validator(self, k: str) -> typing.Tuple[typing.Any, bool]:
+        # (validator, whether built from referenced components)
+        if k in self.discriminators:
+            property_name, variants, complete = self.discriminators[k]
+            validator = DiscriminatedValidator(
+                self.schemas[k], property_name, variants, complete, self.compile
+            )
+            return validator, True
+        schema = self.schemas[k]
+        root = self._ref_root(schema)
+        return self._compile(schema, root), bool(root)
+
+    def _intern(self, k: str) -> typing.Optional[bytes]:
+        # hashed on first use, operations cached but never validated skip it
+        interner = self._interner
+        if interner is None:
+            return None
+        if k not in self._keys:
+            with interner.lock:  # counted once by racing threads
+                if self._interner is None:  # released
+                    return None
+                if k not in self._keys:
+                    self._keys[k], self.schemas[k] = interner.intern(self.schemas[k])
+        return self._keys[k]
+
+    def release(self):
+        """Give interned schemas back once evicted, locations validated later aren't
+        shared"""
+        interner = self._interner
+        if interner is not None:
+            with interner.lock:
+                self._interner = None
+                interner.release(self._keys.values())
+
+    def _interner_key(self, k: str) -> typing.Hashable:
+        if k not in self.discriminators:
+            return self._keys[k]
+        # the same schema may name its variants differently
+        property_name, variants, complete = self.discriminators[k]
+        return (
+            self._keys[k],
+            property_name,
+            tuple(sorted((name, id(v)) for name, v in variants.items())),
+            complete,
+        )
+
+    def compile(self, schema: typing.Dict[str, typing.Any]) -> typing.Any:
+        return self._compile(schema, self._ref_root(schema))
+
+    def _ref_root(self, schema: typing.Dict[str, typing.Any]) -> typing.Dict:
+        if not self._specification:
+            return {}
+        return transform.ref_root(self._specification, schema)
+
+    @staticmethod
+    def _compile(schema: typing.Dict[str, typing.Any], root: typing.Dict) -> typing.Any:
+        import jsonschema_rs
+
+        # jsonschema_rs resolves local refs against the schema itself
+        return jsonschema_rs.JSONSchema({**schema, **root} if root else schema)
+
+    def as_dict(self) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+        return dict(self.schemas)
+
+
+class DiscriminatedValidator:
+    """Validator of a `oneOf`/`anyOf` schema with an OpenAPI `discriminator`, data is
+    validated by the one variant its discriminator property names, by the whole schema
+    only without the property
+
+    Variants are compiled on first use. An unknown value fails unless some branches
+    are inline, which can't be named.
+    """
+
+    __slots__ = (
+        "property_name",
+        "variants",
+        "complete",
+        "_schema",
+        "_compile",
+        "_validators",
+    )
+
+    def __init__(
+        self,
+        schema: typing.Dict[str, typing.Any],
+        property_name: str,
+        variants: typing.Dict[str, typing.Any],
+        complete: bool,
+        compile: typing.Callable[[typing.Dict[str, typing.Any]], typing.Any],
+    ):
+        self.property_name = property_name
+        self.variants = variants
+        self.complete = complete
+        self._schema = schema
+        self._compile = compile
+        self._validators: typing.Dict[typing.Optional[str], typing.Any] = {}
+
+    def validator(self, value: typing.Optional[str]) -> typing.Any:
+        """Validator of a variant, of the whole schema for None"""
+        try:
+            return self._validators[value]
+        except KeyError:
+            if value is None:
+                schema = self._schema
+            else:
+                # sibling keywords(eg: shared properties) apply to every variant
+                common = {
+                    k: v
+                    for k, v in self._schema.items()
+                    if k not in ("oneOf", "anyOf", "discriminator")
+                }
+                schema = self.variants[value]
+                if common:
+                    schema = {"allOf": [common, schema]}
+            validator = self._validators[value] = self._compile(schema)
+            return validator
+
+    def validate(self, data: typing.Any):
+        value = data.get(self.property_name) if isinstance(data, dict) else None
+        if value is None:
+            return self.validator(None).validate(data)
+        if isinstance(value, str) and value in self.variants:
+            return self.validator(value).validate(data)
+        if not self.complete:
+            return self.validator(None).validate(data)
+        import jsonschema_rs
+
+        message = (
+            f"{value!r} is not a valid {self.property_name!r}, "
+            f"expected one of {sorted(self.variants)}"
+        )
+        raise jsonschema_rs.ValidationError(message, message, [], [self.property_name])
+
+    def is_valid(self, data: typing.Any) -> bool:
+        import jsonschema_rs
+
+        try:
+            self.validate(data)
+        except jsonschema_rs.ValidationError:
+            return False
+        return True
+
+
+class SchemaInterner:
+    """Structurally identical request schemas, kept once with one compiled validator
+
+    Schemas are keyed by a hash of their canonical json(sorted keys), the first one
+    interned is shared by every operation and must be treated as frozen. Entries are
+    counted by the operations interning them and dropped by `release` with the last
+    one. Validators built from referenced components are dropped by `invalidate`
+    once the specification changes, operations still cached keep theirs.
+    """
+
+    def __init__(self):
+        self._schemas: typing.Dict[bytes, typing.Dict[str, typing.Any]] = {}
+        self._refs: typing.Dict[bytes, int] = {}
+        self._validators: typing.Dict[typing.Hashable, typing.Any] = {}
+        # schema key -> keys of the validators built from it
+        self._validator_keys: typing.Dict[
+            typing.Hashable, typing.Set[typing.Hashable]
+        ] = {}
+        self._with_refs: typing.Set[typing.Hashable] = set()
+        self.hits = self.misses = 0
+        # interning and releasing, on first use of operations' locations only
+        self.lock = threading.RLock()
+
+    @staticmethod
+    def key(schema: typing.Dict[str, typing.Any]) -> typing.Optional[bytes]:
+        """Hash of the canonical json, None for unsortable keys(eg: yaml integers)"""
+        try:
+            canonical = json.dumps(
+                schema,
+                sort_keys=True,
+                separators=(",", ":"),
+                default=str,
+                check_circular=False,
+            ).encode()
+        except (TypeError, RecursionError):
+            return None
+        return hashlib.blake2b(canonical, digest_size=16).digest()
+
+    def intern(
+        self, schema: typing.Dict[str, typing.Any]
+    ) -> typing.Tuple[typing.Optional[bytes], typing.Dict[str, typing.Any]]:
+        """(key, shared schema) of `schema`, not shared without a key"""
+        key = self.key(schema)
+        if key is None:
+            return key, schema
+        with self.lock:
+            interned = self._schemas.get(key)
+            if interned is None:
+                self.misses += 1
+                interned = self._schemas.setdefault(key, schema)
+            else:
+                self.hits += 1
+            self._refs[key] = self._refs.get(key, 0) + 1
+        return key, interned
+
+    def release(self, keys: typing.Iterable[typing.Optional[bytes]]):
+        """Drop schemas and validators no operation interns any more"""
+        with self.lock:
+            for key in keys:
+                if key is None:
+                    continue
+                refs = self._refs.pop(key, 0) - 1
+                if refs > 0:
+                    self._refs[key] = refs
+                    continue
+                self._schemas.pop(key, None)
+                for validator_key in self._validator_keys.pop(key, ()):
+                    self._validators.pop(validator_key, None)
+                    self._with_refs.discard(validator_key)
+
+    def validator(
+        self,
+        key: typing.Hashable,
+        build: typing.Callable[[], typing.Tuple[typing.Any, bool]],
+    ) -> typing.Any:
+        """Shared validator by key, `build` returns (validator, built from refs)"""
+        try:
+            return self._validators[key]
+        except KeyError:
+            validator, with_refs = build()
+        schema_key = key[0] if isinstance(key, tuple) else key
+        with self.lock:
+            if schema_key not in self._refs:  # released while building
+                return validator
+            if with_refs:
+                self._with_refs.add(key)
+            self._validator_keys.setdefault(schema_key, set()).add(key)
+            return self._validators.setdefault(key, validator)
+
+    def invalidate(self):
+        with self.lock:
+            for key in self._with_refs:
+                self._validators.pop(key, None)
+            self._with_refs.clear()
+
+    def clear(self):
+        with self.lock:
+            self._schemas.clear()
+            self._refs.clear()
+            self._validators.clear()
+            self._validator_keys.clear()
+            self._with_refs.clear()
+
+    def info(self) -> typing.Dict[str, int]:
+        return {
+            "interned": len(self._schemas),
+            "interned_hits": self.hits,
+            "shared_validators": len(self._validators),
+        }
+
+
+# shared by every unknown operation
+EMPTY_OPERATION = OperationSchema({}, {})
+
+
+class OperationCache:
+    """LRU of operation schemas by (path, method), with a negative cache of unknown
+    operations so unmatched requests(eg: scanners) skip building empty schemas
+
+    Counters aren't locked, they are approximate under threads. Operation schemas
+    share identical schemas and validators through `interner`, released with them.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 8192,
+        max_missing: int = 4096,
+        on_evict: typing.Optional[
+            typing.Callable[[typing.Tuple[str, str], OperationSchema], None]
+        ] = None,
+    ):
+        self.max_size = max_size
+        self.max_missing = max_missing
+        # called with every schema leaving the cache, but by `clear`
+        self.on_evict = on_evict
+        self._data: typing.OrderedDict[
+            typing.Tuple[str, str], OperationSchema
+        ] = OrderedDict()
+        self._missing: typing.Dict[typing.Tuple[str, str], None] = {}
+        self.hits = self.misses = self.missing_hits = self.evictions = 0
+        self.interner = SchemaInterner()
+
+    def get(self, key: typing.Tuple[str, str]) -> typing.Optional[OperationSchema]:
+        """Cached schema, `EMPTY_OPERATION` for known unknown operations or None"""
+        schema = self._data.get(key)
+        if schema is None:
+            if key in self._missing:
+                self.missing_hits += 1
+                return EMPTY_OPERATION
+            self.misses += 1
+            return None
+        self.hits += 1
+        try:
+            self._data.move_to_end(key)
+        except KeyError:  # evicted by another thread
+            pass
+        return schema
+
+    def __getitem__(self, key: typing.Tuple[str, str]) -> OperationSchema:
+        return self._data[key]
+
+    def __contains__(self, key: typing.Tuple[str, str]) -> bool:
+        return key in self._data or key in self._missing
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def set(self, key: typing.Tuple[str, str], schema: OperationSchema):
+        self._missing.pop(key, None)
+        replaced = self._data.get(key)
+        self._data[key] = schema
+        self._data.move_to_end(key)
+        if replaced is not None and replaced is not schema:
+            self._evicted(key, replaced)
+        while len(self._data) > self.max_size:
+            self._evicted(*self._data.popitem(last=False))
+            self.evictions += 1
+
+    def _evicted(self, key: typing.Tuple[str, str], schema: OperationSchema):
+        schema.release()
+        if self.on_evict is not None:
+            self.on_evict(key, schema)
+
+    def set_missing(self, key: typing.Tuple[str, str]):
+        if len(self._missing) >= self.max_missing:
+            self._missing.clear()
+        self._missing[key] = None
+
+    def pop(self, key: typing.Tuple[str, str]):
+        schema = self._data.pop(key, None)
+        self._missing.pop(key, None)
+        if schema is not None:
+            self._evicted(key, schema)
+
+    def clear(self):
+        for schema in list(self._data.values()):  # still used by other threads
+            schema.release()
+        self._data.clear()
+        self._missing.clear()
+        self.interner.clear()
+
+    def info(self) -> typing.Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "missing_hits": self.missing_hits,
+            "evictions": self.evictions,
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "missing": len(self._missing),
+        }
@@ -1,12 +1,14 @@
 import typing
 
-from jinja2 import Template
 from starlette.applications import Starlette
 from starlette.requests import Request
-from starlette.responses import JSONResponse, Response
+from starlette.responses import Response
 from starlette.routing import Mount, Route
 
+from .assets import Asset
 from .base import Apiman as _Apiman
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from .operation import OperationSchema
 
 
 class Apiman(_Apiman):
@@ -34,26 +36,48 @@ class Apiman(_Apiman):
     ...     return JSONResponse(list(CATS.values()))
     """
 
-    def init_app(self, app: Starlette):
+    def init_app(self, app: Starlette, artifact: str = ""):
         app.on_event("startup")(lambda: self.load_specification(app))
 
         if self.swagger_template and self.swagger_url:
-            swagger_html = Template(open(self.swagger_template).read()).render(
-                self.config
-            )
+            swagger_html = self.render_template(self.swagger_template)
             self.route(app, self.swagger_url, lambda _: Response(swagger_html))
         if self.redoc_template and self.redoc_template:
-            redoc_html = Template(open(self.redoc_template).read()).render(self.config)
+            redoc_html = self.render_template(self.redoc_template)
             self.route(app, self.redoc_url, lambda _: Response(redoc_html))
         if self.specification_url:
             self.route(
                 app,
                 self.specification_url,
-                lambda _: JSONResponse(self.load_specification(app)),
+                lambda req: Response(
+                    self.serialize_specification(app, req.query_params),
+                    media_type="application/json",
+                ),
+            )
+        if self.metrics is not None and self.metrics_url:
+            self.route(
+                app,
+                self.metrics_url,
+                lambda _: Response(
+                    self.render_metrics(),
+                    headers={"Content-Type": METRICS_CONTENT_TYPE},
+                ),
+            )
+        for asset in self.assets.values():
+            self.route(
+                app,
+                asset.url,
+                lambda req, asset=asset: self._asset_response(asset, req),
             )
         self.router = app.router
+        if artifact:
+            self.load_artifact(artifact)
+
+    def _asset_response(self, asset: Asset, request: Request) -> Response:
+        body, headers = asset.response(request.headers.get("accept-encoding", ""))
+        return Response(body, headers=headers)
 
-    def get_request_schema(self, request: Request) -> typing.Dict:
+    def get_request_schema(self, request: Request) -> OperationSchema:
         # get regex path, eg: "/api/cats/{id}/"
         path = ""
         for r in self.router.routes:
@@ -91,55 +115,56 @@ class Apiman(_Apiman):
 
         return self.get_request_data(request, k)
 
-    def load_specification(
+    def _iter_endpoints(self, routes: typing.Sequence) -> typing.Iterator:
+        for route in routes:
+            if isinstance(route, Mount) and route.routes:
+                yield from self._iter_endpoints(route.routes)
+            elif isinstance(route, Route) and route.include_in_schema:
+                yield route.endpoint
+
+    def _load_routes(
         self, app: Starlette, mount: typing.Optional[Mount] = None, base_path=""
-    ) -> typing.Dict:
-        if not self.loaded:
-            for route in mount.routes if mount else app.routes:
-                if isinstance(route, Mount) and route.routes:
-                    self.loaded = False
-                    self.load_specification(
-                        app, mount=route, base_path=base_path + route.path
-                    )
-                elif isinstance(route, Route):
-                    if not route.include_in_schema:
-                        continue
-
-                    if isinstance(route.endpoint, type):  # for endpoint class
-                        # load from endpoint class
-                        specification = self.parse(route.endpoint)
-                        if specification:
+    ):
+        if mount is None:
+            self.parse_many(self._iter_endpoints(app.routes))
+        for route in mount.routes if mount else app.routes:
+            if isinstance(route, Mount) and route.routes:
+                self._load_routes(app, mount=route, base_path=base_path + route.path)
+            elif isinstance(route, Route):
+                if not route.include_in_schema:
+                    continue
+
+                if isinstance(route.endpoint, type):  # for endpoint class
+                    # load from endpoint class
+                    specification = self.parse(route.endpoint)
+                    if specification:
+                        self.add_path(base_path + route.path, specification)
+                    # load from single method
+                    for method in sorted(self.HTTP_METHODS):
+                        func = getattr(route.endpoint, method, None)
+                        if func:
+                            specification = self.parse(func)
+                            if specification:
+                                self.add_path(
+                                    base_path + route.path,
+                                    specification,
+                                    method=method,
+                                )
+                else:  # for endpoint function
+                    specification = self.parse(route.endpoint)
+                    if specification:
+                        if (
+                            set(specification.keys()) & self.HTTP_METHODS
+                        ):  # multi method description
                             self.add_path(base_path + route.path, specification)
-                        # load from single method
-                        for method in self.HTTP_METHODS:
-                            func = getattr(route.endpoint, method, None)
-                            if func:
-                                specification = self.parse(func)
-                                if specification:
+                        elif route.methods:
+                            for method in sorted(route.methods):
+                                if method.lower() in self.HTTP_METHODS:
                                     self.add_path(
                                         base_path + route.path,
                                         specification,
                                         method=method,
                                     )
-                    else:  # for endpoint function
-                        specification = self.parse(route.endpoint)
-                        if specification:
-                            if (
-                                set(specification.keys()) & self.HTTP_METHODS
-                            ):  # multi method description
-                                self.add_path(base_path + route.path, specification)
-                            elif route.methods:
-                                for method in route.methods:
-                                    if method.lower() in self.HTTP_METHODS:
-                                        self.add_path(
-                                            base_path + route.path,
-                                            specification,
-                                            method=method,
-                                        )
-
-            return self._load_specification()
-        else:
-            return self.specification
 
     def route(self, app: Starlette, url: str, func: typing.Callable):
         app.add_route(url, func, methods=["GET"], include_in_schema=False)
@@ -1,11 +1,12 @@
-import json
 import typing
 
-from jinja2 import Template
 from tornado.routing import Rule
 from tornado.web import Application, RequestHandler
 
+from .assets import Asset
 from .base import Apiman as _Apiman
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from .operation import OperationSchema
 
 
 class Apiman(_Apiman):
@@ -38,27 +39,56 @@ class Apiman(_Apiman):
     >>> apiman.init_app(app)
     """
 
-    def init_app(self, app: Application):
+    def init_app(self, app: Application, artifact: str = ""):
         if self.swagger_template and self.swagger_url:
-            swagger_html = Template(open(self.swagger_template).read()).render(
-                self.config
-            )
+            swagger_html = self.render_template(self.swagger_template)
             self.route(
                 app,
                 self.swagger_url,
                 lambda self: self.write(swagger_html),
             )
         if self.redoc_template and self.redoc_template:
-            redoc_html = Template(open(self.redoc_template).read()).render(self.config)
+            redoc_html = self.render_template(self.redoc_template)
             self.route(app, self.redoc_url, lambda self: self.write(redoc_html))
         if self.specification_url:
             self.route(
                 app,
                 self.specification_url,
-                lambda _self: _self.write(self.load_specification(app)),
+                lambda handler: self._specification_response(app, handler),
+            )
+        if self.metrics is not None and self.metrics_url:
+            self.route(
+                app,
+                self.metrics_url,
+                lambda handler: self._metrics_response(handler),
             )
+        for asset in self.assets.values():
+            self.route(
+                app,
+                asset.url,
+                lambda handler, asset=asset: self._asset_response(asset, handler),
+            )
+        if artifact:
+            self.load_artifact(artifact)
+
+    def _specification_response(self, app: Application, handler: RequestHandler):
+        query = {k: v[-1].decode() for k, v in handler.request.query_arguments.items()}
+        handler.set_header("Content-Type", "application/json")
+        handler.write(self.serialize_specification(app, query))
 
-    def get_request_schema(self, handler: RequestHandler) -> typing.Dict:
+    def _metrics_response(self, handler: RequestHandler):
+        handler.set_header("Content-Type", METRICS_CONTENT_TYPE)
+        handler.write(self.render_metrics())
+
+    def _asset_response(self, asset: Asset, handler: RequestHandler):
+        body, headers = asset.response(
+            handler.request.headers.get("Accept-Encoding", "")
+        )
+        for k, v in headers.items():
+            handler.set_header(k, v)
+        handler.write(body)
+
+    def get_request_schema(self, handler: RequestHandler) -> OperationSchema:
         self.load_specification(handler.application)
         path = ""
         for rule in self._iter_rules(handler.application.default_router.rules):
@@ -66,7 +96,7 @@ class Apiman(_Apiman):
                 path = rule.matcher.regex.pattern[:-1]  # type: ignore
                 break
         return self._get_path_schema(
-            self._covert_path_rule(path), handler.request.method.lower()  # type: ignore
+            self.path_template(path), handler.request.method.lower()  # type: ignore
         )
 
     def get_request_content_type(self, handler: RequestHandler) -> str:
@@ -93,7 +123,7 @@ class Apiman(_Apiman):
         elif k == "header":
             return dict(handler.request.headers)
         elif k == "json":
-            return json.loads(handler.request.body)
+            return self.json_loads(handler.request.body)
         elif k == "form":
             return {k: v[0].decode() for k, v in handler.request.body_arguments.items()}
         elif k == "xml":
@@ -101,27 +131,26 @@ class Apiman(_Apiman):
         else:
             return {}
 
-    def load_specification(self, app: Application) -> typing.Dict:
-        if not self.loaded:
-            for rule in self._iter_rules(app.default_router.rules):
-                if not hasattr(rule.matcher, "regex"):
-                    continue
-                handler = rule.target
-                path = rule.matcher.regex.pattern[:-1]  # type: ignore
-                # from class
-                specification = self.parse(handler)
-                if specification:
-                    self.add_path(path, specification)
-                # from class methods
-                for method in self.HTTP_METHODS:
-                    _func = getattr(handler, method.lower(), None)
-                    if _func:
-                        specification = self.parse(_func)
-                        if specification:
-                            self.add_path(path, specification, method=method)
-            return self._load_specification()
-        else:
-            return self.specification
+    def _load_routes(self, app: Application):
+        self.parse_many(
+            rule.target for rule in self._iter_rules(app.default_router.rules)
+        )
+        for rule in self._iter_rules(app.default_router.rules):
+            if not hasattr(rule.matcher, "regex"):
+                continue
+            handler = rule.target
+            path = rule.matcher.regex.pattern[:-1]  # type: ignore
+            # from class
+            specification = self.parse(handler)
+            if specification:
+                self.add_path(path, specification)
+            # from class methods
+            for method in sorted(self.HTTP_METHODS):
+                _func = getattr(handler, method.lower(), None)
+                if _func:
+                    specification = self.parse(_func)
+                    if specification:
+                        self.add_path(path, specification, method=method)
 
     def route(self, app: Application, url: str, func):
         app.add_handlers(
@@ -131,9 +160,7 @@ class Apiman(_Apiman):
     def add_path(
         self, path: str, specification: typing.Dict, method: typing.Optional[str] = None
     ):
-        return super().add_path(
-            self._covert_path_rule(path), specification, method=method
-        )
+        return super().add_path(self.path_template(path), specification, method=method)
 
     def _covert_path_rule(self, path: str) -> str:
         # covert flask variable rules, eg "/path/(?P<id>.*)" to "/path/{id}"
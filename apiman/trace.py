@@ -0,0 +1,82 @@
+"""Phase timings of request validations, for tracing hooks and the slow validation log
+
+    def hook(trace: ValidationTrace):
+        for phase, location, start, seconds in trace.phases:
+            ...
+
+    apiman.add_validation_hook(hook)
+"""
+import logging
+import time
+import typing
+
+from . import codec
+from .operation import OperationSchema
+
+logger = logging.getLogger(__name__)
+
+# "resolve": route to operation schema(`get_request_schema`)
+# "extract": parameter data(`get_request_data`)
+# "parse": body data(`get_request_data` of json, xml and form)
+# "validate": schema validation of one location
+PHASES = ("resolve", "extract", "parse", "validate")
+
+
+class ValidationTrace:
+    """One request validation, `phases` are (phase, location, start, seconds), with
+    `time.perf_counter()` starts"""
+
+    __slots__ = ("operation", "start", "seconds", "phases", "data", "error")
+
+    def __init__(self, start: float):
+        self.operation: typing.Optional[OperationSchema] = None
+        self.start = start
+        self.seconds = 0.0
+        self.phases: typing.List[typing.Tuple[str, str, float, float]] = []
+        self.data: typing.Dict[str, typing.Any] = {}  # validated data by location
+        self.error: typing.Optional[BaseException] = None
+
+    @property
+    def operation_id(self) -> str:
+        return self.operation.operation_id if self.operation else ""
+
+    def record(self, phase: str, location: str, start: float) -> float:
+        now = time.perf_counter()
+        self.phases.append((phase, location, start, now - start))
+        return now
+
+    def sizes(
+        self, json_dumps: codec.JSONDumps = codec.json_dumps
+    ) -> typing.Dict[str, int]:
+        """Approximate payload size of each location, in serialized bytes"""
+        sizes = {}
+        for location, data in self.data.items():
+            try:
+                sizes[location] = len(json_dumps(data))
+            except (TypeError, ValueError):  # eg: uploaded files
+                sizes[location] = len(str(data))
+        return sizes
+
+
+class SlowValidationLog:
+    """Validation hook logging validations slower than `threshold_ms`"""
+
+    def __init__(
+        self, threshold_ms: float, json_dumps: codec.JSONDumps = codec.json_dumps
+    ):
+        self.threshold = threshold_ms / 1000
+        self.json_dumps = json_dumps
+
+    def __call__(self, trace: ValidationTrace):
+        if trace.seconds < self.threshold:
+            return
+        logger.warning(
+            "Slow validation of %s: %.2fms, phases: %s, sizes: %s",
+            trace.operation_id,
+            trace.seconds * 1000,
+            " ".join(
+                f"{phase}{f'[{location}]' if location else ''}={seconds * 1000:.2f}ms"
+                for phase, location, _, seconds in trace.phases
+            ),
+            " ".join(f"{k}={v}B" for k, v in trace.sizes(self.json_dumps).items()),
+        )
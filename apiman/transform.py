@@ -0,0 +1,301 @@
+import typing
+
+HTTP_METHODS = {
+    "get",
+    "post",
+    "put",
+    "patch",
+    "delete",
+    "head",
+    "connect",
+    "options",
+    "trace",
+}
+# sections holding reusable objects which only exist to be referenced by `$ref`
+REF_SECTIONS = {
+    2: (("definitions",), ("parameters",), ("responses",)),
+    3: (
+        ("components", "schemas"),
+        ("components", "responses"),
+        ("components", "parameters"),
+        ("components", "examples"),
+        ("components", "requestBodies"),
+        ("components", "headers"),
+        ("components", "links"),
+        ("components", "callbacks"),
+        ("components", "pathItems"),
+    ),
+}
+DEFAULT_SHARD = "default"
+# dropped by `compact`
+COMPACT_KEYS = {"description", "example", "examples", "externalDocs"}
+# keys of these maps are user defined names, never dropped
+NAMED_MAPS = {
+    "properties",
+    "patternProperties",
+    "definitions",
+    "$defs",
+    "dependentSchemas",
+    "paths",
+    "webhooks",
+    "responses",
+    "content",
+    "headers",
+    "encoding",
+    "schemas",
+    "requestBodies",
+    "securitySchemes",
+    "securityDefinitions",
+    "links",
+    "callbacks",
+    "pathItems",
+    "variables",
+    "scopes",
+    "mapping",
+}
+# literal data, copied as is
+VALUE_KEYS = {"enum", "const", "default", "required"}
+
+
+def iter_refs(obj: typing.Any) -> typing.Generator[str, None, None]:
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, dict):
+            ref = obj.get("$ref")
+            if isinstance(ref, str):
+                yield ref
+            discriminator = obj.get("discriminator")
+            if isinstance(discriminator, dict) and isinstance(
+                discriminator.get("mapping"), dict
+            ):
+                for v in discriminator["mapping"].values():
+                    # mapping values are refs or schema names
+                    yield v if "/" in v else f"#/components/schemas/{v}"
+            stack.extend(obj.values())
+        elif isinstance(obj, list):
+            stack.extend(obj)
+
+
+def reachable_refs(
+    specification: typing.Dict, obj: typing.Any, unresolved: bool = False
+) -> typing.Set[str]:
+    """All local refs reachable from `obj`, following refs through `specification`
+
+    `unresolved` keeps refs missing from `specification` too, eg: as dependencies.
+    """
+    refs: typing.Set[str] = set()
+    stack = [obj]
+    while stack:
+        for ref in iter_refs(stack.pop()):
+            if ref in refs or not ref.startswith("#/"):
+                continue
+            try:
+                stack.append(get_by_ref(specification, ref))
+            except ValueError:
+                if not unresolved:
+                    continue
+            refs.add(ref)
+    return refs
+
+
+def get_by_ref(specification: typing.Dict, ref: str) -> typing.Any:
+    data: typing.Any = specification
+    for k in ref.split("/"):
+        if k == "#":
+            continue
+        elif not isinstance(data, dict) or k not in data:
+            raise ValueError(f"Wrong ref: {ref}")
+        data = data[k]
+    return data
+
+
+def follow_ref(specification: typing.Dict, obj: typing.Any) -> typing.Any:
+    """`obj`, or what its `$ref`(chain) points to"""
+    for _ in range(32):
+        if not (isinstance(obj, dict) and isinstance(obj.get("$ref"), str)):
+            break
+        obj = get_by_ref(specification, obj["$ref"])
+    return obj
+
+
+def ref_root(specification: typing.Dict, obj: typing.Any) -> typing.Dict:
+    """Skeleton of `specification` holding only the local refs reachable from `obj`,
+    merged into a schema it makes the schema's refs resolvable on their own"""
+    root: typing.Dict = {}
+    skeleton = {id(root)}
+    for ref in sorted(
+        reachable_refs(specification, obj), key=lambda ref: ref.count("/")
+    ):
+        keys = ref.split("/")[1:]
+        node = root
+        for k in keys[:-1]:
+            if k not in node:
+                node[k] = {}
+                skeleton.add(id(node[k]))
+            node = node[k]
+            if id(node) not in skeleton:  # in an object added already
+                break
+        else:
+            node[keys[-1]] = get_by_ref(specification, ref)
+    return root
+
+
+def discriminator_variants(
+    specification: typing.Dict, schema: typing.Any
+) -> typing.Optional[typing.Tuple[str, typing.Dict[str, typing.Any], bool]]:
+    """(property name, {value: schema}, all branches mapped) of a `oneOf`/`anyOf`
+    schema with an OpenAPI 3 `discriminator`, values are `mapping` keys and the
+    schema names of referenced branches"""
+    schema = follow_ref(specification, schema)
+    if not isinstance(schema, dict):
+        return None
+    discriminator = schema.get("discriminator")
+    branches = schema.get("oneOf", schema.get("anyOf"))
+    if not (
+        isinstance(discriminator, dict)
+        and isinstance(discriminator.get("propertyName"), str)
+        and isinstance(branches, list)
+    ):
+        return None
+    variants = {}
+    mapped = set()
+    mapping = discriminator.get("mapping")
+    for value, target in (mapping if isinstance(mapping, dict) else {}).items():
+        ref = target if "/" in target else f"#/components/schemas/{target}"
+        try:
+            variants[value] = get_by_ref(specification, ref)
+        except ValueError:
+            continue
+        mapped.add(ref)
+    complete = True
+    for branch in branches:
+        ref = branch.get("$ref") if isinstance(branch, dict) else None
+        if not isinstance(ref, str):
+            complete = False  # inline branches have no name
+        elif ref not in mapped:
+            try:
+                variants.setdefault(
+                    ref.rsplit("/", 1)[-1], get_by_ref(specification, ref)
+                )
+            except ValueError:
+                complete = False
+    if not variants:
+        return None
+    return discriminator["propertyName"], variants, complete
+
+
+def ref_sections(
+    specification: typing.Dict,
+) -> typing.Tuple[typing.Tuple[str, ...], ...]:
+    return REF_SECTIONS[
+        2 if str(specification.get("swagger", "")).startswith("2") else 3
+    ]
+
+
+def select_refs(
+    specification: typing.Dict, base: typing.Dict, refs: typing.Iterable[str]
+) -> typing.Dict:
+    """Copy `base` with its reusable sections narrowed down to `refs`"""
+    data = dict(base)
+    sections = ref_sections(specification)
+    for section in sections:
+        parent = data
+        for k in section[:-1]:
+            if k not in parent:
+                break
+            parent[k] = dict(parent[k])
+            parent = parent[k]
+        else:
+            if section[-1] in parent:
+                parent[section[-1]] = {}
+    for ref in refs:
+        keys = ref.split("/")[1:]
+        if tuple(keys[:-1]) not in sections:
+            continue
+        parent = data
+        for k in keys[:-1]:
+            parent = parent.setdefault(k, {})
+        parent[keys[-1]] = get_by_ref(specification, ref)
+    return data
+
+
+def shard_names_of(
+    path: str, operation: typing.Any, shard_by: str
+) -> typing.Sequence[str]:
+    if shard_by == "tag":
+        tags = operation.get("tags") if isinstance(operation, dict) else None
+        return tags or (DEFAULT_SHARD,)
+    else:
+        for k in path.split("/"):
+            if k and not k.startswith("{"):
+                return (k,)
+        return (DEFAULT_SHARD,)
+
+
+def shard_index(specification: typing.Dict, shard_by: str) -> typing.List[str]:
+    names: typing.Dict[str, None] = {}
+    for path, item in specification.get("paths", {}).items():
+        for method, operation in item.items():
+            if method in HTTP_METHODS:
+                names.update(dict.fromkeys(shard_names_of(path, operation, shard_by)))
+    return list(names)
+
+
+def build_shard(specification: typing.Dict, shard_by: str, name: str) -> typing.Dict:
+    """Sub document with the operations of shard `name` and the components they use"""
+    paths: typing.Dict[str, typing.Dict] = {}
+    for path, item in specification.get("paths", {}).items():
+        _item = {
+            method: operation
+            for method, operation in item.items()
+            if method in HTTP_METHODS
+            and name in shard_names_of(path, operation, shard_by)
+        }
+        if _item:
+            # keep path level fields, eg: "parameters"
+            _item.update((k, v) for k, v in item.items() if k not in HTTP_METHODS)
+            paths[path] = _item
+    shard = dict(specification)
+    shard["paths"] = paths
+    return select_refs(specification, shard, reachable_refs(specification, paths))
+
+
+def prune(specification: typing.Dict) -> typing.Dict:
+    """Copy of `specification` without unreferenced reusable objects"""
+    roots = select_refs(specification, specification, ())
+    return select_refs(
+        specification, specification, reachable_refs(specification, roots)
+    )
+
+
+def compact(obj: typing.Any, _named: bool = False) -> typing.Any:
+    """Copy of `obj` without descriptions, examples and `x-` extensions"""
+    if isinstance(obj, dict):
+        if _named:
+            return {k: compact(v) for k, v in obj.items()}
+        data = {}
+        for k, v in obj.items():
+            if k in COMPACT_KEYS or k.startswith("x-"):
+                continue
+            elif k in VALUE_KEYS:
+                data[k] = v
+            elif k == "responses" and isinstance(v, dict):
+                # description is required by response object
+                data[k] = {
+                    code: dict(compact(r), description="")
+                    if isinstance(r, dict) and "description" in r
+                    else compact(r)
+                    for code, r in v.items()
+                }
+            else:
+                data[k] = compact(
+                    v,
+                    _named=k in NAMED_MAPS
+                    or (k == "parameters" and isinstance(v, dict)),
+                )
+        return data
+    elif isinstance(obj, list):
+        return [compact(o) for o in obj]
+    else:
+        return obj
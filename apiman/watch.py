@@ -0,0 +1,184 @@
+"""Development hot reload of `from_file` specifications and `template`
+
+    watcher = apiman.watch(interval=1)  # polls in a daemon thread
+    watcher.stop()
+
+Only changed files are parsed again, the paths and components built from them are
+replaced in place with targeted cache invalidation, routes aren't scanned again.
+"""
+import logging
+import os
+import threading
+import typing
+
+from . import transform
+
+if typing.TYPE_CHECKING:  # pragma: no cover
+    from .base import Apiman
+
+logger = logging.getLogger(__name__)
+
+
+class Watcher:
+    def __init__(self, apiman: "Apiman", interval: float = 1.0):
+        self.apiman = apiman
+        self.interval = interval
+        self._template = self._load_template()
+        self._template_version = self._stat(apiman.template)
+        # file path -> version failed to reload, retried once the file changes again
+        self._errors: typing.Dict[str, typing.Tuple[int, int]] = {}
+        self._stopped = threading.Event()
+        self._thread: typing.Optional[threading.Thread] = None
+
+    def start(self) -> "Watcher":
+        self._thread = threading.Thread(
+            target=self._run, name="apiman-watcher", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.check()
+
+    def check(self) -> typing.List[str]:
+        """Reload changed files, returns their paths"""
+        reloaded = []
+        for file_path, (version, _) in list(self.apiman._parsed_files.items()):
+            current = self._stat(file_path)
+            if current == version or self._errors.get(file_path) == current:
+                continue
+            if self._reload(file_path, current, self.reload_file):
+                reloaded.append(file_path)
+
+        current = self._stat(self.apiman.template)
+        if current != self._template_version and (
+            self._errors.get(self.apiman.template) != current
+        ):
+            if self._reload(self.apiman.template, current, self.reload_template):
+                self._template_version = current
+                reloaded.append(self.apiman.template)
+        return reloaded
+
+    def _reload(
+        self,
+        file_path: str,
+        version: typing.Tuple[int, int],
+        reload: typing.Callable[[str], None],
+    ) -> bool:
+        try:
+            reload(file_path)
+        except Exception:
+            logger.exception("Failed to reload %s", file_path)
+            self._errors[file_path] = version
+            return False
+        self._errors.pop(file_path, None)
+        logger.info("Reloaded %s", file_path)
+        return True
+
+    def reload_file(self, file_path: str):
+        """Replace path items and operations parsed from `file_path`"""
+        from .base import Apiman
+
+        apiman = self.apiman
+        with apiman._lock:
+            old = apiman._parsed_files[file_path][1]
+            new = apiman.parse_file(file_path)
+            for func, specification in list(apiman._parsed.items()):
+                if specification is old:
+                    apiman._parsed[func] = new
+            # paths are templates already, skip adapters' rule conversion
+            for path, item in list(apiman.specification.get("paths", {}).items()):
+                if self._from(item, old):
+                    # keep the methods added to this path's own copy
+                    merged = {k: v for k, v in item.items() if k not in old}
+                    Apiman.add_path(apiman, path, {**merged, **new})
+                    continue
+                for method, operation in list(item.items()):
+                    if operation is old:
+                        Apiman.add_path(apiman, path, new, method=method)
+
+    def reload_template(self, file_path: str):
+        """Apply fields, path items and reusable objects changed in `template`"""
+        from .base import Apiman
+
+        apiman = self.apiman
+        old, new = self._template, self._load_template()
+        specification = apiman.specification
+        sections = transform.ref_sections(new)
+        with apiman._lock:
+            old_paths, new_paths = old.get("paths", {}), new.get("paths", {})
+            for path in old_paths.keys() | new_paths.keys():
+                old_item, new_item = old_paths.get(path, {}), new_paths.get(path, {})
+                if old_item == new_item:
+                    continue
+                # only the methods and fields the template owns, not the routes'
+                item = dict(specification.get("paths", {}).get(path, {}))
+                for k in old_item.keys() | new_item.keys():
+                    if k in item and item[k] != old_item.get(k):
+                        continue
+                    if k in new_item:
+                        item[k] = new_item[k]
+                    else:
+                        item.pop(k, None)
+                Apiman.add_path(apiman, path, item)
+                if not item:
+                    del specification["paths"][path]
+            for section in sections:
+                old_items = self._get(old, section)
+                new_items = self._get(new, section)
+                for name in old_items.keys() | new_items.keys():
+                    if old_items.get(name) == new_items.get(name):
+                        continue
+                    parent = specification
+                    for k in section:
+                        parent = parent.setdefault(k, {})
+                    if name in new_items:
+                        parent[name] = new_items[name]
+                    else:
+                        parent.pop(name, None)
+                    apiman._invalidate(ref="#/" + "/".join(section + (name,)))
+            top = {"paths"} | {section[0] for section in sections}
+            changed = False
+            for k in (old.keys() | new.keys()) - top:
+                if old.get(k) != new.get(k):
+                    changed = True
+                    if k in new:
+                        specification[k] = new[k]
+                    else:
+                        specification.pop(k, None)
+            if changed:
+                apiman._clear_rendered()
+        self._template = new
+
+    def _load_template(self) -> typing.Dict:
+        return self.apiman.load_file(
+            self.apiman.template, json_loads=self.apiman.json_loads
+        )
+
+    @staticmethod
+    def _from(item: typing.Dict, old: typing.Dict) -> bool:
+        """Whether path `item` is a copy of the parsed path item `old`"""
+        methods = old.keys() & transform.HTTP_METHODS
+        return bool(methods) and all(item.get(k) is v for k, v in old.items())
+
+    @staticmethod
+    def _get(
+        specification: typing.Dict, section: typing.Tuple[str, ...]
+    ) -> typing.Dict:
+        for k in section:
+            specification = specification.get(k, {})
+        return specification
+
+    @staticmethod
+    def _stat(file_path: str) -> typing.Tuple[int, int]:
+        try:
+            stat = os.stat(file_path)
+        except OSError:  # eg: replaced by an editor
+            return (0, 0)
+        return (stat.st_mtime_ns, stat.st_size)
@@ -0,0 +1,91 @@
+"""Stored benchmark baselines, results are {name: seconds}(or bytes)
+
+Baselines are machine dependent, save them again on the machine checking them.
+"""
+import argparse
+import json
+import os
+import typing
+
+DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+
+def path(suite: str) -> str:
+    return os.path.join(DIR, f"{suite}.json")
+
+
+def load(suite: str) -> typing.Dict[str, float]:
+    try:
+        with open(path(suite)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save(suite: str, results: typing.Dict[str, float]):
+    os.makedirs(DIR, exist_ok=True)
+    baseline = load(suite)
+    baseline.update({k: round(v, 9) for k, v in results.items()})
+    with open(path(suite), "w") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(
+    results: typing.Dict[str, float],
+    baseline: typing.Dict[str, float],
+    threshold: float = 0.25,
+) -> typing.List[typing.Tuple[str, float, float]]:
+    """Regressions slower than baseline by more than `threshold`(ratio), as
+    (name, baseline, result)"""
+    return [
+        (name, baseline[name], seconds)
+        for name, seconds in results.items()
+        if name in baseline and seconds > baseline[name] * (1 + threshold)
+    ]
+
+
+def check(
+    suite: str,
+    results: typing.Dict[str, float],
+    threshold: float = 0.25,
+    unit: typing.Callable[[float], str] = lambda v: f"{v * 1e6:.1f}us",
+) -> bool:
+    baseline = load(suite)
+    if not baseline:
+        print(f"No baseline of {suite}, save one with --save")
+        return False
+    regressions = compare(results, baseline, threshold=threshold)
+    for name, old, new in regressions:
+        print(
+            f"Regression of {name}: {unit(old)} -> {unit(new)} "
+            f"(+{(new / old - 1) * 100:.0f}%, threshold {threshold * 100:.0f}%)"
+        )
+    return not regressions
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--output", default="", help="write results as json")
+    parser.add_argument("--save", action="store_true", help="save as the baseline")
+    parser.add_argument("--check", action="store_true", help="fail on regressions")
+    parser.add_argument(
+        "--threshold", type=float, default=0.25, help="allowed slowdown ratio"
+    )
+
+
+def finish(
+    suite: str,
+    results: typing.Dict[str, float],
+    args: argparse.Namespace,
+    unit: typing.Callable[[float], str] = lambda v: f"{v * 1e6:.1f}us",
+) -> int:
+    """Write, save and check `results` as `add_arguments`' options ask, exit code"""
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"suite": suite, "results": results}, f, indent=2)
+            f.write("\n")
+    if args.save:
+        save(suite, results)
+    if args.check and not check(suite, results, threshold=args.threshold, unit=unit):
+        return 1
+    return 0
@@ -0,0 +1,95 @@
+"""Compare yaml/json backends on a large specification
+
+    python -m benchmarks.codec [paths]
+"""
+import json
+import sys
+import timeit
+import typing
+
+import yaml
+
+from apiman import codec
+
+
+def large_specification(paths: int) -> typing.Dict:
+    specification: typing.Dict[str, typing.Any] = {
+        "openapi": "3.0.0",
+        "info": {"title": "benchmark", "version": "0.1"},
+        "paths": {},
+        "components": {"schemas": {}},
+    }
+    for i in range(paths):
+        specification["components"]["schemas"][f"Model{i}"] = {
+            "type": "object",
+            "properties": {
+                "id": {"type": "integer", "description": f"id of model {i}"},
+                "name": {"type": "string", "maxLength": 64},
+                "tags": {"type": "array", "items": {"type": "string"}},
+            },
+            "required": ["id", "name"],
+        }
+        specification["paths"][f"/models{i}/{{id}}"] = {
+            "get": {
+                "summary": f"get model {i}",
+                "parameters": [
+                    {"name": "id", "in": "path", "schema": {"type": "integer"}}
+                ],
+                "responses": {
+                    "200": {
+                        "description": "OK",
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": f"#/components/schemas/Model{i}"}
+                            }
+                        },
+                    }
+                },
+            }
+        }
+    return specification
+
+
+def bench(func: typing.Callable, number: int = 3) -> float:
+    return min(timeit.repeat(func, number=1, repeat=number))
+
+
+def main(paths: int = 2000):
+    specification = large_specification(paths)
+    content = yaml.safe_dump(specification)
+    data = json.dumps(specification)
+    results = [
+        (
+            "yaml load",
+            bench(lambda: yaml.safe_load(content)),
+            bench(lambda: codec.yaml_load(content)),
+        ),
+        (
+            "yaml dump",
+            bench(lambda: yaml.safe_dump(specification)),
+            bench(lambda: codec.yaml_dump(specification)),
+        ),
+        ("json loads", bench(lambda: json.loads(data)), None),
+        ("json dumps", bench(lambda: json.dumps(specification)), None),
+    ]
+    try:
+        import orjson
+
+        results[2] = results[2][:2] + (bench(lambda: orjson.loads(data)),)
+        results[3] = results[3][:2] + (bench(lambda: orjson.dumps(specification)),)
+    except ImportError:
+        pass
+    print(f"{paths} paths, {len(content) / 1024 / 1024:.1f}MB yaml")
+    print(f"{'':<12}{'default':>12}{'fast path':>12}{'speedup':>10}")
+    for name, default, fast in results:
+        if fast is None:
+            print(f"{name:<12}{default * 1000:>10.1f}ms{'-':>12}{'-':>10}")
+        else:
+            print(
+                f"{name:<12}{default * 1000:>10.1f}ms{fast * 1000:>10.1f}ms"
+                f"{default / fast:>9.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,128 @@
+"""Microbenchmarks of the base class on a synthetic specification
+
+    python -m benchmarks.core [--paths 1000] [--output results.json] [--save] [--check]
+
+Baselines are stored by specification size, eg: "core-1000".
+"""
+import argparse
+import os
+import sys
+import tempfile
+import timeit
+import typing
+
+from apiman import codec
+from apiman.base import Apiman
+from apiman.operation import OperationSchema
+from benchmarks import baseline, synthetic
+
+
+class Request:
+    def __init__(self, path: str, method: str, content_type: str = ""):
+        self.path = path
+        self.method = method
+        self.headers = {"Content-Type": content_type}
+
+
+class BenchApiman(Apiman):
+    def get_request_schema(self, request: Request) -> OperationSchema:
+        return self._get_path_schema(request.path, request.method)
+
+
+def cases(
+    paths: int = 1000, directory: str = ""
+) -> typing.Dict[str, typing.Callable[[], typing.Any]]:
+    """Benchmarked calls by name, files are written to `directory`"""
+    specification = synthetic.generate(paths=paths)
+    apiman = BenchApiman()
+    apiman.specification = specification
+    path = next(iter(specification["paths"]))
+    item = specification["paths"][path]
+    content = codec.yaml_dump(item)
+    file_path = os.path.join(directory, "operation.yml")
+    with open(file_path, "w") as f:
+        f.write(content)
+
+    def docstring():
+        pass
+
+    docstring.__doc__ = content
+    yaml = apiman.from_yaml(content)(lambda: None)
+    dict_ = apiman.from_dict(item)(lambda: None)
+    file_ = apiman.from_file(file_path)(lambda: None)
+
+    def parse_file():
+        apiman._parsed_files.clear()  # mtime cache
+        return apiman._parse(file_)
+
+    key = (path, "post")
+
+    def cold_path_schema():
+        apiman._path_schemas.pop(key)
+        return apiman._get_path_schema(*key)
+
+    get = Request(path, "get")
+    post = Request(path, "post", content_type="application/json")
+    xml = "<Model><id>1</id><name>benchmark</name>" + "<tags>{}</tags></Model>".format(
+        "".join(f"<tag>{i}</tag>" for i in range(8))
+    )
+    json_file = os.path.join(directory, "specification.json")
+    yaml_file = os.path.join(directory, "specification.yml")
+    return {
+        "parse/docstring": lambda: apiman._parse(docstring),
+        "parse/yaml": lambda: apiman._parse(yaml),
+        "parse/dict": lambda: apiman._parse(dict_),
+        "parse/file": parse_file,
+        "get_by_ref": lambda: apiman.get_by_ref("#/components/schemas/Model0Level3"),
+        "expand_specification": lambda: apiman.expand_specification(item),
+        "_get_path_schema/cold": cold_path_schema,
+        "_get_path_schema/warm": lambda: apiman._get_path_schema(*key),
+        "iter_request_schema/parameters": lambda: list(apiman.iter_request_schema(get)),
+        "iter_request_schema/body": lambda: list(apiman.iter_request_schema(post)),
+        "xmltodict": lambda: apiman.xmltodict(xml),
+        "generate_specification_file/json": (
+            lambda: apiman.generate_specification_file(json_file)
+        ),
+        "generate_specification_file/yaml": (
+            lambda: apiman.generate_specification_file(yaml_file)
+        ),
+    }
+
+
+def run(
+    paths: int = 1000, repeat: int = 5, names: typing.Sequence[str] = ()
+) -> typing.Dict[str, float]:
+    """Best seconds per call by name, calls per run are scaled to about 0.1s"""
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name, func in cases(paths=paths, directory=directory).items():
+            if names and not any(name.startswith(n) for n in names):
+                continue
+            timer = timeit.Timer(func)
+            number, _ = timer.autorange()
+            number = max(1, number // 2)
+            results[name] = min(timer.repeat(repeat=repeat, number=number)) / number
+    return results
+
+
+def report(results: typing.Dict[str, float]):
+    print(f"{'':<36}{'us/call':>12}{'calls/s':>12}")
+    for name, seconds in results.items():
+        print(f"{name:<36}{seconds * 1e6:>12.2f}{1 / seconds:>12.0f}")
+
+
+def main(argv: typing.Optional[typing.Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.core")
+    parser.add_argument("--paths", type=int, default=1000, help="specification size")
+    parser.add_argument("--repeat", type=int, default=5, help="runs, the best counts")
+    parser.add_argument("names", nargs="*", help="benchmarks of these name prefixes")
+    baseline.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    results = run(paths=args.paths, repeat=args.repeat, names=args.names)
+    report(results)
+    return baseline.finish(f"core-{args.paths}", results, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
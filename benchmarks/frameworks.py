@@ -0,0 +1,385 @@
+"""Request overhead of every adapter, driven in-process by the framework test clients
+
+    python -m benchmarks.frameworks [--frameworks flask,django] [--save] [--check]
+
+Scenarios of each framework:
+    validated: POST with path, query and json body validated by `validate_request`
+    unvalidated: the same endpoint and request without validation
+    specification: GET of the specification url
+
+"overhead" is validated minus unvalidated, the cost of validation per request.
+"""
+import argparse
+import sys
+import textwrap
+import typing
+
+from benchmarks import baseline
+from benchmarks.codec import bench
+
+SPECIFICATION = """
+summary: benchmark
+parameters:
+- name: id
+  in: path
+  required: true
+  schema:
+    type: string
+    pattern: "^[0-9]+$"
+- name: q
+  in: query
+  required: true
+  schema:
+    type: string
+    maxLength: 32
+requestBody:
+  required: true
+  content:
+    application/json:
+      schema:
+        type: object
+        required: [name]
+        properties:
+          name:
+            type: string
+          tags:
+            type: array
+            items:
+              type: string
+responses:
+  "200":
+    description: OK
+"""
+BODY = {"name": "benchmark", "tags": ["a", "b", "c"]}
+QUERY = "?q=search"
+SCENARIOS = ("validated", "unvalidated", "specification")
+
+Client = typing.Callable[[str], None]  # request of one scenario
+
+
+def flask() -> Client:
+    from flask import Flask, request
+
+    from apiman.flask import Apiman
+
+    app = Flask(__name__)
+    apiman = Apiman()
+    apiman.init_app(app)
+
+    @app.route("/validated/<id>", methods=["POST"])
+    @apiman.from_yaml(SPECIFICATION)
+    def validated(id):
+        apiman.validate_request(request)
+        return "OK"
+
+    @app.route("/unvalidated/<id>", methods=["POST"])
+    @apiman.from_yaml(SPECIFICATION)
+    def unvalidated(id):
+        request.json
+        return "OK"
+
+    client = app.test_client()
+
+    def call(scenario: str):
+        if scenario == "specification":
+            response = client.get(apiman.specification_url)
+        else:
+            response = client.post(f"/{scenario}/1{QUERY}", json=BODY)
+        assert response.status_code == 200, response.data
+
+    return call
+
+
+def starlette() -> Client:
+    from starlette.applications import Starlette
+    from starlette.requests import Request
+    from starlette.responses import PlainTextResponse
+    from starlette.testclient import TestClient
+
+    from apiman.starlette import Apiman
+
+    app = Starlette()
+    apiman = Apiman()
+    apiman.init_app(app)
+
+    @app.route("/validated/{id}", methods=["POST"])
+    @apiman.from_yaml(SPECIFICATION)
+    async def validated(request: Request):
+        await apiman.async_validate_request(request)
+        return PlainTextResponse("OK")
+
+    @app.route("/unvalidated/{id}", methods=["POST"])
+    @apiman.from_yaml(SPECIFICATION)
+    async def unvalidated(request: Request):
+        await request.json()
+        return PlainTextResponse("OK")
+
+    apiman.load_specification(app)
+    client = TestClient(app)
+
+    def call(scenario: str):
+        if scenario == "specification":
+            response = client.get(apiman.specification_url)
+        else:
+            response = client.post(f"/{scenario}/1{QUERY}", json=BODY)
+        assert response.status_code == 200, response.content
+
+    return call
+
+
+def django() -> Client:
+    import django
+    from django.conf import settings
+    from django.http import HttpResponse
+    from django.test import Client as DjangoClient
+    from django.urls import path
+
+    if not settings.configured:
+        settings.configure(
+            DEBUG=False,
+            ALLOWED_HOSTS=["testserver"],
+            ROOT_URLCONF=__name__,
+            MIDDLEWARE=["apiman.django.Middleware"],
+        )
+        django.setup()
+    from apiman.django import apiman
+
+    # view functions are described by methods
+    specification = "post:\n" + textwrap.indent(SPECIFICATION, "  ")
+
+    @apiman.from_yaml(specification)
+    def validated(request, id):
+        apiman.validate_request(request)
+        return HttpResponse("OK")
+
+    @apiman.from_yaml(specification)
+    def unvalidated(request, id):
+        apiman.json_loads(request.body)
+        return HttpResponse("OK")
+
+    global urlpatterns
+    urlpatterns = [
+        path("validated/<id>", validated),
+        path("unvalidated/<id>", unvalidated),
+    ]
+    client = DjangoClient()
+
+    def call(scenario: str):
+        if scenario == "specification":
+            response = client.get(apiman.specification_url)
+        else:
+            response = client.post(
+                f"/{scenario}/1{QUERY}", BODY, content_type="application/json"
+            )
+        assert response.status_code == 200, response.content
+
+    return call
+
+
+def bottle() -> Client:
+    from bottle import Bottle, request
+    from webtest import TestApp
+
+    from apiman.bottle import Apiman
+
+    app = Bottle()
+    apiman = Apiman()
+    apiman.init_app(app)
+
+    @app.route("/validated/<id>", method="POST")
+    @apiman.from_yaml(SPECIFICATION)
+    def validated(id):
+        apiman.validate_request(request)
+        return "OK"
+
+    @app.route("/unvalidated/<id>", method="POST")
+    @apiman.from_yaml(SPECIFICATION)
+    def unvalidated(id):
+        request.json
+        return "OK"
+
+    apiman.load_specification(app)
+    client = TestApp(app)
+
+    def call(scenario: str):
+        if scenario == "specification":
+            response = client.get(apiman.specification_url)
+        else:
+            response = client.post_json(f"/{scenario}/1{QUERY}", BODY)
+        assert response.status_code == 200, response.body
+
+    return call
+
+
+def tornado() -> Client:
+    import asyncio
+    import json
+
+    import tornado.httpclient
+    import tornado.httpserver
+    import tornado.testing
+    import tornado.web
+
+    from apiman.tornado import Apiman
+
+    apiman = Apiman()
+
+    class ValidatedHandler(tornado.web.RequestHandler):
+        @apiman.from_yaml(SPECIFICATION)
+        def post(self, id):
+            apiman.validate_request(self)
+            self.write("OK")
+
+    class UnvalidatedHandler(tornado.web.RequestHandler):
+        @apiman.from_yaml(SPECIFICATION)
+        def post(self, id):
+            apiman.json_loads(self.request.body)
+            self.write("OK")
+
+    app = tornado.web.Application(
+        [
+            (r"/validated/(?P<id>\w+)", ValidatedHandler),
+            (r"/unvalidated/(?P<id>\w+)", UnvalidatedHandler),
+        ]
+    )
+    apiman.init_app(app)
+    apiman.load_specification(app)
+
+    # what `AsyncHTTPTestCase` sets up: a server on a local port and an HTTP client
+    loop = asyncio.new_event_loop()
+    sock, port = tornado.testing.bind_unused_port()
+
+    async def start() -> tornado.httpclient.AsyncHTTPClient:
+        tornado.httpserver.HTTPServer(app).add_sockets([sock])
+        return tornado.httpclient.AsyncHTTPClient()
+
+    http_client = loop.run_until_complete(start())
+    body = json.dumps(BODY)
+
+    async def fetch(
+        request: tornado.httpclient.HTTPRequest,
+    ) -> tornado.httpclient.HTTPResponse:
+        return await http_client.fetch(request)
+
+    def call(scenario: str):
+        url = f"http://127.0.0.1:{port}"
+        if scenario == "specification":
+            request = tornado.httpclient.HTTPRequest(url + apiman.specification_url)
+        else:
+            request = tornado.httpclient.HTTPRequest(
+                f"{url}/{scenario}/1{QUERY}",
+                method="POST",
+                body=body,
+                headers={"Content-Type": "application/json"},
+            )
+        response = loop.run_until_complete(fetch(request))
+        assert response.code == 200, response.body
+
+    return call
+
+
+def falcon() -> Client:
+    import falcon
+    from falcon import testing
+
+    from apiman.falcon import Apiman
+
+    app = falcon.App()
+    apiman = Apiman()
+    apiman.init_app(app)
+
+    class ValidatedResource:
+        @apiman.from_yaml(SPECIFICATION)
+        def on_post(self, req, resp, id):
+            apiman.validate_request(req)
+            resp.text = "OK"
+
+    class UnvalidatedResource:
+        @apiman.from_yaml(SPECIFICATION)
+        def on_post(self, req, resp, id):
+            req.media
+            resp.text = "OK"
+
+    app.add_route("/validated/{id}", ValidatedResource())
+    app.add_route("/unvalidated/{id}", UnvalidatedResource())
+    apiman.load_specification(app)
+    client = testing.TestClient(app)
+
+    def call(scenario: str):
+        if scenario == "specification":
+            response = client.simulate_get(apiman.specification_url)
+        else:
+            response = client.simulate_post(
+                f"/{scenario}/1", params={"q": "search"}, json=BODY
+            )
+        assert response.status_code == 200, response.text
+
+    return call
+
+
+FRAMEWORKS: typing.Dict[str, typing.Callable[[], Client]] = {
+    "flask": flask,
+    "starlette": starlette,
+    "django": django,
+    "bottle": bottle,
+    "tornado": tornado,
+    "falcon": falcon,
+}
+
+
+def run(
+    frameworks: typing.Sequence[str] = tuple(FRAMEWORKS),
+    number: int = 200,
+    repeat: int = 5,
+) -> typing.Dict[str, float]:
+    """Seconds per request, by "<framework>/<scenario>" """
+    results = {}
+    for name in frameworks:
+        try:
+            call = FRAMEWORKS[name]()
+        except ImportError as e:
+            print(f"Skip {name}: {e}")
+            continue
+        for scenario in SCENARIOS:
+            call(scenario)  # warm up caches
+        # scenarios interleave in every run, so drifts of the machine hit them all
+        for _ in range(repeat):
+            for scenario in SCENARIOS:
+                key = f"{name}/{scenario}"
+                seconds = bench(lambda: [call(scenario) for _ in range(number)], 1)
+                seconds /= number
+                results[key] = min(results.get(key, seconds), seconds)
+    return results
+
+
+def report(results: typing.Dict[str, float]):
+    print(f"{'':<28}{'us/request':>12}{'requests/s':>12}{'overhead':>12}")
+    for name, seconds in results.items():
+        framework, scenario = name.split("/")
+        overhead = ""
+        if scenario == "validated" and f"{framework}/unvalidated" in results:
+            overhead = (
+                f"{(seconds - results[f'{framework}/unvalidated']) * 1e6:>10.1f}us"
+            )
+        print(f"{name:<28}{seconds * 1e6:>12.1f}{1 / seconds:>12.0f}{overhead:>12}")
+
+
+def main(argv: typing.Optional[typing.Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.frameworks")
+    parser.add_argument("--frameworks", default=",".join(FRAMEWORKS))
+    parser.add_argument("--number", type=int, default=200, help="requests per run")
+    parser.add_argument("--repeat", type=int, default=5, help="runs, the best counts")
+    baseline.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    results = run(
+        [f for f in args.frameworks.split(",") if f],
+        number=args.number,
+        repeat=args.repeat,
+    )
+    report(results)
+    return baseline.finish("frameworks", results, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""Peak and retained memory of every loading phase, traced by tracemalloc
+
+    python -m benchmarks.memory [--paths 5000] [--framework flask] [--save] [--check]
+
+"peak" is the highest traced memory above the phase's start, "retained" is what is
+left once the phase finished and garbage is collected. Memory allocated natively
+(eg: compiled validators) isn't traced. Baselines are stored by framework and size.
+"""
+import argparse
+import gc
+import sys
+import tracemalloc
+import typing
+
+from benchmarks import baseline, synthetic
+
+
+def run(paths: int = 5000, framework: str = "flask") -> typing.Dict[str, float]:
+    """Bytes by "<phase>/peak" and "<phase>/retained" """
+    specification = synthetic.generate(paths=paths)
+    results: typing.Dict[str, float] = {}
+    apiman: typing.Any = None
+    app: typing.Any = None
+
+    def build():
+        nonlocal app, apiman
+        app, apiman = synthetic.build_app(framework, specification)
+
+    phases: typing.List[typing.Tuple[str, typing.Callable[[], typing.Any]]] = [
+        ("build_app", build),
+        (
+            "load_specification",
+            lambda: apiman.load_specification(None if framework == "django" else app),
+        ),
+        ("load_path_schemas", lambda: apiman.load_path_schemas()),
+        ("serialize_specification", lambda: apiman.serialize_specification(app, {})),
+    ]
+    gc.collect()
+    tracemalloc.start()
+    try:
+        for name, phase in phases:
+            gc.collect()
+            start = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            phase()
+            peak = tracemalloc.get_traced_memory()[1]
+            gc.collect()
+            results[f"{name}/peak"] = peak - start
+            results[f"{name}/retained"] = tracemalloc.get_traced_memory()[0] - start
+    finally:
+        tracemalloc.stop()
+    for section, sizes in apiman.memory_report().items():
+        results[f"memory_report/{section}"] = sizes["bytes"]
+    return results
+
+
+def report(results: typing.Dict[str, float]):
+    print(f"{'':<40}{'MB':>10}")
+    for name, size in results.items():
+        print(f"{name:<40}{size / 1024 / 1024:>10.2f}")
+
+
+def main(argv: typing.Optional[typing.Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.memory")
+    parser.add_argument("--paths", type=int, default=5000, help="specification size")
+    parser.add_argument("--framework", default="flask", choices=synthetic.FRAMEWORKS)
+    baseline.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    results = run(paths=args.paths, framework=args.framework)
+    report(results)
+    return baseline.finish(
+        f"memory-{args.framework}-{args.paths}",
+        results,
+        args,
+        unit=lambda v: f"{v / 1024 / 1024:.2f}MB",
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
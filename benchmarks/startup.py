@@ -0,0 +1,194 @@
+"""Cold start of every adapter, each measured in a fresh interpreter
+
+    python -m benchmarks.startup [--paths 1000] [--describe docstring,file] [--save]
+
+Phases, in milliseconds:
+    import: the framework, then the apiman adapter
+    routes: registering the routes in the framework(and writing "file" documents)
+    init_app: including `render_template`, the jinja rendering of the UI pages
+    load_specification: broken down into the route walk, yaml parsing(docstrings and
+        `from_yaml`), file loads(`from_file`) and `add_path`
+"""
+import argparse
+import importlib
+import json
+import subprocess
+import sys
+import time
+import typing
+
+from benchmarks import baseline, synthetic
+
+FRAMEWORK_MODULES = {
+    "flask": "flask",
+    "starlette": "starlette.applications",
+    "django": "django.urls",
+    "bottle": "bottle",
+    "tornado": "tornado.web",
+    "falcon": "falcon",
+}
+PHASES = (
+    "import_framework",
+    "import_apiman",
+    "routes",
+    "init_app",
+    "render_template",
+    "load_specification",
+    "route_walk",
+    "yaml",
+    "files",
+    "add_path",
+    "total",
+)
+
+
+class Timer:
+    def __init__(self):
+        self.seconds: typing.Dict[str, float] = {}
+
+    def wrap(self, name: str, func: typing.Callable) -> typing.Callable:
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.seconds[name] = self.seconds.get(name, 0.0) + (
+                    time.perf_counter() - start
+                )
+
+        return wrapper
+
+
+def child(framework: str, paths: int, describe: typing.Sequence[str]):
+    """Measure one cold start, phases are printed as json in seconds"""
+    specification = synthetic.generate(paths=paths)
+    timer = Timer()
+    start = time.perf_counter()
+    if framework == "django":
+        synthetic._configure_django()
+    importlib.import_module(FRAMEWORK_MODULES[framework])
+    timer.seconds["import_framework"] = time.perf_counter() - start
+    module = timer.wrap("import_apiman", importlib.import_module)(f"apiman.{framework}")
+
+    # documents are serialized while building the app, that isn't startup
+    synthetic.codec.yaml_dump = timer.wrap(  # type: ignore
+        "serialize", synthetic.codec.yaml_dump
+    )
+    module.Apiman.init_app = timer.wrap("init_app", module.Apiman.init_app)
+    module.Apiman.render_template = timer.wrap(
+        "render_template", module.Apiman.render_template
+    )
+    app, apiman = timer.wrap("build_app", synthetic.build_app)(
+        framework, specification, describe=describe
+    )
+    timer.seconds["routes"] = (
+        timer.seconds.pop("build_app")
+        - timer.seconds["init_app"]
+        - timer.seconds.pop("serialize", 0.0)
+    )
+
+    for name, method in (
+        ("yaml", "parse_yaml"),
+        ("files", "parse_file"),
+        ("add_path", "add_path"),
+    ):
+        setattr(apiman, method, timer.wrap(name, getattr(apiman, method)))
+    timer.wrap("load_specification", apiman.load_specification)(
+        None if framework == "django" else app
+    )
+    timer.seconds["route_walk"] = timer.seconds["load_specification"] - sum(
+        timer.seconds.get(name, 0.0) for name in ("yaml", "files", "add_path")
+    )
+    timer.seconds["total"] = sum(
+        timer.seconds.get(name, 0.0)
+        for name in (
+            "import_framework",
+            "import_apiman",
+            "routes",
+            "init_app",
+            "load_specification",
+        )
+    )
+    print(json.dumps(timer.seconds))
+
+
+def run(
+    frameworks: typing.Sequence[str] = synthetic.FRAMEWORKS,
+    paths: int = 1000,
+    describe: typing.Sequence[str] = ("docstring",),
+    repeat: int = 3,
+) -> typing.Dict[str, float]:
+    """Best seconds of every phase by "<framework>/<phase>" """
+    results: typing.Dict[str, float] = {}
+    for framework in frameworks:
+        for _ in range(repeat):
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "benchmarks.startup",
+                    "--child",
+                    framework,
+                    "--paths",
+                    str(paths),
+                    "--describe",
+                    ",".join(describe),
+                ],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            for phase, seconds in json.loads(output.splitlines()[-1]).items():
+                key = f"{framework}/{phase}"
+                results[key] = min(results.get(key, seconds), seconds)
+    return results
+
+
+def report(results: typing.Dict[str, float]):
+    frameworks = list(dict.fromkeys(name.split("/")[0] for name in results))
+    print(f"{'ms':<20}" + "".join(f"{f:>11}" for f in frameworks))
+    for phase in PHASES:
+        cells = [results.get(f"{f}/{phase}") for f in frameworks]
+        print(
+            f"{phase:<20}"
+            + "".join(
+                "{:>11}".format("-" if c is None else f"{c * 1000:.1f}") for c in cells
+            )
+        )
+
+
+def main(argv: typing.Optional[typing.Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup")
+    parser.add_argument("--frameworks", default=",".join(synthetic.FRAMEWORKS))
+    parser.add_argument("--paths", type=int, default=1000, help="routes")
+    parser.add_argument(
+        "--describe",
+        default="docstring",
+        help="comma separated docstring, yaml, file or dict, used by routes in turn",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="runs, the best counts")
+    parser.add_argument("--child", default="", help=argparse.SUPPRESS)
+    baseline.add_arguments(parser)
+    args = parser.parse_args(argv)
+    describe = args.describe.split(",")
+    if args.child:
+        child(args.child, args.paths, describe)
+        return 0
+
+    results = run(
+        [f for f in args.frameworks.split(",") if f],
+        paths=args.paths,
+        describe=describe,
+        repeat=args.repeat,
+    )
+    report(results)
+    return baseline.finish(
+        f"startup-{args.paths}-{'-'.join(describe)}",
+        results,
+        args,
+        unit=lambda v: f"{v * 1000:.1f}ms",
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
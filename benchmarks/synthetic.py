@@ -0,0 +1,389 @@
+"""Deterministic synthetic specifications for scale testing
+
+    specification = generate(paths=5000, seed=1, version=3)
+    for rule, methods, path_item in route_table(specification, "flask"):
+        ...
+
+    python -m benchmarks.synthetic [paths] [version] > spec.json
+
+Every path item has a GET with many parameters(shared `$ref` ones included) and a POST
+with a body of one model, a recursive tree or a union. Models reference `depth` levels
+of nested models, leaves reference large enums. The same seed and knobs generate the
+same specification.
+"""
+import importlib
+import itertools
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import typing
+
+from apiman import codec
+
+FRAMEWORKS = ("flask", "starlette", "django", "bottle", "tornado", "falcon")
+RESOURCES = ("cats", "dogs", "fish", "birds", "users", "orders", "items", "tags")
+TYPES = ("string", "integer", "number", "boolean")
+
+
+def generate(
+    paths: int = 1000,
+    seed: int = 0,
+    version: int = 3,
+    depth: int = 4,
+    enum_size: int = 64,
+    parameters: int = 8,
+    union_size: int = 4,
+    models: int = 0,
+) -> typing.Dict[str, typing.Any]:
+    """OpenAPI 3.1(`version=3`) or Swagger 2.0(`version=2`) specification
+
+    `models` defaults to one chain of `depth` models per 4 paths.
+    """
+    rnd = random.Random(seed)
+    v3 = version > 2
+    models = models or max(1, paths // 4)
+    prefix = "#/components/schemas/" if v3 else "#/definitions/"
+    parameter_prefix = "#/components/parameters/" if v3 else "#/parameters/"
+
+    schemas: typing.Dict[str, typing.Any] = {}
+    enums = max(1, models // 8)
+    for i in range(enums):
+        schemas[f"Enum{i}"] = {
+            "type": "string",
+            "enum": [f"value{i}_{j}" for j in range(enum_size)],
+        }
+    for i in range(models):
+        # Model{i} -> Model{i}Level1 -> ... -> Model{i}Level{depth - 1} -> Enum
+        for level in reversed(range(depth)):
+            name = f"Model{i}" if level == 0 else f"Model{i}Level{level}"
+            properties: typing.Dict[str, typing.Any] = {
+                "id": {"type": "integer", "minimum": 0},
+                "name": {"type": "string", "maxLength": 64},
+                "kind": {"$ref": f"{prefix}Enum{rnd.randrange(enums)}"},
+            }
+            for j in range(rnd.randint(1, 4)):
+                properties[f"field{j}"] = _type_schema(rnd)
+            if level < depth - 1:
+                properties["child"] = {"$ref": f"{prefix}Model{i}Level{level + 1}"}
+            schemas[name] = {
+                "type": "object",
+                "required": ["id", "name"],
+                "properties": properties,
+            }
+    # recursive
+    schemas["Tree"] = {
+        "type": "object",
+        "required": ["name"],
+        "properties": {
+            "name": {"type": "string"},
+            "children": {"type": "array", "items": {"$ref": f"{prefix}Tree"}},
+        },
+    }
+    unions = max(1, models // 4)
+    for i in range(unions):
+        refs = [
+            {"$ref": f"{prefix}Model{rnd.randrange(models)}"} for _ in range(union_size)
+        ]
+        # swagger 2.0 has no oneOf
+        schemas[f"Union{i}"] = {"oneOf": refs} if v3 else {"allOf": refs}
+
+    shared_parameters: typing.Dict[str, typing.Any] = {}
+    for name, key, location, t in (
+        ("Page", "page", "query", "integer"),
+        ("Limit", "limit", "query", "integer"),
+        ("RequestId", "X-Request-Id", "header", "string"),
+    ):
+        shared_parameters[name] = {"name": key, "in": location, "required": False}
+        _set_type(shared_parameters[name], {"type": t}, v3)
+
+    path_items: typing.Dict[str, typing.Any] = {}
+    for i in range(paths):
+        resource = RESOURCES[i % len(RESOURCES)]
+        path = f"/{resource}{i}/{{id}}"
+        if i % 5 == 4:  # nested resources
+            path += f"/{RESOURCES[(i + 1) % len(RESOURCES)]}/{{sub_id}}"
+        operation_parameters = [
+            {"$ref": f"{parameter_prefix}{name}"} for name in shared_parameters
+        ]
+        for name in re.findall(r"{(\w+)}", path):
+            parameter = {"name": name, "in": "path", "required": True}
+            _set_type(parameter, {"type": "string", "pattern": "^[0-9]+$"}, v3)
+            operation_parameters.append(parameter)
+        for j in range(rnd.randint(1, parameters)):
+            parameter = {"name": f"q{j}", "in": "query", "required": j == 0}
+            if rnd.random() < 0.2:
+                _set_type(
+                    parameter,
+                    {"type": "string", "enum": [f"v{k}" for k in range(enum_size)]},
+                    v3,
+                )
+            else:
+                _set_type(parameter, _type_schema(rnd), v3)
+            operation_parameters.append(parameter)
+
+        choice = rnd.random()
+        if choice < 0.1:
+            body = {"$ref": f"{prefix}Tree"}
+        elif choice < 0.3:
+            body = {"$ref": f"{prefix}Union{rnd.randrange(unions)}"}
+        else:
+            body = {"$ref": f"{prefix}Model{rnd.randrange(models)}"}
+        response = {"$ref": f"{prefix}Model{rnd.randrange(models)}"}
+        post: typing.Dict[str, typing.Any] = {
+            "operationId": f"create{resource.title()}{i}",
+            "summary": f"create {resource} {i}",
+        }
+        if v3:
+            post["requestBody"] = {
+                "required": True,
+                "content": {"application/json": {"schema": body}},
+            }
+            responses = {
+                "200": {
+                    "description": "OK",
+                    "content": {"application/json": {"schema": response}},
+                }
+            }
+        else:
+            post["parameters"] = [
+                {"name": "body", "in": "body", "required": True, "schema": body}
+            ]
+            responses = {"200": {"description": "OK", "schema": response}}
+        post["responses"] = responses
+        path_items[path] = {
+            "get": {
+                "operationId": f"get{resource.title()}{i}",
+                "summary": f"get {resource} {i}",
+                "parameters": operation_parameters,
+                "responses": responses,
+            },
+            "post": post,
+        }
+
+    specification: typing.Dict[str, typing.Any] = {
+        "info": {"title": f"synthetic {paths} paths", "version": str(seed)},
+        "paths": path_items,
+    }
+    if v3:
+        specification = {
+            "openapi": "3.1.0",
+            **specification,
+            "components": {"schemas": schemas, "parameters": shared_parameters},
+        }
+    else:
+        specification = {
+            "swagger": "2.0",
+            **specification,
+            "definitions": schemas,
+            "parameters": shared_parameters,
+        }
+    return specification
+
+
+def _type_schema(rnd: random.Random) -> typing.Dict[str, typing.Any]:
+    t = rnd.choice(TYPES + ("array",))
+    if t == "array":
+        return {"type": "array", "items": {"type": rnd.choice(TYPES)}}
+    return {"type": t}
+
+
+def _set_type(
+    parameter: typing.Dict[str, typing.Any],
+    schema: typing.Dict[str, typing.Any],
+    v3: bool,
+):
+    # OpenAPI 3 parameters have schemas, swagger 2.0 ones have types in place
+    if v3:
+        parameter["schema"] = schema
+    else:
+        parameter.update(schema)
+
+
+def route_rule(path: str, framework: str) -> str:
+    """Route rule of an OpenAPI path template, eg: "/cats/{id}" to "/cats/<id>" """
+    if framework in ("flask", "bottle"):
+        return re.sub(r"{(\w+)}", r"<\1>", path)
+    elif framework == "django":  # relative to the root url conf
+        return re.sub(r"{(\w+)}", r"<\1>", path).lstrip("/")
+    elif framework == "tornado":
+        return re.sub(r"{(\w+)}", r"(?P<\1>\\w+)", path)
+    elif framework in ("starlette", "falcon"):
+        return path
+    raise ValueError(f"Unknown framework {framework}")
+
+
+def route_table(
+    specification: typing.Dict[str, typing.Any], framework: str
+) -> typing.List[typing.Tuple[str, typing.List[str], typing.Dict[str, typing.Any]]]:
+    """(rule, methods, path item) of every path, rules in the framework's syntax"""
+    return [
+        (
+            route_rule(path, framework),
+            [m.upper() for m in item if m in ("get", "post", "put", "patch", "delete")],
+            item,
+        )
+        for path, item in specification["paths"].items()
+    ]
+
+
+def build_app(
+    framework: str,
+    specification: typing.Dict[str, typing.Any],
+    describe: typing.Sequence[str] = ("dict",),
+    directory: str = "",
+    **kwargs,
+) -> typing.Tuple[typing.Any, typing.Any]:
+    """(app, apiman) of `framework` routing every path of `specification`, `kwargs`
+    are passed to `Apiman`
+
+    Handlers are described by their path items(or operations) in turn by `describe`:
+    "dict"(`from_dict`), "yaml"(`from_yaml`), "docstring" or "file"(`from_file` of a
+    file written to `directory`, a temporary one by default). Django's app is the url
+    conf, set as `ROOT_URLCONF`.
+    """
+    template = {k: v for k, v in specification.items() if k != "paths"}
+    template["paths"] = {}
+    routes = route_table(specification, framework)
+    if framework == "django":
+        _configure_django()
+    module = importlib.import_module(f"apiman.{framework}")
+    apiman = module.Apiman(**kwargs)
+    apiman.specification = template
+    counter = itertools.count()
+
+    def described(obj: typing.Dict, func: typing.Callable) -> typing.Callable:
+        nonlocal directory
+        i = next(counter)
+        kind = describe[i % len(describe)]
+        if kind == "docstring":
+            func.__doc__ = codec.yaml_dump(obj)
+            return func
+        elif kind == "yaml":
+            return apiman.from_yaml(codec.yaml_dump(obj))(func)
+        elif kind == "file":
+            directory = directory or tempfile.mkdtemp(prefix="apiman-")
+            file_path = os.path.join(directory, f"operation{i}.yml")
+            with open(file_path, "w") as f:
+                f.write(codec.yaml_dump(obj))
+            return apiman.from_file(file_path)(func)
+        return apiman.from_dict(obj)(func)
+
+    if framework == "flask":
+        from flask import Flask
+
+        app: typing.Any = Flask(__name__)
+        apiman.init_app(app)
+        for i, (rule, methods, item) in enumerate(routes):
+            app.add_url_rule(
+                rule,
+                endpoint=f"operation{i}",
+                view_func=described(item, _view()),
+                methods=methods,
+            )
+    elif framework == "starlette":
+        from starlette.applications import Starlette
+        from starlette.responses import PlainTextResponse
+
+        def endpoint() -> typing.Callable:
+            async def endpoint(request):
+                return PlainTextResponse("OK")
+
+            return endpoint
+
+        app = Starlette()
+        apiman.init_app(app)
+        for rule, methods, item in routes:
+            app.add_route(rule, described(item, endpoint()), methods)
+    elif framework == "bottle":
+        from bottle import Bottle
+
+        app = Bottle()
+        apiman.init_app(app)
+        for rule, methods, item in routes:
+            app.route(rule, method=methods, callback=described(item, _view()))
+    elif framework == "tornado":
+        from tornado.web import Application, RequestHandler
+
+        handlers = []
+        for rule, methods, item in routes:
+            handlers.append(
+                (
+                    rule,
+                    type(
+                        "Handler",
+                        (RequestHandler,),
+                        {
+                            m.lower(): described(item[m.lower()], _view())
+                            for m in methods
+                        },
+                    ),
+                )
+            )
+        app = Application(handlers)
+        apiman.init_app(app)
+    elif framework == "falcon":
+        from falcon import App
+
+        app = App()
+        apiman.init_app(app)
+        for rule, methods, item in routes:
+            resource = type(
+                "Resource",
+                (),
+                {
+                    f"on_{m.lower()}": described(item[m.lower()], _view())
+                    for m in methods
+                },
+            )
+            app.add_route(rule, resource())
+    elif framework == "django":
+        from django.conf import settings
+        from django.urls import clear_url_caches, path
+
+        app = type(
+            "URLConf",
+            (),
+            {
+                "urlpatterns": [
+                    path(rule, described(item, _view())) for rule, _, item in routes
+                ]
+            },
+        )
+        settings.ROOT_URLCONF = app
+        clear_url_caches()
+        apiman.init_app()
+    else:
+        raise ValueError(f"Unknown framework {framework}")
+    return app, apiman
+
+
+def _view() -> typing.Callable:
+    # a function per route, described apart
+    def view(*args, **kwargs):
+        return "OK"
+
+    return view
+
+
+def _configure_django():
+    import django
+    from django.conf import settings
+
+    if not settings.configured:
+        settings.configure(
+            DEBUG=False,
+            ALLOWED_HOSTS=["testserver"],
+            MIDDLEWARE=["apiman.django.Middleware"],
+        )
+        django.setup()
+
+
+def main(paths: int = 1000, version: int = 3, seed: int = 0):
+    json.dump(generate(paths=paths, version=version, seed=seed), sys.stdout)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,99 @@
+import os
+import typing
+
+import pytest
+from flask import Flask, jsonify, request
+
+from apiman.flask import Apiman
+
+
+def _create_app(apiman: Apiman, cats: int = 1, **kwargs) -> Flask:
+    """Flask app validating requests of
+    GET /cats/<int:id>: `id` path and required `name` query parameters, one route
+    per `cats`, as /cats0/<int:id>, /cats1/<int:id>... if more than one
+    POST /cats/(createCat): required `name` query parameter, a `Cat` json body
+    GET /dogs/: optional `name` query parameter
+    """
+    app = Flask(__name__)
+    apiman.init_app(app, **kwargs)
+    apiman.add_schema("Cat", {"type": "object", "required": ["age"]})
+
+    for i in range(cats):
+
+        def get_cat(id):
+            """
+            parameters:
+            - name: id
+              in: path
+              required: True
+              schema:
+                type: integer
+            - name: name
+              in: query
+              required: True
+              schema:
+                type: string
+            responses:
+              "200":
+                description: OK
+            """
+            apiman.validate_request(request)
+            return jsonify({"id": id})
+
+        rule = "/cats/<int:id>" if cats == 1 else f"/cats{i}/<int:id>"
+        app.route(rule, endpoint=f"get_cat_{i}", methods=["GET"])(get_cat)
+
+    @app.route("/cats/", methods=["POST"])
+    def create_cat():
+        """
+        operationId: createCat
+        parameters:
+        - name: name
+          in: query
+          required: True
+          schema:
+            type: string
+        requestBody:
+          content:
+            application/json:
+              schema:
+                $ref: '#/components/schemas/Cat'
+        responses:
+          "200":
+            description: OK
+        """
+        apiman.validate_request(request)
+        return jsonify(request.json)
+
+    @app.route("/dogs/", methods=["GET"])
+    def list_dogs():
+        """
+        parameters:
+        - name: name
+          in: query
+          schema:
+            type: string
+        responses:
+          "200":
+            description: OK
+        """
+        apiman.validate_request(request)
+        return jsonify([])
+
+    return app
+
+
+@pytest.fixture
+def create_app() -> typing.Callable[..., Flask]:
+    return _create_app
+
+
+@pytest.fixture
+def django_settings():
+    # the example project's settings, as `test_examples` runs it
+    import django
+    from django.conf import settings
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "examples._django.fish.settings")
+    django.setup()
+    return settings
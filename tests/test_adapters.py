@@ -0,0 +1,150 @@
+import gzip
+import json
+import typing
+
+import pytest
+
+from apiman.assets import CDN_ASSETS
+from benchmarks import synthetic
+
+Response = typing.Tuple[int, typing.Dict[str, str], bytes]
+
+
+def client(framework: str, app: typing.Any, apiman: typing.Any) -> typing.Callable:
+    """get(url, headers) -> (status, lower cased headers, body)"""
+    if framework == "starlette":
+        from starlette.testclient import TestClient
+
+        test_client = TestClient(app)
+
+        def get(url: str, headers: typing.Dict[str, str]) -> Response:
+            res = test_client.get(url, headers=headers)
+            # not decoded, as sent
+            body = res.content
+            if res.headers.get("content-encoding") == "gzip":
+                body = gzip.compress(body)
+            return res.status_code, dict(res.headers), body
+
+    elif framework == "django":
+        from django.test import RequestFactory
+
+        factory = RequestFactory()
+
+        def get(url: str, headers: typing.Dict[str, str]) -> Response:
+            request = factory.get(url, headers=headers)
+            res = apiman.views[request.path](request)  # what `Middleware` does
+            return (
+                res.status_code,
+                {k.lower(): v for k, v in res.items()},
+                res.content,
+            )
+
+    elif framework == "tornado":
+        import asyncio
+
+        import tornado.httpclient
+        import tornado.httpserver
+        import tornado.testing
+
+        loop = asyncio.new_event_loop()
+        sock, port = tornado.testing.bind_unused_port()
+
+        async def start() -> tornado.httpclient.AsyncHTTPClient:
+            tornado.httpserver.HTTPServer(app).add_sockets([sock])
+            return tornado.httpclient.AsyncHTTPClient()
+
+        http_client = loop.run_until_complete(start())
+
+        async def fetch(url: str, headers: typing.Dict[str, str]):
+            return await http_client.fetch(
+                f"http://127.0.0.1:{port}{url}",
+                headers=headers,
+                decompress_response=False,
+                raise_error=False,
+            )
+
+        def get(url: str, headers: typing.Dict[str, str]) -> Response:
+            res = loop.run_until_complete(fetch(url, headers))
+            return (
+                res.code,
+                {k.lower(): v for k, v in res.headers.get_all()},
+                res.body,
+            )
+
+    else:  # wsgi
+        from werkzeug.test import Client
+
+        wsgi_client = Client(app)
+
+        def get(url: str, headers: typing.Dict[str, str]) -> Response:
+            res = wsgi_client.get(url, headers=headers)
+            return (
+                res.status_code,
+                {k.lower(): v for k, v in res.headers.items()},
+                res.data,
+            )
+
+    return lambda url, **headers: get(url, {"Accept-Encoding": "identity", **headers})
+
+
+@pytest.mark.parametrize(
+    "framework", ["starlette", "django", "bottle", "tornado", "falcon"]
+)
+def test_routes(framework, tmp_path, request):
+    if framework == "django":
+        request.getfixturevalue("django_settings")
+        from django.test import override_settings
+
+        context: typing.Any = override_settings()  # `build_app` sets ROOT_URLCONF
+    else:
+        import contextlib
+
+        context = contextlib.nullcontext()
+    static_dir = tmp_path / "static"
+    static_dir.mkdir()
+    (static_dir / "swagger-ui.css").write_text("body {}" * 100)
+
+    with context:
+        app, apiman = synthetic.build_app(
+            framework,
+            synthetic.generate(paths=2),
+            static_dir=str(static_dir),
+            shard_by="path",
+            metrics=True,
+        )
+        get = client(framework, app, apiman)
+
+        # vendored assets, others from the CDN
+        assert apiman.asset_urls["swagger-ui-bundle.js"] == (
+            CDN_ASSETS["swagger-ui-bundle.js"]
+        )
+        url = apiman.asset_urls["swagger-ui.css"]
+        status, headers, body = get(url)
+        assert status == 200 and body == b"body {}" * 100
+        assert headers["content-type"].startswith("text/css")
+        status, headers, body = get(url, **{"Accept-Encoding": "gzip"})
+        assert headers["content-encoding"] == "gzip"
+        assert gzip.decompress(body) == b"body {}" * 100
+
+        # shards
+        status, _, body = get(apiman.specification_url)
+        specification = json.loads(body)
+        assert status == 200 and len(specification["paths"]) == 2
+        status, _, body = get(f"{apiman.specification_url}?shard=dogs1")
+        assert status == 200
+        assert list(json.loads(body)["paths"]) == ["/dogs1/{id}"]
+
+        # metrics
+        apiman.metrics.observe("/cats0/{id}", "get", 0.001)
+        status, _, body = get(apiman.metrics_url)
+        assert status == 200 and b"apiman_validation_duration_seconds" in body
+
+        # artifact
+        artifact = tmp_path / "apiman.artifact"
+        artifact.write_bytes(
+            apiman.build_artifact(None if framework == "django" else app)
+        )
+        loaded = type(apiman)()
+        loaded.load_artifact(str(artifact))
+        assert loaded.specification == specification
+        assert loaded._path_schemas.get(("/cats0/{id}", "post")) is not None
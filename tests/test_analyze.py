@@ -0,0 +1,108 @@
+import json
+
+import pytest
+
+from apiman.__main__ import main
+from apiman.analyze import is_redos_prone
+from apiman.base import Apiman
+
+
+@pytest.mark.parametrize(
+    "pattern, prone",
+    [
+        ("(a+)+", True),
+        ("^(a|aa)+$", True),
+        (r"^(\w+\s?)*$", True),
+        ("(.*a){10}", True),
+        (r"^[a-z]+(\.[a-z]+)*$", False),
+        (r"^(\w+\.)*\w+$", False),
+        (r"^([^.]+\.)*$", False),
+        (r"^([a-z]+\w)*$", True),
+        ("^(ab|cd)+$", False),
+        (r"^\d{3}-\d{4}$", False),
+        ("[", False),
+    ],
+)
+def test_redos(pattern, prone):
+    assert is_redos_prone(pattern) is prone
+
+
+def test_analyze_operations():
+    apiman = Apiman(metrics=True)
+    apiman.add_schema(
+        "Node",
+        {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string", "pattern": "^(a+)+$"},
+                "children": {
+                    "type": "array",
+                    "uniqueItems": True,
+                    "items": {"$ref": "#/components/schemas/Node"},
+                },
+                # a property named as a keyword isn't a schema
+                "enum": {"type": "string"},
+            },
+            "additionalProperties": {"type": "string"},
+        },
+    )
+    apiman.add_schema("Pet", {"oneOf": [{"type": "string"}, {"type": "integer"}]})
+    apiman.add_path(
+        "/nodes/",
+        {
+            "post": {
+                "parameters": [
+                    {
+                        "name": "kind",
+                        "in": "query",
+                        "schema": {"type": "string", "enum": ["a", "b", "c"]},
+                    },
+                ],
+                "requestBody": {
+                    "content": {
+                        "application/json": {
+                            "schema": {"$ref": "#/components/schemas/Node"}
+                        }
+                    }
+                },
+            },
+            "get": {
+                "parameters": [
+                    {
+                        "name": "pet",
+                        "in": "query",
+                        "schema": {"$ref": "#/components/schemas/Pet"},
+                    }
+                ]
+            },
+        },
+    )
+    apiman.add_path("/health/", {"get": {}})
+
+    post, get, health = apiman.analyze_operations()
+    assert (post.path, post.method) == ("/nodes/", "post")
+    assert post.ref_depth == 1 and post.recursive
+    assert post.patterns == 1 and post.redos == ["^(a+)+$"]
+    assert post.enum_size == 3
+    assert post.unique_items == 1 and post.open_objects == 1
+    assert get.fan_out == 2
+    assert health.score == 0
+    assert post.hits == 0  # no validations yet
+
+    # hits weigh scores
+    apiman.metrics.observe("/nodes/", "get", 0.001)
+    apiman.metrics.observe("/nodes/", "get", 0.001)
+    costs = apiman.analyze_operations()
+    assert [c.hits for c in costs] == [2, 0, 0]
+    assert costs[0].operation_id == "GET /nodes/"
+    costs = apiman.analyze_operations(hits={("/nodes/", "post"): 1})
+    assert costs[0].method == "post"
+
+
+def test_cli(tmpdir, capsys):
+    hits = tmpdir.join("hits.json")
+    hits.write(json.dumps({"POST /dogs/": 10}))
+    assert main(["analyze", "examples._flask:apiman", "--json", "--top", "1"]) == 0
+    assert len(json.loads(capsys.readouterr().out)) == 1
+    assert main(["analyze", "examples._flask:apiman", "--hits", str(hits)]) == 0
+    assert "POST /dogs/" in capsys.readouterr().out.splitlines()[1]
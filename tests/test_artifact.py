@@ -0,0 +1,80 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from apiman import artifact
+from apiman.__main__ import main
+from apiman.flask import Apiman
+
+
+def test_artifact(tmp_path, monkeypatch, create_app):
+    apiman = Apiman()
+    app = create_app(apiman)
+    path = tmp_path / "apiman.artifact"
+    path.write_bytes(apiman.build_artifact(app))
+
+    apiman = Apiman()
+    monkeypatch.setattr(apiman, "parse", lambda _: pytest.fail("parsed"))
+    app = create_app(apiman, artifact=str(path))
+    assert apiman.loaded
+    assert apiman.routes["/cats/<int:id>"] == "/cats/{id}"
+    client = app.test_client()
+    assert client.get("/cats/1?name=tom").status_code == 200
+    assert client.get("/cats/1").status_code == 500
+    assert (
+        client.get(apiman.specification_url).data == path.read_bytes().split(b"\n")[1]
+    )
+    assert "/cats/{id}" in client.get(apiman.specification_url).json["paths"]
+
+    content = path.read_bytes()
+    with pytest.raises(artifact.ArtifactError):
+        artifact.load(apiman, b"")
+    with pytest.raises(artifact.ArtifactError):
+        artifact.load(apiman, content.replace(b'"format":1', b'"format":0', 1))
+    with pytest.raises(artifact.ArtifactError):
+        artifact.load(apiman, content.replace(b"/cats/{id}", b"/dogs/{id}", 1))
+
+
+def test_build_command(tmp_path):
+    output = str(tmp_path / "apiman.artifact")
+    assert main(["build", "examples._flask:apiman", "--check", "-o", output]) == 1
+    assert main(["build", "examples._flask:apiman", "-o", output]) == 0
+    assert main(["build", "examples._flask:apiman", "--check", "-o", output]) == 0
+    assert (
+        main(
+            [
+                "build",
+                "examples._flask:apiman",
+                "--app",
+                "examples._flask:app",
+                "--check",
+                "-o",
+                output,
+            ]
+        )
+        == 0
+    )
+    with open(output, "ab") as f:
+        f.write(b" ")
+    assert main(["build", "examples._flask:apiman", "--check", "-o", output]) == 1
+
+
+def test_build_reproducible(tmp_path):
+    # method sets are iterated in hash order, which changes with PYTHONHASHSEED
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    def build(seed: str, *args: str) -> int:
+        return subprocess.call(
+            [sys.executable, "-m", "apiman", "build", "examples._flask:apiman"]
+            + list(args),
+            cwd=root,
+            env={**os.environ, "PYTHONHASHSEED": seed},
+        )
+
+    outputs = [tmp_path / "1.artifact", tmp_path / "2.artifact"]
+    for seed, output in zip(("1", "2"), outputs):
+        assert build(seed, "-o", str(output)) == 0
+    assert outputs[0].read_bytes() == outputs[1].read_bytes()
+    assert build("9", "--check", "-o", str(outputs[0])) == 0
@@ -0,0 +1,64 @@
+import gzip
+
+from flask import Flask
+
+from apiman.assets import CACHE_CONTROL, CDN_ASSETS, load_assets
+from apiman.flask import Apiman
+
+
+def test_load_assets(tmp_path):
+    (tmp_path / "swagger-ui-bundle.js").write_text("window.ui = 1;" * 100)
+    (tmp_path / "redoc.standalone.js").write_text("redoc" * 100)
+    (tmp_path / "redoc.standalone.js.gz").write_bytes(b"precompressed")
+
+    assets = load_assets(str(tmp_path), "/static/")
+    assert set(assets) == {"swagger-ui-bundle.js", "redoc.standalone.js"}
+    bundle = assets["swagger-ui-bundle.js"]
+    assert bundle.url.startswith("/static/swagger-ui-bundle.")
+    assert bundle.url.endswith(".js")
+    assert gzip.decompress(bundle.gzip_body) == bundle.body
+    assert assets["redoc.standalone.js"].gzip_body == b"precompressed"
+    # content hashed url
+    (tmp_path / "swagger-ui-bundle.js").write_text("window.ui = 2;")
+    assert load_assets(str(tmp_path), "/static/")["swagger-ui-bundle.js"].url != (
+        bundle.url
+    )
+
+
+def test_static_dir(tmp_path):
+    for name in CDN_ASSETS:
+        (tmp_path / name).write_text(f"/* {name} */" * 100)
+    app = Flask(__name__)
+    apiman = Apiman(static_dir=str(tmp_path))
+    apiman.init_app(app)
+    client = app.test_client()
+
+    html = client.get(apiman.swagger_url).get_data(as_text=True)
+    assert "cdn.jsdelivr.net" not in html
+    assert apiman.asset_urls["swagger-ui-bundle.js"] in html
+    html = client.get(apiman.redoc_url).get_data(as_text=True)
+    assert "fonts.googleapis.com" not in html
+    assert apiman.asset_urls["redoc.standalone.js"] in html
+
+    url = apiman.asset_urls["swagger-ui.css"]
+    res = client.get(url)
+    assert res.headers["Cache-Control"] == CACHE_CONTROL
+    assert res.headers["Content-Type"].startswith("text/css")
+    assert "Content-Encoding" not in res.headers
+    res = client.get(url, headers={"Accept-Encoding": "gzip, br"})
+    assert res.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(res.data) == apiman.assets["swagger-ui.css"].body
+
+
+def test_partial_static_dir(tmp_path):
+    (tmp_path / "swagger-ui-bundle.js").write_text("window.ui = 1;")
+    app = Flask(__name__)
+    apiman = Apiman(static_dir=str(tmp_path))
+    apiman.init_app(app)
+
+    assert set(apiman.asset_urls) == set(CDN_ASSETS)
+    assert apiman.asset_urls["swagger-ui-bundle.js"].startswith(apiman.static_url)
+    assert apiman.asset_urls["swagger-ui.css"] == CDN_ASSETS["swagger-ui.css"]
+    html = app.test_client().get(apiman.swagger_url).get_data(as_text=True)
+    assert 'href=""' not in html and 'src=""' not in html
+    assert CDN_ASSETS["swagger-ui.css"] in html
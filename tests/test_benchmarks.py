@@ -0,0 +1,19 @@
+from benchmarks import baseline, core, startup
+
+
+def test_compare():
+    assert baseline.compare(
+        {"a": 1.3, "b": 1.2, "c": 5.0}, {"a": 1.0, "b": 1.0}, threshold=0.25
+    ) == [("a", 1.0, 1.3)]
+
+
+def test_core_cases(tmpdir):
+    for name, func in core.cases(paths=10, directory=str(tmpdir)).items():
+        func()
+    assert tmpdir.join("specification.json").check()
+
+
+def test_startup():
+    results = startup.run(["flask"], paths=4, describe=("docstring", "file"), repeat=1)
+    assert results["flask/files"] > 0
+    assert results["flask/total"] >= results["flask/load_specification"]
@@ -0,0 +1,79 @@
+import os
+
+import pytest
+import yaml
+
+from apiman import codec
+from apiman.base import Apiman
+from apiman.cache import ParseCache
+
+
+def test_parse_cache(tmp_path):
+    cache = ParseCache(str(tmp_path))
+    with pytest.raises(KeyError):
+        cache.get("missing")
+    cache.set("key", {"responses": {200: {"description": "OK"}}})
+    assert cache.get("key") == {"responses": {200: {"description": "OK"}}}
+    assert cache.load("key", lambda: 1 / 0) == cache.get("key")
+    assert cache.load("other", lambda: [1]) == [1]
+    assert cache.size() == sum(e.stat().st_size for e in cache.entries())
+    assert not [p for p in os.listdir(cache.directory) if p.endswith(".tmp")]
+    # broken entry
+    with open(cache.path("key"), "wb") as f:
+        f.write(b"\x00")
+    with pytest.raises(KeyError):
+        cache.get("key")
+    # unsupported value
+    cache.set("date", yaml.safe_load("2022-01-01"))
+    with pytest.raises(KeyError):
+        cache.get("date")
+    cache.clear()
+    assert not cache.entries()
+
+
+def test_parse_cache_size(tmp_path):
+    cache = ParseCache(str(tmp_path), max_size=1000)
+    for i in range(20):
+        cache.set(str(i), "x" * 100)
+    assert cache.size() <= 1000
+    assert len(cache.entries()) < 20
+    cache.get("19")
+
+
+def test_file_key(tmp_path):
+    path = tmp_path / "spec.yml"
+    path.write_text("summary: a")
+    key = ParseCache.file_key(str(path))
+    assert ParseCache.file_key(str(path)) == key
+    path.write_text("summary: ab")
+    assert ParseCache.file_key(str(path)) != key
+
+
+def test_warm_parse(tmp_path, monkeypatch):
+    spec_file = tmp_path / "spec.yml"
+    spec_file.write_text("summary: from file")
+    template = tmp_path / "template.json"
+    template.write_text('{"openapi": "3.0.0"}')
+    apiman = Apiman(cache_dir=str(tmp_path / "cache"))
+
+    def func():
+        """
+        summary: from docstring
+        """
+
+    @apiman.from_file(str(spec_file))
+    def file_func():
+        pass
+
+    assert apiman.parse(func) == {"summary": "from docstring"}
+    assert apiman.parse(file_func) == {"summary": "from file"}
+    assert len(apiman.parse_cache.entries()) == 2
+
+    # warm start skips yaml
+    def fail(*_, **__):
+        raise AssertionError("yaml loaded")
+
+    monkeypatch.setattr(codec, "yaml_load", fail)
+    apiman = Apiman(cache_dir=str(tmp_path / "cache"), template=str(template))
+    assert apiman.parse(func) == {"summary": "from docstring"}
+    assert apiman.parse(file_func) == {"summary": "from file"}
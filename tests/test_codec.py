@@ -0,0 +1,103 @@
+import json
+
+import pytest
+import yaml
+from flask import Flask
+
+from apiman import codec
+from apiman.flask import Apiman
+
+
+def test_codec():
+    content = "get:\n  responses:\n    200:\n      description: OK\n"
+    assert codec.yaml_load(content) == yaml.safe_load(content)
+    assert codec.yaml_dump(yaml.safe_load(content)) == yaml.safe_dump(
+        yaml.safe_load(content)
+    )
+    assert json.loads(codec.json_dumps({"name": "猫"})) == {"name": "猫"}
+
+
+def test_yaml_scalars(create_app):
+    apiman = Apiman()
+    app = create_app(apiman)
+    apiman.add_path(
+        "/cats/",
+        codec.yaml_load(
+            """
+            parameters:
+            - name: born
+              in: query
+              schema:
+                type: string
+                example: 2021-01-01
+            responses:
+              "200":
+                description: OK
+            """
+        ),
+        method="get",
+    )
+
+    res = app.test_client().get(apiman.specification_url)
+    assert res.status_code == 200
+    parameter = res.json["paths"]["/cats/"]["get"]["parameters"][0]
+    assert parameter["schema"]["example"] == "2021-01-01"
+
+
+def test_json_backend(tmp_path):
+    orjson = pytest.importorskip("orjson")
+    app = Flask(__name__)
+    apiman = Apiman(json_loads=orjson.loads, json_dumps=orjson.dumps)
+    apiman.init_app(app)
+    spec_file = tmp_path / "spec.json"
+    spec_file.write_text('{"summary": "from file"}')
+    assert apiman.parse(apiman.from_file(str(spec_file))(lambda: None)) == {
+        "summary": "from file"
+    }
+    apiman.generate_specification_file(str(tmp_path / "spec.json"))
+    assert json.loads(spec_file.read_text()) == apiman.specification
+
+    client = app.test_client()
+    res = client.get(apiman.specification_url)
+    assert res.content_type == "application/json"
+    assert res.json == apiman.specification
+
+
+def test_json_backend_int_keys(create_app):
+    orjson = pytest.importorskip("orjson")
+    apiman = Apiman(json_dumps=orjson.dumps)
+    app = create_app(apiman)
+    responses = codec.yaml_load("responses:\n  200:\n    description: OK\n")
+    apiman.add_path("/cats/", responses, method="get")
+
+    # yaml's unquoted response codes are integers, orjson rejects them
+    client = app.test_client()
+    res = client.get(apiman.specification_url)
+    assert res.status_code == 200
+    assert res.json["paths"]["/cats/"]["get"]["responses"] == {
+        "200": {"description": "OK"}
+    }
+    artifact = apiman.build_artifact(app)
+    assert b'"200":{"description":"OK"}' in artifact.split(b"\n")[1]
+
+    apiman = Apiman(
+        json_dumps=lambda d: orjson.dumps(d, option=orjson.OPT_NON_STR_KEYS)
+    )
+    assert codec.dumps({200: "OK"}, apiman.json_dumps) == b'{"200":"OK"}'
+    # mixed keys can't be sorted
+    data = {200: "OK", "a": "b"}
+    assert codec.dumps(data, lambda d: json.dumps(d, sort_keys=True)) == (
+        b'{"200":"OK","a":"b"}'
+    )
+    with pytest.raises(TypeError):
+        codec.dumps({(1, 2): "OK"})
+
+
+def test_serialized_specification():
+    app = Flask(__name__)
+    apiman = Apiman()
+    apiman.init_app(app)
+    data = apiman.serialize_specification(app, {})
+    assert apiman.serialize_specification(app, {}) is data
+    apiman.add_path("/cats/", {"get": {"responses": {}}})
+    assert json.loads(apiman.serialize_specification(app, {}))["paths"]
@@ -0,0 +1,45 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from apiman.flask import Apiman
+
+THREADS = 32
+
+
+def test_single_flight_loading(monkeypatch, create_app):
+    apiman = Apiman()
+    app = create_app(apiman, cats=50)
+    calls = []
+    load_routes = apiman._load_routes
+
+    def slow_load_routes(app):
+        calls.append(1)
+        time.sleep(0.05)
+        load_routes(app)
+
+    monkeypatch.setattr(apiman, "_load_routes", slow_load_routes)
+    builds = []
+    build_path_schema = apiman._build_path_schema
+    monkeypatch.setattr(
+        apiman,
+        "_build_path_schema",
+        lambda *args: builds.append(args) or build_path_schema(*args),
+    )
+
+    barrier = threading.Barrier(THREADS)
+    client = app.test_client()
+
+    def first_request(i):
+        barrier.wait()
+        return (
+            client.get(f"/cats{i % 5}/1?name=tom").status_code,
+            len(client.get(apiman.specification_url).json["paths"]),
+        )
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        results = list(pool.map(first_request, range(THREADS)))
+    assert len(calls) == 1
+    assert results == [(200, 52)] * THREADS
+    assert sorted(set(builds)) == sorted(builds)
+    assert len(builds) == 5
@@ -0,0 +1,25 @@
+import json
+
+
+def loads(content):
+    return {"loaded": json.loads(content)}
+
+
+def test_json_backend(django_settings):
+    from django.test import RequestFactory, override_settings
+
+    from apiman.django import Apiman
+
+    apiman = Apiman(json_loads=loads, json_dumps=json.dumps)
+    assert (apiman.json_loads, apiman.json_dumps) == (loads, json.dumps)
+
+    apiman = Apiman()
+    with override_settings(
+        APIMAN_JSON_LOADS=f"{__name__}.loads", APIMAN_JSON_DUMPS=json.dumps
+    ):
+        apiman.init_app()
+    assert apiman.json_dumps is json.dumps
+    request = RequestFactory().post(
+        "/cats/", data="[1]", content_type="application/json"
+    )
+    assert apiman.get_request_data(request, "json") == {"loaded": [1]}
@@ -0,0 +1,43 @@
+import falcon
+import jsonschema_rs
+from falcon import testing
+
+from apiman.falcon import Apiman
+
+
+def test_request_body():
+    app = falcon.App()
+    apiman = Apiman()
+    apiman.init_app(app)
+    errors = []
+
+    class CatResource:
+        def on_post(self, req, resp):
+            """
+            requestBody:
+              content:
+                application/json:
+                  schema:
+                    type: object
+                    required: [age]
+            responses:
+              "200":
+                description: OK
+            """
+            try:
+                apiman.validate_request(req)
+            except jsonschema_rs.ValidationError as e:
+                errors.append(e)
+                resp.status = falcon.HTTP_400
+            # falcon upper cases header keys, read by `content_type`
+            resp.text = apiman.get_request_content_type(req)
+
+    app.add_route("/cats/", CatResource())
+    client = testing.TestClient(app)
+    res = client.simulate_post("/cats/", json={"age": 1})
+    assert res.status_code == 200 and res.text == "application/json"
+    assert client.simulate_post("/cats/", json={}).status_code == 400
+    assert "age" in str(errors.pop())
+    res = client.simulate_post("/cats/", body="age=1")
+    assert res.status_code == 400 and res.text == ""
+    assert "Miss body content" in str(errors.pop())
@@ -0,0 +1,60 @@
+import json
+import os
+import subprocess
+import sys
+
+# validation, xml and UI dependencies, imported on first use
+LAZY_MODULES = {"jsonschema_rs", "xmltodict", "jinja2"}
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def imported_modules(code: str) -> set:
+    output = subprocess.check_output(
+        [
+            sys.executable,
+            "-c",
+            f"{code}\nimport json, sys\nprint(json.dumps(list(sys.modules)))",
+        ],
+        cwd=ROOT,  # other tests may change the working directory
+    )
+    return set(json.loads(output.splitlines()[-1]))
+
+
+def test_lazy_import():
+    baseline = imported_modules("pass")
+    modules = imported_modules("import apiman.base")
+    assert not (modules - baseline) & (LAZY_MODULES | {"yaml", "copy", "gzip"})
+
+    # decorators and specification building
+    modules = imported_modules(
+        """
+from starlette.applications import Starlette
+from apiman.starlette import Apiman
+
+app = Starlette()
+apiman = Apiman(swagger_template="", redoc_template="")
+apiman.init_app(app)
+
+@app.route("/")
+@apiman.from_yaml("summary: test")
+def index(_):
+    pass
+
+apiman.load_specification(app)
+"""
+    )
+    assert not (modules - baseline) & LAZY_MODULES
+
+    modules = imported_modules(
+        """
+from apiman.base import Apiman
+
+apiman = Apiman()
+apiman.xmltodict("<data><id>1</id></data>")
+try:
+    apiman.validate_specification()
+except ValueError:
+    pass
+"""
+    )
+    assert {"jsonschema_rs", "xmltodict"} <= modules
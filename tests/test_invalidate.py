@@ -0,0 +1,102 @@
+from apiman.flask import Apiman
+
+
+def test_invalidate(create_app):
+    apiman = Apiman(shard_by="path")
+    app = create_app(apiman)
+    client = app.test_client()
+    assert client.post("/cats/?name=tom", json={"age": 1}).status_code == 200
+    assert client.get("/dogs/?name=a").status_code == 200
+    cat_schema = apiman._get_path_schema("/cats/", "post")
+    dog_schema = apiman._get_path_schema("/dogs/", "get")
+    for shard in ("cats", "dogs"):
+        client.get(f"{apiman.specification_url}?shard={shard}")
+    client.get(apiman.specification_url)
+    assert dog_schema._validators and cat_schema._validators
+    revision = apiman.revision
+
+    # only the operations and shards using the schema are evicted
+    apiman.add_schema("Cat", {"type": "object", "required": ["age", "name"]})
+    assert apiman.revision == revision + 1
+    assert apiman._get_path_schema("/dogs/", "get") is dog_schema
+    assert list(apiman._shards) == [("dogs", False)]
+    assert set(apiman._serialized) == {("shard", "dogs", False)}
+    assert client.post("/cats/?name=tom", json={"age": 1}).status_code == 500
+    assert apiman._get_path_schema("/cats/", "post") is not cat_schema
+
+    # unresolved refs are dependencies too
+    apiman.add_path(
+        "/dogs/",
+        {
+            "requestBody": {
+                "content": {
+                    "application/json": {"schema": {"$ref": "#/components/schemas/Dog"}}
+                }
+            }
+        },
+        method="post",
+    )
+    assert ("/dogs/", "get") not in apiman._path_schemas
+    assert not apiman._shards
+    client.get(f"{apiman.specification_url}?shard=dogs")
+    apiman.add_schema("Dog", {"type": "object"})
+    assert apiman._get_path_schema("/dogs/", "post").schemas["json"] == {
+        "type": "object"
+    }
+    assert not apiman._shards
+
+    # unrelated schemas keep everything
+    client.get(f"{apiman.specification_url}?shard=dogs")
+    apiman.add_schema("Fish", {"type": "object"})
+    assert apiman._shards and ("/dogs/", "post") in apiman._path_schemas
+
+
+def test_transitive_dependencies():
+    apiman = Apiman(schema_cache_size=2)
+    for name, ref in (("A", "B"), ("B", "C")):
+        apiman.add_schema(
+            name,
+            {
+                "type": "object",
+                "properties": {"x": {"$ref": f"#/components/schemas/{ref}"}},
+            },
+        )
+    apiman.add_schema("C", {"type": "object"})
+    for path in ("/a/", "/b/", "/c/"):
+        name = path.strip("/").upper()
+        apiman.add_path(
+            path,
+            {
+                "requestBody": {
+                    "content": {
+                        "application/json": {
+                            "schema": {"$ref": f"#/components/schemas/{name}"}
+                        }
+                    }
+                }
+            },
+            method="post",
+        )
+    a = apiman._get_path_schema("/a/", "post")
+    # direct edges only, the ref graph is shared
+    assert a.dependencies == ("/a/", "#/components/schemas/A")
+    assert apiman._referrers["#/components/schemas/C"] == {"#/components/schemas/B"}
+    b = apiman._get_path_schema("/b/", "post")
+
+    apiman.add_schema("C", {"type": "string"})
+    assert ("/a/", "post") not in apiman._path_schemas
+    assert ("/b/", "post") not in apiman._path_schemas
+    assert apiman._get_path_schema("/b/", "post") is not b
+    apiman._get_path_schema("/a/", "post")
+
+    # evicted operations leave no dependents behind
+    apiman._get_path_schema("/c/", "post")
+    assert ("/b/", "post") not in apiman._path_schemas
+    assert "/b/" not in apiman._dependents
+    assert "#/components/schemas/B" not in apiman._dependents
+    assert set(apiman._dependents) == {
+        "/a/",
+        "#/components/schemas/A",
+        "/c/",
+        "#/components/schemas/C",
+    }
@@ -0,0 +1,37 @@
+from apiman.base import Apiman
+
+
+def test_memory_report():
+    apiman = Apiman()
+    apiman.loaded = True  # no app
+    cat = {"type": "object", "properties": {"name": {"type": "string"}}}
+    apiman.add_schema("Cat", cat)
+    apiman.add_path(
+        "/cats/",
+        {
+            "post": {
+                "requestBody": {
+                    "content": {
+                        "application/json": {
+                            "schema": {"$ref": "#/components/schemas/Cat"}
+                        }
+                    }
+                }
+            }
+        },
+    )
+    report = apiman.memory_report()
+    assert report["specification"]["bytes"] > 0
+    assert report["path_schemas"] == {"bytes": 0, "shared": 0, "objects": 0}
+    assert report["serialized"]["bytes"] == 0
+
+    apiman._get_path_schema("/cats/", "post").validator("json")
+    apiman.serialize_specification(None, {})
+    report = apiman.memory_report()
+    # the expanded body schema is the component itself
+    assert report["path_schemas"]["shared"] > 0
+    assert report["validators"]["objects"] == 1
+    assert report["serialized"]["bytes"] > len(apiman.json_dumps(apiman.specification))
+    assert report["total"]["bytes"] == sum(
+        v["bytes"] for k, v in report.items() if k != "total"
+    )
@@ -0,0 +1,52 @@
+import threading
+
+from apiman.flask import Apiman
+from apiman.metrics import Metrics
+
+
+def test_metrics(create_app):
+    apiman = Apiman(metrics=True)
+    app = create_app(apiman)
+
+    client = app.test_client()
+    assert client.get("/cats/1?name=tom").status_code == 200
+    assert client.get("/cats/1?name=tom").status_code == 200
+    assert client.get("/cats/1").status_code == 500
+    response = client.get(apiman.metrics_url)
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+    lines = response.get_data(as_text=True).splitlines()
+    labels = 'path="/cats/{id}",method="get"'
+    assert f'apiman_validations_total{{{labels},location="query"}} 2' in lines
+    assert f'apiman_validations_total{{{labels},location="path"}} 2' in lines
+    assert f'apiman_validation_failures_total{{{labels},location="query"}} 1' in lines
+    assert f'apiman_validation_duration_seconds_bucket{{{labels},le="+Inf"}} 3' in lines
+    assert f"apiman_validation_duration_seconds_count{{{labels}}} 3" in lines
+    assert "apiman_schema_cache_hits 2" in lines
+
+    assert Apiman().metrics is None
+
+
+def test_metrics_threads():
+    metrics = Metrics(buckets=(0.1, 1))
+    threads = [
+        threading.Thread(
+            target=lambda: [metrics.observe('/a"\n', "get", 0.5) for _ in range(100)]
+        )
+        for _ in range(4)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    lines = metrics.render().decode().splitlines()
+    labels = 'path="/a\\"\\n",method="get"'
+    assert f'apiman_validation_duration_seconds_bucket{{{labels},le="0.1"}} 0' in lines
+    assert f'apiman_validation_duration_seconds_bucket{{{labels},le="1"}} 400' in lines
+    assert f"apiman_validation_duration_seconds_count{{{labels}}} 400" in lines
+    # finished threads' counters are folded, not kept by thread
+    assert len(metrics._shards) == 1
+    metrics.observe('/a"\n', "get", 0.5)
+    assert len(metrics._shards) == 2
+    assert metrics.operation_counts() == {('/a"\n', "get"): 401}
+    metrics.clear()
+    assert "apiman_validation_duration_seconds_count" not in metrics.render().decode()
@@ -0,0 +1,309 @@
+import threading
+import time
+
+import jsonschema_rs
+import pytest
+from flask import Flask, request
+
+from apiman.flask import Apiman
+from apiman.operation import EMPTY_OPERATION, OperationCache, OperationSchema
+
+
+def test_operation_schema():
+    operation = OperationSchema(
+        {"query": {"type": "object"}, "header": {}, "json": {"type": "object"}},
+        Apiman.VALIDATE_REQUEST_CONTENT_TYPES,
+    )
+    assert operation.parameters == ("query",)
+    assert operation.body_locations == ("json",)
+    assert operation.bodies == {"application/json": ("json",)}
+    assert not operation.empty
+    assert operation.as_dict() == {
+        "query": {"type": "object"},
+        "json": {"type": "object"},
+    }
+    assert operation.validator("json") is operation.validator("json")
+    assert OperationSchema({"query": {}}, Apiman.VALIDATE_REQUEST_CONTENT_TYPES).empty
+    with pytest.raises(AttributeError):
+        operation.other = 1
+
+
+def test_iter_request_schema():
+    app = Flask(__name__)
+    apiman = Apiman()
+    apiman.init_app(app)
+
+    @app.route("/cats/", methods=["POST"])
+    def create_cat():
+        """
+        parameters:
+        - name: name
+          in: query
+          schema:
+            type: string
+        requestBody:
+          content:
+            application/json:
+              schema:
+                type: object
+        responses:
+          "200":
+            description: OK
+        """
+
+    apiman.load_specification(app)
+    with app.test_request_context("/cats/", method="POST", json={}):
+        assert [k for k, _ in apiman.iter_request_schema(request)] == ["query", "json"]
+        assert [k for k, _ in apiman.iter_request_schema(request, ["json"])] == [
+            "query"
+        ]
+    with app.test_request_context("/cats/", method="POST", data="<cat/>"):
+        with pytest.raises(jsonschema_rs.ValidationError):
+            list(apiman.iter_request_schema(request))
+        assert [k for k, _ in apiman.iter_request_schema(request, ["json"])] == [
+            "query"
+        ]
+    with app.test_request_context("/dogs/", method="POST"):
+        assert list(apiman.iter_request_schema(request)) == []
+
+
+def test_legacy_request_schema():
+    schemas = {
+        "query": {"type": "object", "required": ["name"]},
+        "path": {},
+        "json": {"type": "object"},
+    }
+
+    class LegacyApiman(Apiman):
+        def get_request_schema(self, request):
+            return schemas  # the dict of apiman < 0.6
+
+    app = Flask(__name__)
+    apiman = LegacyApiman()
+    apiman.init_app(app)
+    with app.test_request_context("/cats/?name=tom", method="POST", json={}):
+        assert [k for k, _ in apiman.iter_request_schema(request)] == ["query", "json"]
+        apiman.validate_request(request)
+        operation = apiman._request_operation(request)
+        assert apiman._request_operation(request) is operation
+    with app.test_request_context("/cats/", method="POST", json={}):
+        with pytest.raises(jsonschema_rs.ValidationError):
+            apiman.validate_request(request)
+
+
+def test_operation_cache():
+    cache = OperationCache(max_size=2, max_missing=2)
+    schemas = [OperationSchema({}, {}) for _ in range(3)]
+    assert cache.get(("/a", "get")) is None
+    cache.set(("/a", "get"), schemas[0])
+    cache.set(("/b", "get"), schemas[1])
+    assert cache.get(("/a", "get")) is schemas[0]
+    cache.set(("/c", "get"), schemas[2])  # evicts least recently used "/b"
+    assert ("/b", "get") not in cache
+    assert len(cache) == 2
+
+    for path in ("/x", "/y", "/z"):
+        cache.set_missing((path, "get"))
+    assert cache.get(("/z", "get")) is EMPTY_OPERATION
+    cache.set(("/z", "get"), schemas[1])
+    assert cache.get(("/z", "get")) is schemas[1]
+    assert cache.info() == {
+        "hits": 2,
+        "misses": 1,
+        "missing_hits": 1,
+        "evictions": 2,
+        "size": 2,
+        "max_size": 2,
+        "missing": 0,
+    }
+
+
+def test_unknown_operations():
+    app = Flask(__name__)
+    apiman = Apiman()
+    apiman.init_app(app)
+    client = app.test_client()
+    for _ in range(3):
+        assert client.get("/cats/").status_code == 404
+        with app.test_request_context("/cats/"):
+            apiman.validate_request(request)
+    assert apiman.schema_cache_info()["missing_hits"] == 2
+
+    apiman.add_path(
+        "/cats/",
+        {"parameters": [{"name": "id", "in": "query", "schema": {"type": "string"}}]},
+        method="get",
+    )
+    assert apiman._get_path_schema("/cats/", "get").parameters == ("query",)
+
+
+def test_discriminator():
+    apiman = Apiman()
+    apiman.add_schema(
+        "Pet",
+        {
+            "type": "object",
+            "properties": {"name": {"type": "string"}},
+            "required": ["name"],
+        },
+    )
+    for name, kind, properties in (
+        ("Cat", "Cat", {"lives": {"type": "integer"}}),
+        ("Dog", "dog", {"bark": {"type": "boolean"}}),
+    ):
+        apiman.add_schema(
+            name,
+            {
+                "allOf": [
+                    {"$ref": "#/components/schemas/Pet"},
+                    {
+                        "properties": {"kind": {"const": kind}, **properties},
+                        "required": list(properties),
+                    },
+                ]
+            },
+        )
+    apiman.add_schema(
+        "Animal",
+        {
+            "required": ["kind"],
+            "oneOf": [
+                {"$ref": "#/components/schemas/Cat"},
+                {"$ref": "#/components/schemas/Dog"},
+            ],
+            # Cat is named implicitly
+            "discriminator": {"propertyName": "kind", "mapping": {"dog": "Dog"}},
+        },
+    )
+    apiman.add_path(
+        "/pets/",
+        {
+            "post": {
+                "requestBody": {
+                    "content": {
+                        "application/json": {
+                            "schema": {"$ref": "#/components/schemas/Animal"}
+                        }
+                    }
+                }
+            }
+        },
+    )
+    operation = apiman._get_path_schema("/pets/", "post")
+    property_name, variants, complete = operation.discriminators["json"]
+    assert (property_name, sorted(variants), complete) == ("kind", ["Cat", "dog"], True)
+
+    validator = operation.validator("json")
+    assert validator.is_valid({"kind": "Cat", "name": "Tom", "lives": 9})
+    assert validator.is_valid({"kind": "dog", "name": "Rex", "bark": True})
+    # only the named variant is compiled and reported
+    assert list(validator._validators) == ["Cat", "dog"]
+    with pytest.raises(jsonschema_rs.ValidationError, match="bark"):
+        validator.validate({"kind": "dog", "name": "Rex"})
+    # nested refs resolve
+    with pytest.raises(jsonschema_rs.ValidationError, match="name"):
+        validator.validate({"kind": "Cat", "lives": 9})
+    with pytest.raises(jsonschema_rs.ValidationError, match="expected one of"):
+        validator.validate({"kind": "cow"})
+    # the whole schema without the property
+    assert not validator.is_valid({"name": "Tom", "lives": 9})
+    assert None in validator._validators
+
+    apiman._path_schemas.clear()  # with shared validators
+    operation = apiman._get_path_schema("/pets/", "post")
+    assert not operation._validators
+    operation.compile_validators()
+    assert set(operation.validator("json")._validators) == {None, "Cat", "dog"}
+
+
+def test_interned_schemas():
+    apiman = Apiman()
+    apiman.add_schema("Id", {"type": "integer"})
+    apiman.add_schema(
+        "Ids", {"type": "array", "items": {"$ref": "#/components/schemas/Id"}}
+    )
+    page = {"name": "page", "in": "query", "schema": {"type": "integer"}}
+    for path in ("/cats/", "/dogs/"):
+        apiman.add_path(
+            path,
+            {
+                "get": {
+                    # equal, not the same objects
+                    "parameters": [dict(page, schema={"type": "integer"})],
+                    "requestBody": {
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/Ids"}
+                            }
+                        }
+                    },
+                }
+            },
+        )
+    cats = apiman._get_path_schema("/cats/", "get")
+    dogs = apiman._get_path_schema("/dogs/", "get")
+    # interned on first validation
+    assert apiman.schema_cache_info()["interned"] == 0
+    assert cats.validator("query") is dogs.validator("query")
+    assert cats.validator("json") is dogs.validator("json")
+    assert cats.schemas["query"] is dogs.schemas["query"]
+    info = apiman.schema_cache_info()
+    assert (info["interned"], info["interned_hits"]) == (2, 2)
+    assert info["shared_validators"] == 2
+
+    # kept while an operation interning them is cached
+    apiman._path_schemas.pop(("/cats/", "get"))
+    assert apiman.schema_cache_info()["interned"] == 2
+    assert apiman._get_path_schema("/dogs/", "get") is dogs
+
+    # dropped with the operations using them
+    apiman.add_schema("Id", {"type": "string"})
+    info = apiman.schema_cache_info()
+    assert (info["interned"], info["shared_validators"]) == (0, 0)
+    cats = apiman._get_path_schema("/cats/", "get")
+    assert cats.validator("json").is_valid(["1"])
+    assert apiman.schema_cache_info()["shared_validators"] == 1
+
+    # loaded ahead of requests, shared before any validation
+    apiman._path_schemas.clear()
+    apiman.load_path_schemas()
+    info = apiman.schema_cache_info()
+    assert (info["interned"], info["shared_validators"]) == (2, 0)
+
+    # unsortable keys aren't interned
+    schema = {"enum": [1], 1: "a"}
+    assert apiman._interned.intern(schema) == (None, schema)
+
+
+def test_interned_concurrently(monkeypatch):
+    apiman = Apiman()
+    apiman.add_path(
+        "/cats/",
+        {"get": {"parameters": [{"name": "page", "in": "query", "schema": {}}]}},
+    )
+    operation = apiman._get_path_schema("/cats/", "get")
+    interner = type(apiman._interned)
+    key = interner.key
+
+    def slow_key(schema):
+        time.sleep(0.05)  # both threads find the location not interned yet
+        return key(schema)
+
+    monkeypatch.setattr(interner, "key", staticmethod(slow_key))
+    threads = [
+        threading.Thread(target=operation.validator, args=("query",)) for _ in range(2)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert apiman.schema_cache_info()["interned_hits"] == 0
+
+    # released once, by its only operation
+    apiman._path_schemas.pop(("/cats/", "get"))
+    info = apiman.schema_cache_info()
+    assert (info["interned"], info["shared_validators"]) == (0, 0)
+    # locations of evicted operations aren't interned any more
+    operation._validators.clear()
+    operation.validator("query")
+    assert apiman.schema_cache_info()["interned"] == 0
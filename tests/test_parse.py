@@ -0,0 +1,114 @@
+import os
+
+from flask import Flask
+from flask.views import MethodView
+
+from apiman import codec
+from apiman.flask import Apiman
+
+
+def test_parse_many(tmp_path, monkeypatch):
+    path = tmp_path / "common.yml"
+    path.write_text("responses:\n  '200':\n    description: OK\n")
+    loaded = []
+    load_file = Apiman.load_file
+    monkeypatch.setattr(
+        Apiman,
+        "load_file",
+        staticmethod(lambda p, **kw: loaded.append(p) or load_file(p, **kw)),
+    )
+    parsed = []
+    yaml_load = codec.yaml_load
+    monkeypatch.setattr(codec, "yaml_load", lambda c: parsed.append(c) or yaml_load(c))
+
+    app = Flask(__name__)
+    apiman = Apiman(load_workers=4)
+    loaded.clear()
+    apiman.init_app(app)
+
+    for i in range(10):
+        app.route(f"/files/{i}", endpoint=f"file_{i}")(
+            apiman.from_file(str(path))(lambda: "")
+        )
+        app.route(f"/yaml/{i}", endpoint=f"yaml_{i}")(
+            apiman.from_yaml("summary: yaml")(lambda: "")
+        )
+
+    class CatView(MethodView):
+        def get(self):
+            """
+            summary: get cat
+            """
+
+    view = CatView.as_view("cat")
+    app.add_url_rule("/cats/", view_func=view)
+    app.add_url_rule("/kittens/", endpoint="kittens", view_func=view)
+
+    apiman.load_specification(app)
+    assert len(apiman.specification["paths"]) == 22
+    assert loaded == [str(path)]
+    assert parsed.count("summary: yaml") == 1
+    assert len([c for c in parsed if "get cat" in str(c)]) == 1
+
+    # re-parsed once the file changes
+    path.write_text("summary: changed\n")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert apiman.parse_file(str(path)) == {"summary": "changed"}
+    assert apiman.parse_file(str(path)) == {"summary": "changed"}
+    assert len(loaded) == 2
+
+
+def test_shared_documents():
+    app = Flask(__name__)
+    apiman = Apiman()
+    apiman.init_app(app)
+    doc = """
+    parameters:
+    - name: id
+      in: path
+      required: true
+      schema:
+        type: integer
+    """
+
+    class Cat(MethodView):
+        __doc__ = doc
+
+        def get(self, id):
+            """
+            responses:
+              "200":
+                description: OK
+            """
+
+    class Dog(MethodView):
+        __doc__ = doc
+
+        def delete(self, id):
+            """
+            responses:
+              "204":
+                description: Deleted
+            """
+
+    def index():
+        """
+        get:
+          responses:
+            "200":
+              description: OK
+        """
+
+    app.add_url_rule("/cats/<int:id>", view_func=Cat.as_view("cat"))
+    app.add_url_rule("/dogs/<int:id>", view_func=Dog.as_view("dog"))
+    app.add_url_rule("/", view_func=index)
+    app.add_url_rule("/index/", view_func=index)
+    apiman.load_specification(app)
+
+    paths = apiman.specification["paths"]
+    assert sorted(paths["/cats/{id}"]) == ["get", "parameters"]
+    assert sorted(paths["/dogs/{id}"]) == ["delete", "parameters"]
+    apiman.add_path("/", {"responses": {}}, method="post")
+    assert sorted(paths["/"]) == ["get", "post"]
+    assert sorted(paths["/index/"]) == ["get"]
@@ -0,0 +1,28 @@
+import gc
+import sys
+
+from apiman.flask import Apiman
+
+
+def test_preload(create_app):
+    apiman = Apiman()
+    app = create_app(apiman)
+
+    try:
+        apiman.preload(app)
+        assert gc.get_freeze_count() > 0
+    finally:
+        gc.unfreeze()
+    assert apiman.loaded
+    operation = apiman._path_schemas[("/dogs/", "get")]
+    assert operation.parameters == ("query",)
+    assert "query" in operation._validators
+    assert ("", "", False) in apiman._serialized
+    assert "jsonschema_rs" in sys.modules
+
+    apiman.add_path(
+        "/dogs/", apiman.parse(app.view_functions["list_dogs"]), method="get"
+    )  # evicted
+    apiman.preload(app, freeze=False, validators=False)
+    assert gc.get_freeze_count() == 0
+    assert not apiman._path_schemas[("/dogs/", "get")]._validators
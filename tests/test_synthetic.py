@@ -0,0 +1,40 @@
+import pytest
+
+from benchmarks import synthetic
+
+
+def test_generate():
+    specification = synthetic.generate(paths=50, seed=1)
+    assert specification == synthetic.generate(paths=50, seed=1)
+    assert specification != synthetic.generate(paths=50, seed=2)
+    assert len(specification["paths"]) == 50
+    schemas = specification["components"]["schemas"]
+    assert schemas["Tree"]["properties"]["children"]["items"] == {
+        "$ref": "#/components/schemas/Tree"
+    }
+    assert "oneOf" in schemas["Union0"]
+    assert len(schemas["Enum0"]["enum"]) == 64
+
+    swagger = synthetic.generate(paths=50, seed=1, version=2)
+    assert swagger["swagger"] == "2.0"
+    assert "allOf" in swagger["definitions"]["Union0"]
+
+    assert synthetic.route_rule("/a/{id}/b/{sub_id}", "flask") == "/a/<id>/b/<sub_id>"
+    assert synthetic.route_rule("/a/{id}", "django") == "a/<id>"
+    assert synthetic.route_rule("/a/{id}", "tornado") == r"/a/(?P<id>\w+)"
+    with pytest.raises(ValueError):
+        synthetic.route_rule("/a", "web.py")
+
+
+@pytest.mark.parametrize("version", [2, 3])
+@pytest.mark.parametrize("framework", synthetic.FRAMEWORKS)
+def test_build_app(framework, version):
+    specification = synthetic.generate(paths=20, version=version)
+    app, apiman = synthetic.build_app(framework, specification)
+    apiman.load_specification(None if framework == "django" else app)
+    assert apiman.specification["paths"] == specification["paths"]
+    apiman.validate_specification()
+
+    path = next(iter(specification["paths"]))
+    assert apiman._get_path_schema(path, "get").schemas["path"]["required"] == ["id"]
+    assert "json" in apiman._get_path_schema(path, "post").schemas
@@ -0,0 +1,44 @@
+import logging
+
+from apiman.flask import Apiman
+from apiman.trace import ValidationTrace
+
+
+def test_validation_hooks(caplog, create_app):
+    apiman = Apiman()
+    app = create_app(apiman)
+    traces = []
+    apiman.add_validation_hook(traces.append)
+    apiman.add_validation_hook(lambda _: 1 / 0)  # logged, not raised
+    client = app.test_client()
+    assert client.post("/cats/?name=tom", json={"age": 1}).status_code == 200
+    assert client.post("/cats/?name=tom", json={}).status_code == 500
+    assert client.get("/dogs/").status_code == 200
+    assert client.get("/fish/").status_code == 404
+
+    trace: ValidationTrace = traces[0]
+    assert trace.operation_id == "createCat"
+    assert [(phase, location) for phase, location, _, _ in trace.phases] == [
+        ("resolve", ""),
+        ("extract", "query"),
+        ("validate", "query"),
+        ("parse", "json"),
+        ("validate", "json"),
+    ]
+    assert trace.seconds >= sum(seconds for _, _, _, seconds in trace.phases)
+    assert trace.sizes() == {"query": 14, "json": 9}
+    assert trace.error is None
+    assert traces[1].error is not None
+    assert traces[2].operation_id == "GET /dogs/"
+    assert len(traces) == 3
+    assert "Validation hook" in caplog.text
+
+
+def test_slow_validation_log(caplog, create_app):
+    apiman = Apiman(slow_validation_ms=0.000001)
+    client = create_app(apiman).test_client()
+    with caplog.at_level(logging.WARNING, logger="apiman.trace"):
+        client.post("/cats/?name=tom", json={"age": 1})
+    assert "Slow validation of createCat" in caplog.text
+    assert "parse[json]=" in caplog.text
+    assert "json=9B" in caplog.text
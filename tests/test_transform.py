@@ -0,0 +1,238 @@
+from flask import Flask, jsonify
+
+from apiman import transform
+from apiman.flask import Apiman
+
+SPECIFICATION = {
+    "openapi": "3.0.0",
+    "info": {"title": "test", "version": "0.1"},
+    "paths": {
+        "/cats/{id}": {
+            "parameters": [{"$ref": "#/components/parameters/id"}],
+            "get": {
+                "tags": ["cat"],
+                "responses": {
+                    "200": {
+                        "description": "OK",
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/Cat"}
+                            }
+                        },
+                    }
+                },
+            },
+        },
+        "/dogs/": {
+            "get": {
+                "tags": ["dog"],
+                "responses": {
+                    "200": {
+                        "description": "OK",
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/Dog"}
+                            }
+                        },
+                    }
+                },
+            },
+            "post": {"responses": {"200": {"description": "OK"}}},
+        },
+    },
+    "components": {
+        "parameters": {
+            "id": {"name": "id", "in": "path", "schema": {"type": "string"}}
+        },
+        "schemas": {
+            "Age": {"type": "integer"},
+            "Cat": {
+                "type": "object",
+                "properties": {"age": {"$ref": "#/components/schemas/Age"}},
+            },
+            "Dog": {"type": "object"},
+            "Fish": {"type": "object"},
+        },
+        "securitySchemes": {"key": {"type": "apiKey", "name": "key", "in": "header"}},
+    },
+}
+
+
+def test_reachable_refs():
+    assert transform.reachable_refs(
+        SPECIFICATION, SPECIFICATION["paths"]["/cats/{id}"]
+    ) == {
+        "#/components/parameters/id",
+        "#/components/schemas/Cat",
+        "#/components/schemas/Age",
+    }
+    assert transform.reachable_refs(SPECIFICATION, {"$ref": "#/wrong"}) == set()
+
+
+def test_ref_root():
+    schemas = SPECIFICATION["components"]["schemas"]
+    root = transform.ref_root(
+        SPECIFICATION,
+        [
+            {"$ref": "#/components/schemas/Cat"},
+            {"$ref": "#/components/schemas/Cat/properties"},
+        ],
+    )
+    assert root == {
+        "components": {"schemas": {"Cat": schemas["Cat"], "Age": schemas["Age"]}}
+    }
+    assert root["components"]["schemas"]["Cat"] is schemas["Cat"]
+    assert transform.ref_root(SPECIFICATION, {"type": "string"}) == {}
+
+
+def test_shard():
+    assert transform.shard_index(SPECIFICATION, "tag") == ["cat", "dog", "default"]
+    assert transform.shard_index(SPECIFICATION, "path") == ["cats", "dogs"]
+
+    shard = transform.build_shard(SPECIFICATION, "tag", "cat")
+    assert list(shard["paths"]) == ["/cats/{id}"]
+    assert shard["paths"]["/cats/{id}"]["parameters"]
+    assert set(shard["components"]["schemas"]) == {"Cat", "Age"}
+    assert set(shard["components"]["parameters"]) == {"id"}
+    assert shard["components"]["securitySchemes"]
+    shard = transform.build_shard(SPECIFICATION, "path", "dogs")
+    assert set(shard["paths"]["/dogs/"]) == {"get", "post"}
+    assert set(shard["components"]["schemas"]) == {"Dog"}
+    # source specification untouched
+    assert len(SPECIFICATION["components"]["schemas"]) == 4
+
+
+def test_shard_endpoint():
+    app = Flask(__name__)
+    apiman = Apiman(shard_by="tag")
+    apiman.init_app(app)
+
+    @app.route("/cats/", methods=["GET"])
+    def list_cats():
+        """
+        tags:
+        - cat
+        responses:
+          "200":
+            description: OK
+        """
+        return jsonify([])
+
+    @app.route("/dogs/", methods=["GET"])
+    def list_dogs():
+        """
+        tags:
+        - dog
+        responses:
+          "200":
+            description: OK
+        """
+        return jsonify([])
+
+    client = app.test_client()
+    assert "?shards=1" in client.get(apiman.swagger_url).get_data(as_text=True)
+    index = client.get(apiman.specification_url + "?shards=1").json
+    assert [s["name"] for s in index["shards"]] == ["cat", "dog"]
+    assert list(client.get(index["shards"][0]["url"]).json["paths"]) == ["/cats/"]
+    assert apiman.get_specification_shard("cat") is apiman._shards[("cat", False)]
+    assert client.get(apiman.specification_url).json == apiman.specification
+    assert client.get(apiman.specification_url + "?shard=bird").json["paths"] == {}
+    assert ("bird", False) not in apiman._shards
+    # invalidated by specification changes
+    apiman.add_path("/cats/{id}/", {"get": {"tags": ["cat"], "responses": {}}})
+    assert not apiman._shards
+    assert len(client.get(index["shards"][0]["url"]).json["paths"]) == 2
+
+
+def test_prune():
+    specification = transform.prune(SPECIFICATION)
+    assert set(specification["components"]["schemas"]) == {"Cat", "Age", "Dog"}
+    assert specification["components"]["securitySchemes"]
+    # discriminator mapping is a reference too
+    specification = dict(
+        SPECIFICATION,
+        paths={
+            "/pets/": {
+                "post": {
+                    "requestBody": {
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "discriminator": {
+                                        "propertyName": "type",
+                                        "mapping": {
+                                            "cat": "#/components/schemas/Cat",
+                                            "fish": "Fish",
+                                        },
+                                    }
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        },
+    )
+    assert set(transform.prune(specification)["components"]["schemas"]) == {
+        "Cat",
+        "Age",
+        "Fish",
+    }
+
+
+def test_compact():
+    assert transform.compact(
+        {
+            "description": "dropped",
+            "x-internal": True,
+            "type": "object",
+            "properties": {
+                "description": {"type": "string", "description": "dropped"},
+                "x-id": {"type": "string", "example": "dropped"},
+                "kind": {"enum": [{"description": "kept"}]},
+            },
+            "responses": {"200": {"description": "OK"}},
+            "parameters": [{"name": "id", "description": "dropped"}],
+        }
+    ) == {
+        "type": "object",
+        "properties": {
+            "description": {"type": "string"},
+            "x-id": {"type": "string"},
+            "kind": {"enum": [{"description": "kept"}]},
+        },
+        "responses": {"200": {"description": ""}},
+        "parameters": [{"name": "id"}],
+    }
+
+
+def test_compact_endpoint():
+    app = Flask(__name__)
+    apiman = Apiman()
+    apiman.init_app(app)
+    apiman.add_schema("Unused", {"type": "object", "description": "unused"})
+
+    @app.route("/cats/", methods=["GET"])
+    def list_cats():
+        """
+        description: list cats
+        x-owner: cat team
+        responses:
+          "200":
+            description: OK
+        """
+        return jsonify([])
+
+    client = app.test_client()
+    specification = client.get(apiman.specification_url + "?compact=1").json
+    assert specification["paths"]["/cats/"]["get"] == {
+        "responses": {"200": {"description": ""}}
+    }
+    assert "Unused" not in specification.get("components", {}).get("schemas", {})
+    assert apiman.get_compact_specification() is apiman.get_compact_specification()
+    assert (
+        "Unused" in client.get(apiman.specification_url).json["components"]["schemas"]
+    )
+    apiman.prune_specification()
+    assert "Unused" not in apiman.specification["components"]["schemas"]
+    assert apiman._compact_specification is None
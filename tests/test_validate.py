@@ -0,0 +1,62 @@
+import jsonschema_rs
+import pytest
+
+from apiman.base import Apiman
+
+
+def create_apiman() -> Apiman:
+    apiman = Apiman()
+    apiman.specification["openapi"] = "3.1.0"
+    apiman.add_schema("Cat", {"type": "object"})
+    for i in range(10):
+        apiman.add_path(
+            f"/cats{i}/", {"responses": {"200": {"description": "OK"}}}, method="get"
+        )
+    return apiman
+
+
+def test_validate_specification(monkeypatch):
+    apiman = create_apiman()
+    apiman._compile_schema_file.cache_clear()  # process wide
+    apiman.validate_specification()
+    apiman.validate_specification(incremental=True)
+    info = apiman._compile_schema_file.cache_info()
+    assert (info.misses, info.hits) == (1, 1)
+
+    validated = []
+    validator = apiman._compile_schema_file(
+        apiman.STATIC_DIR + "openapi3.1_schema.yaml"
+    )
+    monkeypatch.setattr(
+        apiman,
+        "_compile_schema_file",
+        lambda _: type("V", (), {"validate": lambda _, d: validated.append(d)})(),
+    )
+    apiman.add_path("/dogs/", {"responses": {"200": {"description": "OK"}}}, "get")
+    apiman.add_schema("Dog", {"type": "object"})
+    apiman.specification["paths"]["/cats0/"] = {"summary": "replaced"}
+    apiman.validate_specification(incremental=True)
+    assert validated[-1]["paths"].keys() == {"/dogs/", "/cats0/"}
+    assert validated[-1]["components"] == {"schemas": {"Dog": {"type": "object"}}}
+    assert validated[-1]["info"] == apiman.specification["info"]
+    validator.validate(validated[-1])
+
+    apiman.validate_specification(incremental=True)
+    assert validated[-1]["paths"] == {}
+    apiman.validate_specification()
+    assert validated[-1] is apiman.specification
+
+
+def test_validate_incremental_error():
+    apiman = create_apiman()
+    apiman.validate_specification(incremental=True)
+    apiman.add_path("/dogs/", {"responses": "OK"}, method="get")
+    with pytest.raises(jsonschema_rs.ValidationError):
+        apiman.validate_specification(incremental=True)
+    # still invalid until fixed
+    with pytest.raises(jsonschema_rs.ValidationError):
+        apiman.validate_specification(incremental=True)
+    apiman.add_path(
+        "/dogs/", {"responses": {"200": {"description": "OK"}}}, method="get"
+    )
+    apiman.validate_specification(incremental=True)
@@ -0,0 +1,170 @@
+import os
+
+from flask import Flask, jsonify, request
+
+from apiman.flask import Apiman
+
+
+def touch(path, content: str):
+    stat = os.stat(path) if os.path.exists(path) else None
+    path.write_text(content)
+    if stat:  # make sure mtime changes on coarse file systems
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def test_watch(tmp_path):
+    template = tmp_path / "template.yml"
+    touch(
+        template,
+        """
+openapi: "3.0.0"
+info:
+  title: cats
+  version: "1"
+components:
+  schemas:
+    Cat:
+      type: object
+""",
+    )
+    cats = tmp_path / "cats.yml"
+    touch(
+        cats,
+        """
+requestBody:
+  content:
+    application/json:
+      schema:
+        $ref: '#/components/schemas/Cat'
+responses:
+  "200":
+    description: OK
+""",
+    )
+    app = Flask(__name__)
+    apiman = Apiman(template=str(template))
+    apiman.init_app(app)
+
+    @app.route("/cats/", methods=["POST"])
+    @apiman.from_file(str(cats))
+    def create_cat():
+        apiman.validate_request(request)
+        return jsonify(request.json)
+
+    @app.route("/dogs/", methods=["GET"])
+    def list_dogs():
+        """
+        summary: dogs
+        """
+        return jsonify([])
+
+    client = app.test_client()
+    assert client.post("/cats/", json={}).status_code == 200
+    client.get("/dogs/")
+    watcher = apiman.watch(interval=60)
+    try:
+        assert watcher.check() == []
+        dogs = apiman.specification["paths"]["/dogs/"]["get"]
+
+        touch(cats, cats.read_text().replace("description: OK", "description: Done"))
+        assert watcher.check() == [os.path.abspath(cats)]
+        operation = apiman.specification["paths"]["/cats/"]["post"]
+        assert operation["responses"]["200"]["description"] == "Done"
+        assert apiman.specification["paths"]["/dogs/"]["get"] is dogs
+        assert apiman.parse(create_cat) is operation
+
+        touch(
+            template,
+            template.read_text().replace("title: cats", "title: pets")
+            + "      required: [name]\n",
+        )
+        assert watcher.check() == [str(template)]
+        assert apiman.specification["info"]["title"] == "pets"
+        assert apiman.specification["paths"]["/dogs/"]["get"] is dogs
+        assert client.post("/cats/", json={}).status_code == 500
+        assert client.get(apiman.specification_url).json["info"]["title"] == "pets"
+
+        # broken files are kept until fixed
+        touch(cats, "responses: [")
+        assert watcher.check() == []
+        assert watcher.check() == []
+        assert apiman.specification["paths"]["/cats/"]["post"] is operation
+    finally:
+        watcher.stop()
+
+
+def test_watch_path_item(tmp_path):
+    birds = tmp_path / "birds.yml"
+    touch(
+        birds,
+        'get:\n  summary: birds\n  responses:\n    "200":\n      description: OK\n',
+    )
+    app = Flask(__name__)
+    apiman = Apiman(title="birds")
+    apiman.init_app(app)
+    apiman.add_path("/birds/", apiman.parse_file(str(birds)))
+    post = {"summary": "add a bird"}
+    apiman.add_path("/birds/", post, method="post")
+    watcher = apiman.watch(interval=60)
+    try:
+        touch(birds, birds.read_text().replace("summary: birds", "summary: all"))
+        assert watcher.check() == [os.path.abspath(birds)]
+        item = apiman.specification["paths"]["/birds/"]
+        assert item["get"]["summary"] == "all"
+        assert item["post"] is post
+    finally:
+        watcher.stop()
+
+
+def test_watch_template_paths(tmp_path):
+    template = tmp_path / "template.yml"
+    touch(
+        template,
+        """
+openapi: "3.0.0"
+info:
+  title: cats
+  version: "1"
+paths:
+  /cats/:
+    summary: cats
+    get:
+      summary: list cats
+  /birds/:
+    get:
+      summary: list birds
+""",
+    )
+    app = Flask(__name__)
+    apiman = Apiman(template=str(template))
+    apiman.init_app(app)
+
+    @app.route("/cats/", methods=["POST"])
+    def create_cat():
+        """
+        summary: create a cat
+        """
+        return jsonify({})
+
+    app.test_client().get(apiman.specification_url)
+    post = apiman.specification["paths"]["/cats/"]["post"]
+    watcher = apiman.watch(interval=60)
+    try:
+        touch(
+            template,
+            template.read_text()
+            .replace("summary: list cats", "summary: all cats")
+            .replace("  /birds/:\n    get:\n      summary: list birds\n", ""),
+        )
+        assert watcher.check() == [str(template)]
+        paths = apiman.specification["paths"]
+        assert paths["/cats/"]["get"]["summary"] == "all cats"
+        assert paths["/cats/"]["post"] is post
+        assert "/birds/" not in paths
+
+        touch(template, template.read_text().split("paths:")[0] + "paths: {}\n")
+        assert watcher.check() == [str(template)]
+        assert paths["/cats/"]["post"] is post
+        assert not paths["/cats/"].keys() & {"summary", "get"}
+    finally:
+        watcher.stop()